@@ -72,6 +72,11 @@ interface SentinelApiService {
         @Body request: DeviceRegistration
     ): Response<DeviceRegistrationResponse>
 
+    @POST("api/devices/heartbeat")
+    suspend fun heartbeat(
+        @Header("X-API-Key") apiKey: String
+    ): Response<Map<String, Any>>
+
     @GET("api/health")
     suspend fun healthCheck(): Response<Map<String, Any>>
 }
@@ -133,6 +133,17 @@ class SyncManager(private val context: Context) {
         }
     }
 
+    suspend fun sendHeartbeat(): Boolean = withContext(Dispatchers.IO) {
+        val key = apiKey ?: return@withContext false
+
+        try {
+            SentinelApi.service.heartbeat(key).isSuccessful
+        } catch (e: Exception) {
+            Log.w(TAG, "Heartbeat failed: ${e.message}")
+            false
+        }
+    }
+
     suspend fun checkHealth(): Boolean = withContext(Dispatchers.IO) {
         try {
             val response = SentinelApi.service.healthCheck()
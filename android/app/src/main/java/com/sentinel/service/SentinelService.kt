@@ -27,6 +27,7 @@ import com.sentinel.camera.CameraManager
 import com.sentinel.data.AppDatabase
 import com.sentinel.events.EventEngine
 import com.sentinel.ml.DetectionPipeline
+import com.sentinel.network.SyncManager
 import com.sentinel.network.SyncWorker
 import com.sentinel.tracking.MultiObjectTracker
 import com.sentinel.web.SentinelWebServer
@@ -46,6 +47,7 @@ class SentinelService : LifecycleService() {
     private var webServer: SentinelWebServer? = null
 
     private val database by lazy { AppDatabase.getInstance(this) }
+    private val syncManager by lazy { SyncManager(this) }
     private val wakeLockHandler = Handler(Looper.getMainLooper())
     private val wakeLockRenewInterval = 9 * 60 * 60 * 1000L // 9 hours
 
@@ -59,6 +61,8 @@ class SentinelService : LifecycleService() {
             getSharedPreferences("sentinel_prefs", MODE_PRIVATE).edit()
                 .putLong("last_heartbeat", System.currentTimeMillis())
                 .apply()
+            // Keeps the device marked online on the backend between syncs
+            lifecycleScope.launch { syncManager.sendHeartbeat() }
             heartbeatHandler.postDelayed(this, HEARTBEAT_INTERVAL)
         }
     }
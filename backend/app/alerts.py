@@ -0,0 +1,150 @@
+"""Database-stored alert rules compiled into a dispatch table."""
+
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event as sa_event, insert
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .debounce import event_seconds
+from .models import AlertRule, Event
+from .plates import plate_key
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Rules created with the alert_rules table, matching the alerts that were
+# previously hardcoded
+DEFAULT_RULES = [
+    {"name": "Unknown Person Detected", "message": "An unrecognized face was detected",
+     "event_type": "UNKNOWN_FACE_DETECTED"},
+    {"name": "Loitering Alert", "message": "Unusual activity detected",
+     "event_type": "LOITERING_DETECTED"},
+    {"name": "Unauthorized Vehicle", "message": "An unauthorized vehicle has entered the premises",
+     "event_type": "VEHICLE_ENTERED", "vehicle_status": "unauthorized"},
+    {"name": "Tailgating Detected", "message": "An unrecognized person followed an employee in",
+     "event_type": "TAILGATING_DETECTED"},
+    {"name": "Vehicle Overstay", "message": "A vehicle has stayed longer than allowed",
+     "event_type": "VEHICLE_OVERSTAY"},
+]
+
+
+@sa_event.listens_for(AlertRule.__table__, "after_create")
+def seed_default_rules(table, connection, **kwargs):
+    """Insert the default rules when the table is first created."""
+    # An executemany needs the same keys in every row
+    empty = dict.fromkeys(set().union(*DEFAULT_RULES))
+    connection.execute(insert(table), [{**empty, "is_active": True, **rule} for rule in DEFAULT_RULES])
+
+
+def parse_minutes(value: Optional[str]) -> Optional[int]:
+    """Minutes after midnight of an HH:MM time."""
+    if not value:
+        return None
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class CompiledRule:
+    """An alert rule with its predicates preprocessed for matching."""
+
+    __slots__ = ("id", "title", "message", "start", "end", "plate_key", "employee_id", "vehicle_status")
+
+    def __init__(self, rule: AlertRule):
+        self.id = rule.id
+        self.title = rule.name
+        self.message = rule.message or ""
+        self.start = parse_minutes(rule.start_time)
+        self.end = parse_minutes(rule.end_time)
+        self.plate_key = plate_key(rule.license_plate) if rule.license_plate else None
+        self.employee_id = rule.employee_id
+        self.vehicle_status = rule.vehicle_status
+
+    @property
+    def timed(self) -> bool:
+        return self.start is not None or self.end is not None
+
+    @property
+    def tag(self) -> str:
+        return f"alert-rule-{self.id}"
+
+    def in_window(self, minute: int) -> bool:
+        start = 0 if self.start is None else self.start
+        end = 24 * 60 if self.end is None else self.end
+        if start <= end:
+            return start <= minute < end
+        # Window wraps past midnight, e.g. 22:00-06:00
+        return minute >= start or minute < end
+
+    def matches(self, event: Event, minute: Optional[int]) -> bool:
+        if self.vehicle_status is not None and event.vehicle_status != self.vehicle_status:
+            return False
+        if self.employee_id is not None and event.employee_id != self.employee_id:
+            return False
+        if self.plate_key is not None and plate_key(event.license_plate) != self.plate_key:
+            return False
+        if minute is not None and not self.in_window(minute):
+            return False
+        return True
+
+
+class AlertRuleIndex:
+    """Active alert rules keyed by event type, then device.
+
+    Each event only evaluates the rules for its own type and device plus
+    that type's device-independent rules; anything else is never looked
+    at. Like the vehicle index, the table is rebuilt lazily after
+    ``invalidate`` and at least every ``alert_rules_ttl_seconds`` so rule
+    changes made through other workers are picked up.
+    """
+
+    def __init__(self):
+        # event_type -> device_id (None for any device) -> rules
+        self._table: Dict[str, Dict[Optional[str], Tuple[CompiledRule, ...]]] = {}
+        self._loaded_at = 0.0
+        self._stale = True
+
+    def invalidate(self):
+        """Mark the table for rebuild before its next use."""
+        self._stale = True
+
+    def refresh(self, db: Session):
+        """Recompile the dispatch table from the alert_rules table."""
+        grouped: Dict[str, Dict[Optional[str], List[CompiledRule]]] = {}
+        rules = db.query(AlertRule).filter(AlertRule.is_active == True).order_by(AlertRule.id).all()
+        for rule in rules:
+            by_device = grouped.setdefault(rule.event_type, {})
+            by_device.setdefault(rule.device_id or None, []).append(CompiledRule(rule))
+
+        self._table = {
+            event_type: {device_id: tuple(compiled) for device_id, compiled in by_device.items()}
+            for event_type, by_device in grouped.items()
+        }
+        self._loaded_at = time.monotonic()
+        self._stale = False
+        logger.debug(f"Alert rules loaded: {len(rules)} active")
+
+    def ensure_fresh(self, db: Session):
+        """Recompile the table if it was invalidated or has expired."""
+        if self._stale or time.monotonic() - self._loaded_at > settings.alert_rules_ttl_seconds:
+            self.refresh(db)
+
+    def match(self, event: Event) -> List[CompiledRule]:
+        """Get the rules an event triggers."""
+        by_device = self._table.get(event.event_type)
+        if not by_device:
+            return []
+
+        candidates = by_device.get(event.device_id, ()) + by_device.get(None, ())
+        minute = None
+        if any(rule.timed for rule in candidates):
+            local = datetime.fromtimestamp(event_seconds(event.timestamp))
+            minute = local.hour * 60 + local.minute
+        return [rule for rule in candidates if rule.matches(event, minute if rule.timed else None)]
+
+
+# Global alert rule index instance
+alert_rules = AlertRuleIndex()
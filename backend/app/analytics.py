@@ -0,0 +1,162 @@
+"""Time-bucketed event analytics with cached histograms."""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import Event
+
+# Supported bucket sizes in seconds
+BUCKET_SECONDS = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+# (bucket_start, event_type, device_id, count)
+Point = Tuple[int, str, Optional[str], int]
+
+
+def query_buckets(
+    db: Session,
+    size: int,
+    lo: int,
+    hi: int,
+    event_type: Optional[str] = None,
+    device_id: Optional[str] = None
+) -> Dict[int, List[Point]]:
+    """Count events per bucket, event type and device for ``lo <= timestamp < hi``.
+
+    Runs a single GROUP BY over integer-division timestamp buckets.
+    """
+    bucket = (Event.timestamp // size) * size
+    query = db.query(
+        bucket.label("bucket"),
+        Event.event_type,
+        Event.device_id,
+        func.count(Event.id)
+    ).filter(
+        Event.timestamp >= lo,
+        Event.timestamp < hi
+    )
+
+    if event_type:
+        query = query.filter(Event.event_type == event_type)
+    if device_id:
+        query = query.filter(Event.device_id == device_id)
+
+    buckets: Dict[int, List[Point]] = {}
+    for bucket_start, etype, dev, count in query.group_by("bucket", Event.event_type, Event.device_id):
+        buckets.setdefault(bucket_start, []).append((bucket_start, etype, dev, count))
+    return buckets
+
+
+class _CachedSeries:
+    """Closed buckets for one (size, filters) key, covering ``lo <= bucket < hi``."""
+
+    __slots__ = ("lo", "hi", "buckets")
+
+    def __init__(self, lo: int, hi: int, buckets: Dict[int, List[Point]]):
+        self.lo = lo
+        self.hi = hi
+        self.buckets = buckets
+
+
+class TimeseriesCache:
+    """Caches closed buckets so only the open bucket is recomputed.
+
+    A bucket is closed once the current time has moved past it. Devices can
+    upload late events for closed buckets, so ingestion calls
+    ``invalidate_from`` with the oldest timestamp in each batch.
+    """
+
+    def __init__(self, max_series: int = 64):
+        self.max_series = max_series
+        self._series: "OrderedDict[tuple, _CachedSeries]" = OrderedDict()
+
+    def get_points(
+        self,
+        db: Session,
+        size: int,
+        start: int,
+        end: int,
+        now: int,
+        event_type: Optional[str] = None,
+        device_id: Optional[str] = None
+    ) -> List[Point]:
+        """Get bucketed counts for buckets overlapping ``start..end`` (inclusive)."""
+        first = start // size * size
+        stop = end // size * size + size
+        open_start = now // size * size
+
+        points: List[Point] = []
+
+        closed_hi = min(stop, open_start)
+        if first < closed_hi:
+            series = self._closed_series(db, size, first, closed_hi, event_type, device_id)
+            for bucket_start in range(first, closed_hi, size):
+                points.extend(series.buckets.get(bucket_start, ()))
+
+        open_lo = max(first, open_start)
+        if open_lo < stop:
+            live = query_buckets(db, size, open_lo, stop, event_type, device_id)
+            for bucket_start in sorted(live):
+                points.extend(live[bucket_start])
+
+        return points
+
+    def _closed_series(
+        self,
+        db: Session,
+        size: int,
+        lo: int,
+        hi: int,
+        event_type: Optional[str],
+        device_id: Optional[str]
+    ) -> _CachedSeries:
+        """Get a cached series covering ``lo..hi``, querying only missing buckets."""
+        key = (size, event_type, device_id)
+        series = self._series.get(key)
+
+        if series is None or hi < series.lo or lo > series.hi:
+            # Disjoint from what is cached: start a fresh series
+            series = _CachedSeries(lo, hi, query_buckets(db, size, lo, hi, event_type, device_id))
+        else:
+            if lo < series.lo:
+                series.buckets.update(query_buckets(db, size, lo, series.lo, event_type, device_id))
+                series.lo = lo
+            if hi > series.hi:
+                series.buckets.update(query_buckets(db, size, series.hi, hi, event_type, device_id))
+                series.hi = hi
+
+        self._series[key] = series
+        self._series.move_to_end(key)
+        while len(self._series) > self.max_series:
+            self._series.popitem(last=False)
+
+        return series
+
+    def invalidate_from(self, timestamp: int):
+        """Drop cached buckets at or after ``timestamp``."""
+        for key in list(self._series):
+            size = key[0]
+            series = self._series[key]
+            cut = timestamp // size * size
+            if cut >= series.hi:
+                continue
+            if cut <= series.lo:
+                del self._series[key]
+                continue
+            series.hi = cut
+            for bucket_start in [b for b in series.buckets if b >= cut]:
+                del series.buckets[bucket_start]
+
+    def clear(self):
+        """Drop all cached series."""
+        self._series.clear()
+
+
+# Global timeseries cache instance
+timeseries_cache = TimeseriesCache()
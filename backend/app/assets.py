@@ -0,0 +1,213 @@
+"""Fingerprinted, precompressed static assets.
+
+At startup every file under ``static/`` is read and given a URL containing
+a hash of its content (``/static/app.3f2a9c1b7d4e.js``). Templates link to
+those through ``static_url()``, and they are served with a year-long
+``immutable`` Cache-Control. A changed file gets a new URL, so browsers
+never need to revalidate. The plain URLs keep working with ``no-cache``.
+
+References to other assets inside text assets are rewritten to their
+fingerprinted URLs. This covers the manifest's icons and the precache
+list in ``sw.js``, which therefore always matches the deployed files.
+``sw.js`` itself must stay at the URL it was registered with. Its cache
+name is derived from its rewritten content, so a deploy installs a new
+worker that drops the old cache.
+
+Text assets are precompressed with gzip and, if the ``brotli`` package is
+installed, brotli. The variant is chosen per request from
+Accept-Encoding.
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+STATIC_DIR = Path(__file__).parent / "static"
+STATIC_PREFIX = "/static/"
+SERVICE_WORKER = "sw.js"
+
+# Assets that are precompressed, and where references to other assets are rewritten
+TEXT_SUFFIXES = {".js", ".css", ".json", ".svg", ".html", ".txt", ".webmanifest"}
+EXCLUDED_SUFFIXES = {".py", ".pyc"}
+
+# Precompressed variants smaller than this fraction of the original are kept
+MIN_SAVING = 0.9
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+REFERENCE_PATTERN = re.compile(r"/static/([A-Za-z0-9_./-]+\.[A-Za-z0-9]+)")
+CACHE_NAME_PATTERN = re.compile(r"(const CACHE_NAME = ')[^']*(')")
+FINGERPRINT_PATTERN = re.compile(r"^(.*)\.([0-9a-f]{12})(\.[^./]+)$")
+
+
+def fingerprinted_name(name: str, digest: str) -> str:
+    """``icons/icon-32.png`` -> ``icons/icon-32.<digest>.png``."""
+    stem, dot, suffix = name.rpartition(".")
+    return f"{stem}.{digest}.{suffix}" if dot else f"{name}.{digest}"
+
+
+def accepted_encodings(header: str) -> set:
+    """Content codings accepted by an Accept-Encoding header (q=0 excluded)."""
+    accepted = set()
+    for part in header.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if coding:
+            accepted.add(coding)
+    return accepted
+
+
+class Asset:
+    """One static file with its fingerprint and encoded variants."""
+
+    __slots__ = ("name", "url", "digest", "content", "media_type", "encoded")
+
+    def __init__(self, name: str, content: bytes):
+        self.name = name
+        self.content = content
+        self.digest = hashlib.sha256(content).hexdigest()[:12]
+        self.url = STATIC_PREFIX + fingerprinted_name(name, self.digest)
+        self.media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self.encoded: Dict[str, bytes] = {}  # Content-Encoding -> body
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+    def body(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """The smallest variant the client accepts, with its Content-Encoding."""
+        if self.encoded:
+            accepted = accepted_encodings(accept_encoding)
+            for coding in ("br", "gzip"):
+                if coding in self.encoded and coding in accepted:
+                    return self.encoded[coding], coding
+        return self.content, None
+
+
+class AssetStore:
+    """Fingerprinted static assets, by plain and fingerprinted name."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._assets: Dict[str, Asset] = {}  # Plain name -> asset
+        self._fingerprinted: Dict[str, Asset] = {}  # Fingerprinted name -> asset
+        self._mtimes: Dict[Path, float] = {}
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _files(self):
+        if not self.root.is_dir():
+            return []
+        return sorted(
+            p for p in self.root.rglob("*")
+            if p.is_file() and p.suffix not in EXCLUDED_SUFFIXES and "__pycache__" not in p.parts
+        )
+
+    def _rewrite(self, text: str, assets: Dict[str, Asset]) -> str:
+        def replace(match: re.Match) -> str:
+            asset = assets.get(match.group(1))
+            if asset is None or asset.name == SERVICE_WORKER:
+                return match.group(0)
+            return asset.url
+        return REFERENCE_PATTERN.sub(replace, text)
+
+    def build(self):
+        """Read and fingerprint all static files."""
+        files = self._files()
+        names = {p: p.relative_to(self.root).as_posix() for p in files}
+
+        # Binary assets first, then text assets referencing them; the
+        # service worker last, as it references everything else
+        def order(path: Path) -> tuple:
+            name = names[path]
+            return (name == SERVICE_WORKER, path.suffix in TEXT_SUFFIXES, name)
+
+        assets: Dict[str, Asset] = {}
+        for path in sorted(files, key=order):
+            name = names[path]
+            content = path.read_bytes()
+            if path.suffix in TEXT_SUFFIXES:
+                text = self._rewrite(content.decode("utf-8"), assets)
+                if name == SERVICE_WORKER:
+                    version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+                    text = CACHE_NAME_PATTERN.sub(rf"\g<1>sentinel-{version}\g<2>", text)
+                content = text.encode("utf-8")
+            assets[name] = Asset(name, content)
+
+        with self._lock:
+            self._assets = assets
+            self._fingerprinted = {a.url[len(STATIC_PREFIX):]: a for a in assets.values()}
+            self._mtimes = {p: p.stat().st_mtime for p in files}
+            self._checked = time.monotonic()
+        logger.info(f"Fingerprinted {len(assets)} static assets")
+
+    def compress(self):
+        """Precompress text assets; they are served uncompressed until this has run."""
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+
+        for asset in list(self._assets.values()):
+            if asset.encoded or not asset.name.endswith(tuple(TEXT_SUFFIXES)):
+                continue
+            encoded = {"gzip": gzip.compress(asset.content, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                encoded["br"] = brotli.compress(asset.content, quality=11)
+            asset.encoded = {
+                coding: body for coding, body in encoded.items()
+                if len(body) < len(asset.content) * MIN_SAVING
+            }
+
+    def ensure_fresh(self):
+        """In debug mode, pick up edited static files (checked at most once a second)."""
+        if not settings.debug or time.monotonic() - self._checked < 1.0:
+            return
+        self._checked = time.monotonic()
+        files = self._files()
+        try:
+            changed = set(files) != set(self._mtimes) or any(p.stat().st_mtime != self._mtimes[p] for p in files)
+        except OSError:
+            changed = True
+        if changed:
+            self.build()
+            self.compress()
+
+    def url(self, name: str) -> str:
+        """Fingerprinted URL of a static file, or its plain URL if unknown."""
+        self.ensure_fresh()
+        asset = self._assets.get(name.lstrip("/"))
+        return asset.url if asset is not None else STATIC_PREFIX + name.lstrip("/")
+
+    def lookup(self, path: str) -> Tuple[Optional[Asset], bool]:
+        """Find an asset by request path; returns (asset, fingerprinted)."""
+        self.ensure_fresh()
+        asset = self._fingerprinted.get(path)
+        if asset is not None:
+            return asset, True
+        asset = self._assets.get(path)
+        if asset is not None:
+            return asset, False
+
+        # A fingerprint of an older or newer build: serve the current file, uncached
+        match = FINGERPRINT_PATTERN.match(path)
+        if match:
+            return self._assets.get(match.group(1) + match.group(3)), False
+        return None, False
+
+
+# Global static asset store, built at startup
+asset_store = AssetStore(STATIC_DIR)
+static_url = asset_store.url
@@ -0,0 +1,315 @@
+"""Pre/post-event clip recording from web camera streams.
+
+Each device streaming over ``/ws/camera`` (authenticated, see
+``tracking.py``) gets a ring of preallocated, memory-mapped segment files
+holding its most recent JPEG frames, with the frame index kept in
+fixed-size numpy arrays. When an event fires for the device, the frames
+from ``clip_pre_seconds`` before to ``clip_post_seconds`` after it are
+written out as a single MJPEG file (concatenated JPEGs) and linked to the
+event with a ``Clip`` row.
+
+Memory per camera is fixed at ``clip_segments * clip_segment_bytes`` plus
+the index, and storing a frame copies its bytes straight into the mapped
+segment without allocating. At most ``clip_max_cameras`` cameras are
+buffered at once. Saved clips older than ``clip_retention_days`` are
+deleted by the retention pass.
+"""
+
+import asyncio
+import binascii
+import hashlib
+import logging
+import mmap
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+import numpy as np
+
+from .config import get_settings
+from .database import SessionLocal
+from .debounce import event_seconds
+from .models import Clip, Event
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CAMERA_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def is_camera_id(value: str) -> bool:
+    return bool(CAMERA_ID_PATTERN.match(value))
+
+
+def file_stem(camera_id: str) -> str:
+    """File name form of a camera id; device ids may contain any character."""
+    if is_camera_id(camera_id):
+        return camera_id
+    return hashlib.sha256(camera_id.encode("utf-8")).hexdigest()[:16]
+
+
+def decode_frame(frame_data: str) -> bytes:
+    """Decode a base64 JPEG, with or without a ``data:`` URL prefix."""
+    return binascii.a2b_base64(frame_data[frame_data.find(",") + 1:])
+
+
+class ClipBuffer:
+    """Ring of memory-mapped segments holding a camera's recent frames.
+
+    Frames are appended to the current segment; when one does not fit, the
+    next segment (the oldest) is recycled and its frames dropped from the
+    index. Frames arrive in time order, so those are always the oldest
+    entries of the index ring.
+    """
+
+    def __init__(self, camera_id: str, directory: Path, segment_bytes: int, segments: int, max_frames: int):
+        self.camera_id = camera_id
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+
+        directory.mkdir(parents=True, exist_ok=True)
+        self._paths = [directory / f"{file_stem(camera_id)}-{i}.seg" for i in range(segments)]
+        self._segments = []
+        for path in self._paths:
+            with open(path, "w+b") as f:
+                f.truncate(segment_bytes)
+                self._segments.append(mmap.mmap(f.fileno(), segment_bytes))
+
+        # Frame index ring
+        self._time = np.zeros(max_frames, dtype=np.float64)
+        self._segment = np.zeros(max_frames, dtype=np.int32)
+        self._offset = np.zeros(max_frames, dtype=np.int64)
+        self._length = np.zeros(max_frames, dtype=np.int64)
+        self._head = 0  # Next index slot
+        self._count = 0
+
+        self._current = 0  # Segment being written
+        self._position = 0  # Write offset in the current segment
+
+    @property
+    def frame_count(self) -> int:
+        return self._count
+
+    def _tail(self) -> int:
+        return (self._head - self._count) % len(self._time)
+
+    def append(self, frame: bytes, timestamp: float) -> bool:
+        """Copy a frame into the ring. Returns False if it can never fit."""
+        size = len(frame)
+        if size > self.segment_bytes:
+            return False
+
+        with self._lock:
+            if self._position + size > self.segment_bytes:
+                self._current = (self._current + 1) % len(self._segments)
+                self._position = 0
+                while self._count and self._segment[self._tail()] == self._current:
+                    self._count -= 1
+
+            if self._count == len(self._time):
+                self._count -= 1
+
+            self._segments[self._current][self._position:self._position + size] = frame
+
+            slot = self._head
+            self._time[slot] = timestamp
+            self._segment[slot] = self._current
+            self._offset[slot] = self._position
+            self._length[slot] = size
+            self._head = (slot + 1) % len(self._time)
+            self._count += 1
+            self._position += size
+        return True
+
+    def extract(self, start: float, end: float) -> Optional[tuple]:
+        """Copy out frames timestamped in [start, end].
+
+        Returns ``(data, frame_count, first_time, last_time)``, or None if
+        the buffer holds no frames in the range.
+        """
+        with self._lock:
+            if not self._count:
+                return None
+            slots = (self._tail() + np.arange(self._count)) % len(self._time)
+            times = self._time[slots]
+            selected = slots[(times >= start) & (times <= end)]
+            if not len(selected):
+                return None
+
+            lengths = self._length[selected]
+            data = bytearray(int(lengths.sum()))
+            position = 0
+            for slot, length in zip(selected, lengths):
+                offset = self._offset[slot]
+                data[position:position + length] = self._segments[self._segment[slot]][offset:offset + length]
+                position += length
+            return data, len(selected), float(self._time[selected[0]]), float(self._time[selected[-1]])
+
+    def close(self):
+        with self._lock:
+            for segment in self._segments:
+                segment.close()
+            self._segments = []
+        for path in self._paths:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+class ClipRecorder:
+    """Clip buffers of connected cameras and the clips being recorded from them."""
+
+    def __init__(self):
+        self._buffers: Dict[str, ClipBuffer] = {}
+        self._connections: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._recording: Dict[str, int] = {}  # Pending clips per camera
+
+    @property
+    def enabled(self) -> bool:
+        return settings.clip_segment_bytes > 0 and settings.clip_segments > 0
+
+    def open(self, camera_id: str) -> Optional[ClipBuffer]:
+        """Get the buffer for a connecting camera, creating it if needed.
+
+        Returns None if clips are disabled or ``clip_max_cameras`` other
+        cameras are already buffered.
+        """
+        if not self.enabled:
+            return None
+        buffer = self._buffers.get(camera_id)
+        if buffer is None:
+            if len(self._buffers) >= settings.clip_max_cameras:
+                logger.warning(f"Not buffering clips for camera {camera_id}: "
+                               f"{settings.clip_max_cameras} cameras already buffered")
+                return None
+            buffer = ClipBuffer(
+                camera_id, Path(settings.clip_buffer_dir), settings.clip_segment_bytes,
+                settings.clip_segments, settings.clip_max_frames
+            )
+            self._buffers[camera_id] = buffer
+        self._connections[camera_id] = self._connections.get(camera_id, 0) + 1
+        return buffer
+
+    def release(self, camera_id: str):
+        """Drop a disconnected camera's buffer once no clips depend on it."""
+        count = self._connections.get(camera_id, 0) - 1
+        if count > 0:
+            self._connections[camera_id] = count
+            return
+        self._connections.pop(camera_id, None)
+        if not self._recording.get(camera_id):
+            self._close(camera_id)
+
+    def _close(self, camera_id: str):
+        buffer = self._buffers.pop(camera_id, None)
+        if buffer is not None:
+            buffer.close()
+
+    def trigger(self, camera_id: str, at: float, event_id: Optional[int] = None):
+        """Record a clip around ``at`` (Unix seconds) once its post-roll has arrived."""
+        if camera_id not in self._buffers:
+            return
+        self._recording[camera_id] = self._recording.get(camera_id, 0) + 1
+        task = asyncio.create_task(self._record(camera_id, at, event_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def trigger_events(self, events: Iterable[Event]):
+        """Record clips for stored events from cameras with a buffer."""
+        if not self._buffers:
+            return
+        event_types = settings.clip_event_types.split(",")
+        for event in events:
+            if event.device_id in self._buffers and event.event_type in event_types:
+                self.trigger(event.device_id, event_seconds(event.timestamp), event.id)
+
+    async def _record(self, camera_id: str, at: float, event_id: Optional[int]):
+        try:
+            await asyncio.sleep(max(0.0, at + settings.clip_post_seconds - time.time()))
+            buffer = self._buffers.get(camera_id)
+            if buffer is not None:
+                await asyncio.to_thread(self._save, buffer, at, event_id)
+        except Exception as e:
+            logger.error(f"Clip recording failed for camera {camera_id}: {e}")
+        finally:
+            self._recording[camera_id] -= 1
+            if not self._recording[camera_id]:
+                del self._recording[camera_id]
+                if camera_id not in self._connections:
+                    self._close(camera_id)
+
+    def _save(self, buffer: ClipBuffer, at: float, event_id: Optional[int]):
+        extracted = buffer.extract(at - settings.clip_pre_seconds, at + settings.clip_post_seconds)
+        if extracted is None:
+            logger.info(f"No frames buffered for clip at {at} on camera {buffer.camera_id}")
+            return
+        data, frame_count, first, last = extracted
+
+        day = datetime.fromtimestamp(at)
+        suffix = f"event-{event_id}" if event_id else f"{int(at * 1000)}"
+        path = Path(settings.clip_dir) / day.strftime("%Y") / day.strftime("%m") / f"{file_stem(buffer.camera_id)}-{suffix}.mjpeg"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+        db = SessionLocal()
+        try:
+            db.add(Clip(
+                event_id=event_id,
+                camera_id=buffer.camera_id,
+                path=str(path),
+                start_time=first,
+                end_time=last,
+                frame_count=frame_count,
+                size_bytes=len(data)
+            ))
+            db.commit()
+        finally:
+            db.close()
+        logger.info(f"Saved {frame_count}-frame clip for camera {buffer.camera_id} ({len(data)} bytes)")
+
+    def close_all(self):
+        for task in list(self._tasks):
+            task.cancel()
+        for camera_id in list(self._buffers):
+            self._close(camera_id)
+
+
+def purge_clips(cutoff: float, chunk_size: int) -> int:
+    """Delete clips recorded before ``cutoff`` (Unix seconds), files first.
+
+    Works in chunks committed on their own, like event archival. A missing
+    file is not an error, so an interrupted purge can simply be rerun.
+    """
+    purged = 0
+    while True:
+        db = SessionLocal()
+        try:
+            clips = db.query(Clip).filter(Clip.start_time < cutoff).order_by(Clip.id).limit(chunk_size).all()
+            for clip in clips:
+                try:
+                    Path(clip.path).unlink()
+                except FileNotFoundError:
+                    pass
+                db.delete(clip)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        purged += len(clips)
+        if len(clips) < chunk_size:
+            return purged
+
+
+# Global clip recorder instance
+clip_recorder = ClipRecorder()
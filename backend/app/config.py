@@ -24,6 +24,104 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
 
+    # Event retention (0 keeps events in the hot table forever)
+    retention_days: int = 0
+    retention_chunk_size: int = 5000
+    retention_interval_seconds: int = 3600
+    archive_dir: str = "./archive"
+
+    # Event snapshots
+    snapshot_dir: str = "./snapshots"
+    snapshot_max_bytes: int = 5 * 1024 * 1024
+    thumbnail_size: int = 320  # Longest side in pixels
+    thumbnail_workers: int = 2  # Processes generating thumbnails
+
+    # Web camera clip recording (clip_segments = 0 disables)
+    clip_buffer_dir: str = "./clip_buffers"  # Memory-mapped frame ring files
+    clip_dir: str = "./clips"
+    clip_segment_bytes: int = 8 * 1024 * 1024
+    clip_segments: int = 4  # Per camera; the oldest segment is overwritten
+    clip_max_cameras: int = 8  # Cameras buffered at once; others stream without clips
+    clip_max_frames: int = 4096  # Frame index capacity per camera
+    clip_pre_seconds: float = 5.0
+    clip_post_seconds: float = 5.0
+    clip_event_types: str = "PERSON_ENTERED,VEHICLE_ENTERED,UNKNOWN_FACE_DETECTED,LOITERING_DETECTED"
+    clip_retention_days: int = 30  # Saved clips older than this are deleted (0 keeps them)
+
+    # Web camera detection
+    detector: str = ""  # module:Class implementing detection.Detector; empty returns no detections
+    detection_batch_size: int = 16  # Frames per detector call
+    detection_batch_wait_ms: float = 5.0  # Max wait for a batch to fill
+    detection_workers: int = 16  # Frames in flight at once; concurrent frames are batched together
+    detection_max_fps: float = 15.0  # Per-camera quota (0 disables)
+    detection_queue_size: int = 4  # Frames queued per camera before the oldest is dropped
+    detection_deadline_ms: int = 500  # Frames older than this when processed are dropped
+    detection_camera_weights: str = ""  # camera_id:weight pairs, e.g. "lobby:2,yard:0.5"
+    detection_results_queue_size: int = 16  # Results awaiting send per camera before the oldest is dropped
+
+    # Web camera motion gating (motion_width = 0 detects every frame)
+    motion_width: int = 64  # Width of the grayscale frames compared, in pixels
+    motion_pixel_threshold: float = 25.0  # Gray level change counted as motion (0-255)
+    motion_area_threshold: float = 0.01  # Changed fraction of the region that triggers detection
+    motion_background_alpha: float = 0.05  # Background running-average rate per frame
+    motion_keyframe_seconds: float = 5.0  # Detect at least this often without motion
+    motion_regions: str = ""  # camera_id:left,top,right,bottom fractions, ";"-separated
+
+    # Web camera tracking (connections with a device API key)
+    tracking_enabled: bool = True
+    tracking_auto_register: bool = False  # Also track "web-" camera ids without a key, as new devices
+    tracking_iou_threshold: float = 0.3  # Min overlap to continue a track
+    tracking_min_hits: int = 3  # Frames a track needs before its ENTERED event
+    tracking_exit_seconds: float = 1.0  # Unmatched time before a track's EXITED event
+    tracking_max_tracks: int = 50  # Per camera
+
+    # Live stream resume buffer
+    stream_buffer_size: int = 1000  # Broadcasts kept in memory for resuming clients
+    stream_queue_size: int = 256  # Pending messages per SSE client before it is dropped
+
+    # Dashboard page cache (0 disables)
+    page_cache_ttl_seconds: float = 5.0
+
+    # Vehicle authorization
+    vehicle_match_distance: int = 1  # Max plate edit distance for a near match
+    vehicle_index_ttl_seconds: int = 60
+
+    # Alert rules
+    alert_rules_ttl_seconds: int = 60  # Reload interval so rule changes reach every worker
+
+    # Ingestion limits per device (0 disables rate limiting)
+    ingest_rate_limit: float = 50.0  # Sustained events per second
+    ingest_burst: int = 500  # Events a device may send at once after being idle
+    ingest_max_batch_size: int = 500
+
+    # Track event debouncing (0 disables)
+    debounce_window_seconds: float = 5.0  # Max gap between repeats of one track event
+    debounce_max_keys: int = 10000  # Recent (device, track, event type) keys kept
+    debounce_event_types: str = "PERSON_ENTERED,PERSON_EXITED"
+
+    # Cross-device event correlation
+    correlation_enabled: bool = True
+    correlation_transit_window_seconds: float = 300.0  # Exit at one device to entry at another
+    correlation_tailgate_window_seconds: float = 5.0  # Unrecognized entry after an employee's
+    correlation_overstay_seconds: float = 4 * 3600.0  # Vehicle entered without exiting
+    correlation_max_keys: int = 10000  # Entries kept per window
+    correlation_tick_seconds: float = 30.0  # Wall-clock check for overstays
+
+    # Device liveness
+    device_offline_seconds: int = 180  # Silence before a device is marked offline
+    heartbeat_flush_seconds: float = 10.0  # Interval for persisting last_seen
+
+    # Attendance reports
+    attendance_workday_start: str = "09:00"  # Local time; later check-ins are late
+    attendance_late_grace_minutes: int = 5
+    attendance_workdays: str = "1111100"  # Monday..Sunday, 1 = workday
+
+    # SQL profiling (debug only, adds /api/debug/sql)
+    sql_profiling: bool = False
+    sql_slow_query_ms: float = 100.0
+    sql_n_plus_one_threshold: int = 5  # Repeats of one statement template to flag
+    sql_profile_history: int = 100  # Request profiles kept in memory
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
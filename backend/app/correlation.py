@@ -0,0 +1,244 @@
+"""Streaming correlation of events across devices into derived events."""
+
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .debounce import event_seconds
+from .metrics import counter
+from .models import Event
+from .plates import plate_key
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Derived event types
+EMPLOYEE_TRANSIT = "EMPLOYEE_TRANSIT"
+TAILGATING_DETECTED = "TAILGATING_DETECTED"
+VEHICLE_OVERSTAY = "VEHICLE_OVERSTAY"
+DERIVED_EVENT_TYPES = {EMPLOYEE_TRANSIT, TAILGATING_DETECTED, VEHICLE_OVERSTAY}
+
+ENTRY_TYPES = {"PERSON_ENTERED", "EMPLOYEE_ARRIVED"}
+EXIT_TYPES = {"PERSON_EXITED", "EMPLOYEE_DEPARTED"}
+UNRECOGNIZED_ENTRY_TYPES = {"PERSON_ENTERED", "UNKNOWN_FACE_DETECTED"}
+
+DERIVED_EVENTS = counter(
+    "sentinel_derived_events_total", "Events derived by the correlation engine", ["event_type"]
+)
+
+
+class Observation:
+    """The fields of an event the engine correlates on."""
+
+    __slots__ = ("event_id", "event_type", "time", "timestamp", "device_id",
+                 "track_id", "employee_id", "license_plate")
+
+    def __init__(self, event: Event):
+        self.event_id = event.id
+        self.event_type = event.event_type
+        self.time = event_seconds(event.timestamp)
+        self.timestamp = event.timestamp
+        self.device_id = event.device_id
+        self.track_id = event.track_id
+        self.employee_id = event.employee_id
+        self.license_plate = event.license_plate
+
+
+class DerivedEvent:
+    """An event inferred from one or more observed events."""
+
+    __slots__ = ("event_type", "timestamp", "device_id", "employee_id",
+                 "license_plate", "duration", "details")
+
+    def __init__(self, event_type: str, source: Observation, duration_seconds: float,
+                 details: Dict[str, Any], timestamp: Optional[int] = None):
+        self.event_type = event_type
+        self.timestamp = source.timestamp if timestamp is None else timestamp
+        self.device_id = source.device_id
+        self.employee_id = source.employee_id
+        self.license_plate = source.license_plate
+        self.duration = int(duration_seconds * 1000)
+        self.details = details
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "event_type": self.event_type,
+            "timestamp": self.timestamp,
+            "device_id": self.device_id,
+            "employee_id": self.employee_id,
+            "license_plate": self.license_plate,
+            "duration": self.duration,
+            **self.details
+        }
+
+
+class CorrelationEngine:
+    """Derives cross-event patterns from a stream of events.
+
+    - EMPLOYEE_TRANSIT: an employee exits at one device and enters at
+      another within ``transit_window`` seconds.
+    - TAILGATING_DETECTED: an unrecognized person enters at a device within
+      ``tailgate_window`` seconds of a recognized employee entering there.
+    - VEHICLE_OVERSTAY: a plate enters and is not seen exiting within
+      ``overstay_seconds``.
+
+    Each window is an insertion-ordered dict bounded by ``max_keys``, so
+    memory is bounded and every event costs O(1) amortized: each entry is
+    inserted and removed at most once. Time advances with event times
+    (``process``) or the wall clock (``advance``). Events should arrive in
+    roughly time order; overstays are detected from the oldest open visit
+    forward.
+    """
+
+    def __init__(
+        self,
+        transit_window: float,
+        tailgate_window: float,
+        overstay_seconds: float,
+        max_keys: int = 10000
+    ):
+        self.transit_window = transit_window
+        self.tailgate_window = tailgate_window
+        self.overstay_seconds = overstay_seconds
+        self.max_keys = max_keys
+
+        self._departures: "OrderedDict[str, Observation]" = OrderedDict()  # by employee_id
+        self._entries: "OrderedDict[str, Observation]" = OrderedDict()  # last employee entry by device_id
+        self._visits: "OrderedDict[str, Observation]" = OrderedDict()  # open vehicle visits by plate key
+        self._watermark = 0.0
+
+    def _remember(self, window: "OrderedDict[str, Observation]", key: str, obs: Observation):
+        window.pop(key, None)
+        window[key] = obs
+        while len(window) > self.max_keys:
+            window.popitem(last=False)
+
+    def process(self, event: Event) -> List[DerivedEvent]:
+        """Feed one event and return any events derived from it."""
+        if event.event_type in DERIVED_EVENT_TYPES:
+            return []
+
+        obs = Observation(event)
+        derived = self.advance(obs.time)
+
+        if obs.employee_id and obs.event_type in EXIT_TYPES:
+            self._remember(self._departures, obs.employee_id, obs)
+
+        elif obs.employee_id and obs.event_type in ENTRY_TYPES:
+            departure = self._departures.get(obs.employee_id)
+            if departure is not None:
+                gap = obs.time - departure.time
+                if departure.device_id != obs.device_id and 0 <= gap <= self.transit_window:
+                    del self._departures[obs.employee_id]
+                    derived.append(DerivedEvent(EMPLOYEE_TRANSIT, obs, gap, {
+                        "from_device_id": departure.device_id,
+                        "source_event_ids": [departure.event_id, obs.event_id]
+                    }))
+            self._remember(self._entries, obs.device_id, obs)
+
+        elif not obs.employee_id and obs.event_type in UNRECOGNIZED_ENTRY_TYPES:
+            entry = self._entries.get(obs.device_id)
+            if entry is not None and entry.track_id != obs.track_id:
+                gap = obs.time - entry.time
+                if 0 <= gap <= self.tailgate_window:
+                    derived.append(DerivedEvent(TAILGATING_DETECTED, obs, gap, {
+                        "following_employee_id": entry.employee_id,
+                        "source_event_ids": [entry.event_id, obs.event_id]
+                    }))
+
+        elif obs.event_type == "VEHICLE_ENTERED":
+            key = plate_key(obs.license_plate)
+            if key:
+                self._remember(self._visits, key, obs)
+
+        elif obs.event_type == "VEHICLE_EXITED":
+            key = plate_key(obs.license_plate)
+            if key:
+                self._visits.pop(key, None)
+        return derived
+
+    def advance(self, now: float) -> List[DerivedEvent]:
+        """Move time forward, expiring windows and emitting overstays."""
+        if now <= self._watermark:
+            return []
+        self._watermark = now
+        derived = []
+
+        while self._visits:
+            key, visit = next(iter(self._visits.items()))
+            if visit.time + self.overstay_seconds > now:
+                break
+            del self._visits[key]
+            # Stamped when the overstay began, in the entry's time unit
+            scale = 1000 if visit.timestamp > 10 ** 11 else 1
+            derived.append(DerivedEvent(
+                VEHICLE_OVERSTAY, visit, self.overstay_seconds,
+                {"source_event_ids": [visit.event_id]},
+                timestamp=visit.timestamp + int(self.overstay_seconds * scale)
+            ))
+
+        while self._departures:
+            employee_id, departure = next(iter(self._departures.items()))
+            if departure.time + self.transit_window >= now:
+                break
+            del self._departures[employee_id]
+
+        return derived
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "departures": len(self._departures),
+            "entries": len(self._entries),
+            "open_vehicle_visits": len(self._visits)
+        }
+
+
+def engine_from_settings() -> CorrelationEngine:
+    return CorrelationEngine(
+        settings.correlation_transit_window_seconds,
+        settings.correlation_tailgate_window_seconds,
+        settings.correlation_overstay_seconds,
+        settings.correlation_max_keys
+    )
+
+
+# Global live correlation engine
+correlator = engine_from_settings()
+
+
+def correlate(events: Iterable[Event]) -> List[DerivedEvent]:
+    """Feed newly stored events to the live engine in time order."""
+    if not settings.correlation_enabled:
+        return []
+    derived = []
+    for event in sorted(events, key=lambda e: e.timestamp):
+        derived.extend(correlator.process(event))
+    return derived
+
+
+def store_derived(db: Session, derived: List[DerivedEvent]) -> List[Event]:
+    """Persist derived events of the live engine and return the stored rows.
+
+    Derived events are counted here, so replays do not affect the metric.
+    """
+    events = []
+    for item in derived:
+        event = Event(
+            event_type=item.event_type,
+            timestamp=item.timestamp,
+            device_id=item.device_id,
+            employee_id=item.employee_id,
+            license_plate=item.license_plate,
+            duration=item.duration,
+            extra_data=json.dumps(item.details)
+        )
+        db.add(event)
+        events.append(event)
+    db.commit()
+    for item in derived:
+        DERIVED_EVENTS.labels(item.event_type).inc()
+    return events
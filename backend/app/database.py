@@ -1,12 +1,15 @@
 """Database configuration and session management."""
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from contextlib import contextmanager
+import logging
+import zlib
 
 from .config import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 # Create engine
@@ -22,10 +25,68 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def schema_version() -> int:
+    """Fingerprint of the declared tables, columns and indexes.
+
+    Derived from the models rather than maintained by hand, so any model
+    change produces a new version without a manual bump.
+    """
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(table.name)
+        for column in table.columns:
+            parts.append(f"{column.name}:{column.type.compile(dialect=engine.dialect)}")
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            parts.append(f"{index.name}:{','.join(c.name for c in index.columns)}")
+    # SQLite's user_version is a signed 32-bit integer
+    return zlib.crc32("|".join(parts).encode()) & 0x7FFFFFFF
+
+
 def init_db():
-    """Initialize database tables."""
-    from . import models  # noqa: F401
+    """Initialize database tables.
+
+    On SQLite the schema version is kept in ``PRAGMA user_version``; when it
+    matches the models, table creation and migrations are skipped entirely.
+    """
+    from . import models, alerts  # noqa: F401 (alerts seeds the default rules)
+    version = schema_version()
+
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            if conn.exec_driver_sql("PRAGMA user_version").scalar() == version:
+                logger.info("Database schema is current")
+                return
+            # Only takes effect on a fresh database; lets retention reclaim
+            # space with incremental vacuums instead of full rewrites
+            conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {version}")
+
+
+def add_missing_columns():
+    """Add columns and indexes introduced after a table was first created.
+
+    ``create_all`` only creates missing tables, so columns added to existing
+    models are applied here with ``ALTER TABLE ... ADD COLUMN``.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                )
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
 
 
 def get_db():
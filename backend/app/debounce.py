@@ -0,0 +1,111 @@
+"""Suppression of repeated track events from flickering trackers."""
+
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+from .config import get_settings
+from .metrics import counter
+from .models import Event
+
+settings = get_settings()
+
+EVENTS_SUPPRESSED = counter(
+    "sentinel_events_suppressed_total", "Repeated track events merged into an earlier event",
+    ["device_id", "event_type"]
+)
+
+# (device_id, track_id, event_type)
+Key = Tuple[str, int, str]
+
+
+def event_seconds(timestamp: int) -> float:
+    """Event time in seconds, accepting millisecond timestamps from devices."""
+    return timestamp / 1000 if timestamp > 10 ** 11 else float(timestamp)
+
+
+class _Survivor:
+    """The stored event repeats are merged into."""
+
+    __slots__ = ("event_id", "started", "last", "duration")
+
+    def __init__(self, event_id: int, started: float, duration: int):
+        self.event_id = event_id
+        self.started = started  # Seconds
+        self.last = started  # Seconds, latest occurrence including suppressed ones
+        self.duration = duration  # Milliseconds
+
+
+class Debouncer:
+    """Sliding-window suppressor keyed by (device_id, track_id, event_type).
+
+    An event repeating within ``debounce_window_seconds`` of the previous
+    occurrence of its key is dropped, and the surviving event's duration is
+    extended to cover it. Every repeat slides the window forward. Keys are
+    kept in an LRU bounded by ``debounce_max_keys``.
+    """
+
+    def __init__(self):
+        self._recent: "OrderedDict[Key, _Survivor]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.debounce_window_seconds > 0
+
+    @staticmethod
+    def key(device_id: str, track_id: Optional[int], event_type: str) -> Optional[Key]:
+        if track_id is None or event_type not in settings.debounce_event_types.split(","):
+            return None
+        return (device_id, track_id, event_type)
+
+    def merge(self, key: Key, timestamp: int, duration: Optional[int],
+              undo: Optional[list] = None) -> Optional[Tuple[int, int]]:
+        """Merge an event into a recent one with the same key, if any.
+
+        Returns ``(event_id, new_duration)`` of the surviving event when the
+        event should be suppressed, or None if it should be stored. The
+        survivor's previous window is appended to ``undo``, for ``restore``
+        if the batch is rolled back.
+        """
+        survivor = self._recent.get(key)
+        if survivor is None:
+            return None
+
+        seconds = event_seconds(timestamp)
+        if abs(seconds - survivor.last) > settings.debounce_window_seconds:
+            del self._recent[key]
+            return None
+
+        if undo is not None:
+            undo.append((survivor, survivor.last, survivor.duration))
+        survivor.last = max(survivor.last, seconds)
+        end = (seconds - survivor.started) * 1000 + (duration or 0)
+        survivor.duration = max(survivor.duration, int(end))
+        self._recent.move_to_end(key)
+        EVENTS_SUPPRESSED.labels(key[0], key[2]).inc()
+        return survivor.event_id, survivor.duration
+
+    def remember(self, key: Key, event: Event):
+        """Track a stored event as the survivor for its key."""
+        self._recent[key] = _Survivor(event.id, event_seconds(event.timestamp), event.duration or 0)
+        self._recent.move_to_end(key)
+        while len(self._recent) > settings.debounce_max_keys:
+            self._recent.popitem(last=False)
+
+    def discard(self, event_ids: Iterable[int]):
+        """Forget survivors whose events were rolled back."""
+        ids = set(event_ids)
+        for key in [k for k, s in self._recent.items() if s.event_id in ids]:
+            del self._recent[key]
+
+    def restore(self, undo: list):
+        """Undo merges of a rolled back batch, latest first."""
+        for survivor, last, duration in reversed(undo):
+            survivor.last = last
+            survivor.duration = duration
+
+    def clear(self):
+        self._recent.clear()
+
+
+# Global debouncer instance
+debouncer = Debouncer()
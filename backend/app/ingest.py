@@ -0,0 +1,195 @@
+"""Event ingestion shared by the device API and server-side camera tracking."""
+
+import json
+import logging
+from typing import List, Optional
+
+from fastapi import BackgroundTasks
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from .alerts import alert_rules
+from .analytics import timeseries_cache
+from .clips import clip_recorder
+from .correlation import correlate, store_derived
+from .debounce import debouncer
+from .metrics import EVENTS_INGESTED, EVENT_BATCH_SIZE
+from .models import Event, Employee
+from .page_cache import page_cache
+from .plates import record_plates
+from .schemas import BatchEventResponse, EventCreate
+from .snapshots import thumbnail_url
+from .vehicles import vehicle_index, VEHICLE_EVENT_TYPES
+from .websocket import manager
+from . import push
+
+logger = logging.getLogger(__name__)
+
+
+def event_message(event: Event, employee_name: Optional[str] = None, alert: Optional[str] = None) -> dict:
+    """Build the live stream payload for a stored event.
+
+    ``alert`` is the title of the first alert rule the event triggered.
+    """
+    return {
+        "id": event.id,
+        "event_type": event.event_type,
+        "timestamp": event.timestamp,
+        "device_id": event.device_id,
+        "track_id": event.track_id,
+        "employee_name": employee_name,
+        "license_plate": event.license_plate,
+        "vehicle_status": event.vehicle_status,
+        "duration": event.duration,
+        "confidence": event.confidence,
+        "zone": event.zone,
+        "object_class": event.object_class,
+        "thumbnail_url": thumbnail_url(event.snapshot_hash) if event.snapshot_hash else None,
+        "alert": alert
+    }
+
+
+def extra_data(event_data: EventCreate) -> Optional[str]:
+    """JSON for the unindexed structured attributes of an incoming event."""
+    data = {}
+    if event_data.bbox is not None:
+        data["bbox"] = event_data.bbox.model_dump()
+    if event_data.attributes:
+        data["attributes"] = event_data.attributes
+    return json.dumps(data) if data else None
+
+
+def ingest_events(
+    db: Session,
+    device_id: str,
+    events: List[EventCreate],
+    background_tasks: BackgroundTasks
+) -> BatchEventResponse:
+    """Store a batch of events from a device and notify about them.
+
+    Repeats of a track event within the debounce window are merged into the
+    earlier event's duration instead of being stored. Broadcasts and push
+    notifications are added to ``background_tasks`` to run once the caller
+    is done. On failure the session is rolled back and the error re-raised.
+    """
+    events_created = 0
+    events_merged = 0
+    created_events = []
+    event_ids = []  # Per request event, in order
+    merges = []  # Debouncer state to restore on rollback
+
+    try:
+        vehicle_index.ensure_fresh(db)
+        alert_rules.ensure_fresh(db)
+
+        # Durations of surviving events from earlier batches, by event id
+        extended = {}
+        created_by_id = {}
+
+        for event_data in events:
+            key = debouncer.key(device_id, event_data.track_id, event_data.type) if debouncer.enabled else None
+            if key is not None:
+                merged = debouncer.merge(key, event_data.timestamp, event_data.duration, merges)
+                if merged is not None:
+                    survivor_id, duration = merged
+                    if survivor_id in created_by_id:
+                        created_by_id[survivor_id].duration = duration
+                    else:
+                        extended[survivor_id] = duration
+                    event_ids.append(survivor_id)
+                    events_merged += 1
+                    continue
+
+            event = Event(
+                event_type=event_data.type,
+                timestamp=event_data.timestamp,
+                track_id=event_data.track_id,
+                device_id=device_id,
+                employee_id=event_data.employee_id,
+                license_plate=event_data.license_plate,
+                duration=event_data.duration,
+                confidence=event_data.confidence if event_data.confidence is not None else 0.0,
+                zone=event_data.zone,
+                object_class=event_data.object_class,
+                extra_data=extra_data(event_data)
+            )
+            if event.event_type in VEHICLE_EVENT_TYPES:
+                event.vehicle_status = vehicle_index.classify(event.license_plate)
+            db.add(event)
+            db.flush()  # Get the event ID
+            created_events.append(event)
+            event_ids.append(event.id)
+            events_created += 1
+            if key is not None:
+                debouncer.remember(key, event)
+                created_by_id[event.id] = event
+
+        if extended:
+            db.execute(
+                update(Event.__table__)
+                .where(Event.__table__.c.id == bindparam("b_id"))
+                .values(duration=bindparam("b_duration")),
+                [{"b_id": i, "b_duration": d} for i, d in extended.items()]
+            )
+
+        record_plates(db, created_events)
+        db.commit()
+        merges.clear()  # Committed, nothing to restore
+
+        EVENT_BATCH_SIZE.observe(events_created)
+        for event in created_events:
+            EVENTS_INGESTED.labels(event.device_id, event.event_type).inc()
+
+        # Derive cross-device events; failures must not fail ingestion
+        derived_events = []
+        try:
+            derived_events = store_derived(db, correlate(created_events))
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Event correlation failed: {e}")
+
+        clip_recorder.trigger_events(created_events + derived_events)
+
+        if created_events:
+            timeseries_cache.invalidate_from(min(e.timestamp for e in created_events + derived_events))
+        page_cache.invalidate("events", "devices")
+
+        # Broadcast events via WebSocket and send push notifications
+        for event in created_events + derived_events:
+            # Get employee name if available
+            employee_name = None
+            if event.employee_id:
+                emp = db.query(Employee).filter(Employee.employee_id == event.employee_id).first()
+                if emp:
+                    employee_name = emp.name
+
+            rules = alert_rules.match(event)
+
+            # Broadcast to WebSocket clients
+            alert = rules[0].title if rules else None
+            background_tasks.add_task(manager.broadcast_event, event_message(event, employee_name, alert))
+
+            # Send a push notification per triggered alert rule
+            for rule in rules:
+                background_tasks.add_task(
+                    push.send_alert_notification,
+                    rule.title,
+                    employee_name or event.license_plate or rule.message,
+                    event.id,
+                    rule.tag
+                )
+
+        message = f"Successfully processed {events_created} events"
+        if events_merged:
+            message += f" ({events_merged} repeats merged)"
+        return BatchEventResponse(
+            success=True,
+            processed=events_created + events_merged,
+            message=message,
+            event_ids=event_ids
+        )
+    except Exception:
+        db.rollback()
+        debouncer.discard(event.id for event in created_events)
+        debouncer.restore(merges)
+        raise
@@ -0,0 +1,183 @@
+"""In-memory device liveness tracking from heartbeats."""
+
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, update
+
+from .config import get_settings
+from .database import SessionLocal
+from .models import Device
+from .page_cache import page_cache
+from .websocket import manager
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class LivenessTracker:
+    """Tracks which devices are online from their API traffic.
+
+    Any authenticated request counts as a heartbeat. Online devices sit in
+    a heap ordered by deadline (last heartbeat plus ``device_offline_seconds``);
+    heartbeats only update a timestamp, and a stale heap entry is re-pushed
+    with the current deadline when it surfaces, so each device has at most
+    one entry. Transitions are broadcast over ``/ws`` from the background
+    loop, and ``last_seen`` is written to the database in batches.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_beat: Dict[str, float] = {}  # device_id -> monotonic time
+        self._last_seen: Dict[str, int] = {}  # device_id -> Unix time
+        self._online: Set[str] = set()
+        self._heap: List[Tuple[float, str]] = []
+        self._pending: Dict[str, int] = {}  # last_seen values not yet persisted
+        self._came_online: List[str] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def load(self, db):
+        """Seed state from persisted ``last_seen`` values without broadcasting."""
+        now = time.time()
+        mono = time.monotonic()
+        cutoff = int(now - settings.device_offline_seconds)
+        devices = db.query(Device.device_id, Device.last_seen).filter(
+            Device.is_active == True,
+            Device.last_seen >= cutoff
+        ).all()
+
+        with self._lock:
+            for device_id, last_seen in devices:
+                beat = mono - (now - last_seen)
+                self._last_beat[device_id] = beat
+                self._last_seen[device_id] = last_seen
+                self._online.add(device_id)
+                heapq.heappush(self._heap, (beat + settings.device_offline_seconds, device_id))
+        logger.info(f"Liveness tracker loaded {len(devices)} online devices")
+
+    def beat(self, device_id: str):
+        """Record a heartbeat. Safe to call from any thread."""
+        mono = time.monotonic()
+        with self._lock:
+            self._last_beat[device_id] = mono
+            self._last_seen[device_id] = self._pending[device_id] = int(time.time())
+            if device_id in self._online:
+                return
+            self._online.add(device_id)
+            heapq.heappush(self._heap, (mono + settings.device_offline_seconds, device_id))
+            self._came_online.append(device_id)
+
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def forget(self, device_id: str):
+        """Drop a device, e.g. when it is deactivated."""
+        with self._lock:
+            self._online.discard(device_id)
+            self._last_beat.pop(device_id, None)
+
+    def is_online(self, device_id: str) -> bool:
+        return device_id in self._online
+
+    def last_seen(self, device_id: str, default: Optional[int] = None) -> Optional[int]:
+        """Latest heartbeat time, including ones not yet persisted."""
+        return self._last_seen.get(device_id, default)
+
+    def _expire(self, now: float) -> List[str]:
+        """Pop devices whose deadline has passed."""
+        offline = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, device_id = heapq.heappop(self._heap)
+                last_beat = self._last_beat.get(device_id)
+                if device_id not in self._online:
+                    continue
+                if last_beat is not None and last_beat + settings.device_offline_seconds > now:
+                    # Heartbeats arrived since this entry was pushed
+                    heapq.heappush(self._heap, (last_beat + settings.device_offline_seconds, device_id))
+                    continue
+                self._online.discard(device_id)
+                offline.append(device_id)
+        return offline
+
+    def _next_deadline(self) -> Optional[float]:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def flush(self):
+        """Persist pending ``last_seen`` values in one batch."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        db = SessionLocal()
+        try:
+            table = Device.__table__
+            db.connection().execute(
+                update(table)
+                .where(table.c.device_id == bindparam("b_device_id"))
+                .values(last_seen=bindparam("b_last_seen")),
+                [{"b_device_id": d, "b_last_seen": ts} for d, ts in pending.items()]
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to persist device last_seen: {e}")
+            with self._lock:
+                for device_id, ts in pending.items():
+                    self._pending.setdefault(device_id, ts)
+        finally:
+            db.close()
+
+    async def _announce(self, device_id: str, is_online: bool):
+        await manager.broadcast_device_status({
+            "device_id": device_id,
+            "is_online": is_online,
+            "last_seen": self._last_seen.get(device_id)
+        })
+
+    async def run(self):
+        """Detect transitions and flush heartbeats until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        next_flush = time.monotonic() + settings.heartbeat_flush_seconds
+
+        try:
+            while True:
+                wake_at = next_flush
+                deadline = self._next_deadline()
+                if deadline is not None:
+                    wake_at = min(wake_at, deadline)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max(0.0, wake_at - time.monotonic()))
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+                with self._lock:
+                    came_online, self._came_online = self._came_online, []
+                went_offline = self._expire(time.monotonic())
+
+                for device_id in came_online:
+                    await self._announce(device_id, True)
+                for device_id in went_offline:
+                    logger.info(f"Device {device_id} went offline")
+                    await self._announce(device_id, False)
+                if came_online or went_offline:
+                    page_cache.invalidate("devices")
+
+                if time.monotonic() >= next_flush:
+                    await asyncio.to_thread(self.flush)
+                    next_flush = time.monotonic() + settings.heartbeat_flush_seconds
+        finally:
+            self.flush()
+
+
+# Global liveness tracker instance
+liveness = LivenessTracker()
@@ -1,17 +1,43 @@
 """Main FastAPI application."""
 
-from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, Header
+from fastapi.responses import StreamingResponse, PlainTextResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
+from typing import Optional
+import asyncio
+import json
 import logging
+import time
 
+from .clips import clip_recorder, decode_frame, is_camera_id
 from .config import get_settings
-from .database import init_db
-from .routers import events, employees, devices, dashboard
+from .database import init_db, SessionLocal, engine
+from .metrics import (
+    registry, instrument_engine, MetricsMiddleware, WS_CONNECTIONS,
+    STREAM_SUBSCRIBERS, STREAM_QUEUE_DEPTH, CAMERA_CONNECTIONS
+)
+from .plates import backfill_plate_index
+from .alerts import alert_rules
+from .analytics import timeseries_cache
+from .assets import asset_store, static_url
+from .ingest import event_message
+from .liveness import liveness
+from .motion import motion_gates
+from .page_cache import page_cache
+from .profiler import profiler, ProfilerMiddleware
+from .scheduler import detection_scheduler
+from .snapshots import snapshot_store
+from .tracking import camera_tracking, CameraTracker
+from .vehicles import vehicle_index
+from .routers import (
+    events, employees, devices, dashboard, analytics, plates, vehicles, reports, correlation, alerts,
+    snapshots, clips, cameras, debug, assets
+)
 from .websocket import manager
-from . import push
+from .correlation import correlator, store_derived
+from . import detection, push, retention
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +48,9 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+# Startup progress reported by /api/ready
+startup_state = {"database": False, "warmed_up": False, "plates_indexed": False}
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
@@ -38,20 +67,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Static files and templates
-static_path = Path(__file__).parent / "static"
+# Metrics
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+WS_CONNECTIONS.set_function(lambda: len(manager.active_connections))
+STREAM_SUBSCRIBERS.set_function(lambda: len(manager.subscribers))
+STREAM_QUEUE_DEPTH.set_function(lambda: sum(s.queue.qsize() for s in list(manager.subscribers)))
+
+# SQL profiling (opt-in: nothing is hooked when disabled)
+if settings.sql_profiling:
+    profiler.install(engine)
+    app.add_middleware(ProfilerMiddleware)
+    app.include_router(debug.router, prefix="/api", tags=["debug"])
+    logger.warning("SQL profiling enabled, see /api/debug/sql")
+
+# Templates
 templates_path = Path(__file__).parent / "templates"
-
-if static_path.exists():
-    app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
-
 templates = Jinja2Templates(directory=str(templates_path))
+templates.env.globals["static_url"] = static_url
 
 # Include routers
 app.include_router(events.router, prefix="/api", tags=["events"])
 app.include_router(employees.router, prefix="/api", tags=["employees"])
 app.include_router(devices.router, prefix="/api", tags=["devices"])
+app.include_router(analytics.router, prefix="/api", tags=["analytics"])
+app.include_router(plates.router, prefix="/api", tags=["plates"])
+app.include_router(vehicles.router, prefix="/api", tags=["vehicles"])
+app.include_router(reports.router, prefix="/api", tags=["reports"])
+app.include_router(correlation.router, prefix="/api", tags=["correlation"])
+app.include_router(alerts.router, prefix="/api", tags=["alerts"])
+app.include_router(snapshots.router, prefix="/api", tags=["snapshots"])
+app.include_router(clips.router, prefix="/api", tags=["clips"])
+app.include_router(cameras.router, prefix="/api", tags=["cameras"])
 app.include_router(dashboard.router, tags=["dashboard"])
+app.include_router(assets.router, tags=["static"])
 
 
 @app.on_event("startup")
@@ -59,8 +108,132 @@ async def startup_event():
     """Initialize database on startup."""
     logger.info("Initializing database...")
     init_db()
+    startup_state["database"] = True
     logger.info("Database initialized successfully")
 
+    asset_store.build()
+
+    db = SessionLocal()
+    try:
+        liveness.load(db)
+    finally:
+        db.close()
+    app.state.liveness_task = asyncio.create_task(liveness.run())
+
+    if settings.correlation_enabled:
+        asyncio.create_task(correlation_loop())
+
+    detection_scheduler.start(process_camera_frame)
+
+    asyncio.create_task(warm_up())
+    asyncio.create_task(plate_backfill())
+
+    if settings.retention_days > 0 or settings.clip_retention_days > 0:
+        asyncio.create_task(retention.retention_loop())
+    if settings.retention_days > 0:
+        logger.info(f"Event retention enabled ({settings.retention_days} days)")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist pending heartbeats and stop workers and clip buffers before exiting."""
+    task = getattr(app.state, "liveness_task", None)
+    if task is not None:
+        task.cancel()
+    await detection_scheduler.stop()
+    liveness.flush()
+    snapshot_store.shutdown()
+    clip_recorder.close_all()
+
+
+async def correlation_loop():
+    """Emit vehicle overstays even when no new events arrive."""
+    while True:
+        await asyncio.sleep(settings.correlation_tick_seconds)
+        try:
+            derived = correlator.advance(time.time())
+            if not derived:
+                continue
+            db = SessionLocal()
+            try:
+                stored = store_derived(db, derived)
+                alert_rules.ensure_fresh(db)
+                triggered = [(event, alert_rules.match(event)) for event in stored]
+                messages = [
+                    event_message(event, alert=rules[0].title if rules else None)
+                    for event, rules in triggered
+                ]
+            finally:
+                db.close()
+            page_cache.invalidate("events")
+            timeseries_cache.invalidate_from(min(e["timestamp"] for e in messages))
+            for message in messages:
+                await manager.broadcast_event(message)
+            for event, rules in triggered:
+                for rule in rules:
+                    await push.send_alert_notification(
+                        rule.title, event.license_plate or rule.message, event.id, rule.tag
+                    )
+        except Exception as e:
+            logger.error(f"Correlation tick failed: {e}")
+
+
+async def warm_up():
+    """Prepare caches in the background so first requests don't pay for them."""
+    await asyncio.to_thread(run_warm_up)
+    startup_state["warmed_up"] = True
+    logger.info("Warm-up complete")
+
+
+def run_warm_up():
+    """Load push keys and the detector, precompress static assets, compile templates and build indexes."""
+    try:
+        push.warm_up()
+    except Exception as e:
+        logger.error(f"Push warm-up failed: {e}")
+
+    try:
+        detection.load()
+    except Exception as e:
+        logger.error(f"Detector failed to load: {e}")
+
+    try:
+        asset_store.compress()
+    except Exception as e:
+        logger.error(f"Static asset compression failed: {e}")
+
+    for name in dashboard.templates.env.list_templates():
+        try:
+            dashboard.templates.env.get_template(name)
+        except Exception as e:
+            logger.error(f"Template {name} failed to compile: {e}")
+
+    db = SessionLocal()
+    try:
+        vehicle_index.ensure_fresh(db)
+        alert_rules.ensure_fresh(db)
+    except Exception as e:
+        logger.error(f"Index warm-up failed: {e}")
+    finally:
+        db.close()
+
+
+async def plate_backfill():
+    """Backfill the plate index, reporting ready once it has run."""
+    await asyncio.to_thread(run_plate_backfill)
+    startup_state["plates_indexed"] = True
+
+
+def run_plate_backfill():
+    """Index plates of events stored before the plate index existed."""
+    db = SessionLocal()
+    try:
+        backfill_plate_index(db)
+    except Exception as e:
+        logger.error(f"Plate index backfill failed: {e}")
+    finally:
+        db.close()
+
 
 @app.get("/api/health")
 async def health_check():
@@ -72,17 +245,48 @@ async def health_check():
     }
 
 
+@app.get("/api/ready")
+async def readiness_check():
+    """Readiness endpoint: 503 until startup, warm-up and the plate backfill have finished.
+
+    Unlike ``/api/health`` (liveness), this tells load balancers when the
+    instance can take traffic without cold-path latency.
+    """
+    ready = all(startup_state.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "starting", **startup_state}
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 # WebSocket endpoint for real-time updates
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time event streaming."""
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, last_seq: Optional[int] = None):
+    """WebSocket endpoint for real-time event streaming.
+
+    Reconnecting clients pass the last ``seq`` they received, either as the
+    ``last_seq`` query parameter or in a ``{"type": "resume", "last_seq": N}``
+    message, and get the messages they missed replayed from memory.
+    """
+    await manager.connect(websocket, last_seq)
     try:
         while True:
             # Keep connection alive, listen for client messages
             data = await websocket.receive_text()
-            # Handle any client messages if needed
             logger.debug(f"Received WebSocket message: {data}")
+
+            try:
+                message = json.loads(data)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(message, dict) and message.get("type") == "resume":
+                await manager.resume(websocket, int(message.get("last_seq", 0)))
     except WebSocketDisconnect:
         await manager.disconnect(websocket)
     except Exception as e:
@@ -90,6 +294,59 @@ async def websocket_endpoint(websocket: WebSocket):
         await manager.disconnect(websocket)
 
 
+# Server-Sent Events endpoint for real-time updates
+@app.get("/api/stream")
+async def event_stream(
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    last_seq: Optional[int] = None
+):
+    """Stream broadcasts as Server-Sent Events.
+
+    Honors ``Last-Event-ID`` (sent automatically by EventSource on
+    reconnect) or the ``last_seq`` query parameter to replay missed
+    messages from the in-memory buffer.
+    """
+    resume_from = last_event_id if last_event_id is not None else last_seq
+
+    async def stream():
+        subscriber = manager.subscribe()
+        try:
+            yield "retry: 3000\n\n"
+
+            sent = manager.seq
+            if resume_from is not None:
+                missed = manager.messages_since(resume_from)
+                if missed is None:
+                    yield f"event: resync\ndata: {json.dumps({'seq': sent})}\n\n"
+                else:
+                    for seq, message_json in missed:
+                        yield f"id: {seq}\ndata: {message_json}\n\n"
+                        sent = seq
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(subscriber.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if item is None:
+                    break
+                seq, message_json = item
+                if seq <= sent:
+                    continue  # Already replayed
+                yield f"id: {seq}\ndata: {message_json}\n\n"
+                sent = seq
+        finally:
+            manager.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # Push notification endpoints
 @app.get("/api/push/vapid-public-key")
 async def get_vapid_public_key():
@@ -116,84 +373,138 @@ async def unsubscribe_from_push(request: Request):
 
 # WebSocket endpoint for camera frame processing
 @app.websocket("/ws/camera")
-async def camera_websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for processing camera frames from web clients."""
+async def camera_websocket_endpoint(websocket: WebSocket, camera_id: Optional[str] = None,
+                                    api_key: Optional[str] = None):
+    """WebSocket endpoint for processing camera frames from web clients.
+
+    Connections with a device's ``api_key`` (or, with auto-registration,
+    a ``web-`` camera id) belong to that device: their detections are
+    tracked into its events, and their recent frames are kept in a clip
+    buffer under its id, so its events get pre/post-event clips. Its
+    scheduling weight and motion regions are configured by that id too.
+    Frames without motion skip detection and are answered with the latest
+    detections.
+    """
+    if camera_id is not None and not is_camera_id(camera_id):
+        await websocket.close(code=1008)
+        return
+
+    authenticated = None
+    if api_key:
+        authenticated = await asyncio.to_thread(camera_tracking.authenticate, api_key)
+        if authenticated is None:
+            await websocket.close(code=1008)
+            return
+    device_id = camera_tracking.device_for(camera_id, authenticated)
+
     await websocket.accept()
-    logger.info("Camera WebSocket connected")
+    CAMERA_CONNECTIONS.inc()
+    logger.info(f"Camera WebSocket connected ({camera_id or 'anonymous'})")
+    clip_buffer = clip_recorder.open(device_id) if device_id else None
+
+    # Frames are queued with the detection scheduler; results are sent back
+    # in order by a separate task so receiving never waits on detection
+    scheduler_id = device_id or camera_id or f"anonymous-{id(websocket):x}"
+    gate = motion_gates.get(scheduler_id)
+    tracker = camera_tracking.open(device_id)
+    detected: Optional[asyncio.Future] = None
+    results: asyncio.Queue = asyncio.Queue(maxsize=settings.detection_results_queue_size)
+    sender = asyncio.create_task(send_detections(websocket, results, tracker))
+    sender.add_done_callback(log_sender_failure)
 
     try:
         while True:
             data = await websocket.receive_json()
 
             if data.get("type") == "frame":
-                # Process the frame (placeholder for ML detection)
-                # In production, this would run actual detection models
-                frame_data = data.get("data", "")
+                frame = decode_frame(data.get("data", ""))
                 timestamp = data.get("timestamp", 0)
                 sensitivity = data.get("sensitivity", 0.5)
 
-                # Placeholder detection response
-                # Replace this with actual ML processing
-                detections = await process_camera_frame(frame_data, sensitivity)
-
-                # Send detections back to client
-                await websocket.send_json({
-                    "type": "detections",
-                    "detections": detections,
-                    "timestamp": timestamp
-                })
+                if clip_buffer is not None:
+                    clip_buffer.append(frame, time.time())
+
+                # Gating decodes the frame, so it runs off the event loop. Still
+                # frames reuse the latest detections, unless that frame was dropped
+                moved = gate is None or await asyncio.to_thread(gate.check, frame)
+                missing = detected is None or (detected.done() and detected.result() is None)
+                if moved or missing:
+                    detected = detection_scheduler.submit(
+                        scheduler_id, frame, sensitivity, data.get("width", 0), data.get("height", 0)
+                    )
+                if sender.done():
+                    # Sending failed (logged by its callback); let the client reconnect
+                    await websocket.close(code=1011)
+                    break
+                if results.full():
+                    results.get_nowait()  # The client is not keeping up; drop the oldest
+                results.put_nowait((detected, timestamp))
 
     except WebSocketDisconnect:
         logger.info("Camera WebSocket disconnected")
     except Exception as e:
         logger.error(f"Camera WebSocket error: {e}")
+    finally:
+        sender.cancel()
+        detection_scheduler.unregister(scheduler_id)
+        motion_gates.remove(scheduler_id)
+        CAMERA_CONNECTIONS.dec()
+        if clip_buffer is not None:
+            clip_recorder.release(device_id)
+        if tracker is not None:
+            await camera_tracking.store(tracker.device_id, tracker.close())
+
+
+def log_sender_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Sending camera detections failed: {task.exception()!r}")
 
 
-async def process_camera_frame(frame_data: str, sensitivity: float) -> list:
+async def send_detections(websocket: WebSocket, results: asyncio.Queue, tracker: Optional[CameraTracker]):
+    """Send detections back to a camera as its frames complete, skipping dropped ones.
+
+    Tracked cameras also feed them to their tracker, which stores enter/exit events.
+    """
+    while True:
+        future, timestamp = await results.get()
+        detections = await future
+        if detections is None:
+            continue
+        if tracker is not None:
+            await camera_tracking.store(tracker.device_id, tracker.update(detections, time.time()))
+        await websocket.send_json({
+            "type": "detections",
+            "detections": detections,
+            "timestamp": timestamp
+        })
+
+
+async def process_camera_frame(frame: bytes, sensitivity: float, width: int = 0, height: int = 0) -> list:
     """
     Process a camera frame and return detections.
 
-    This is a placeholder that should be replaced with actual ML processing.
-    Options for implementation:
-    1. Use a Python ML library (OpenCV + YOLO, MediaPipe, etc.)
-    2. Forward to a separate ML service
-    3. Use cloud-based detection APIs
+    Frames are micro-batched with those of other cameras and run through
+    the configured detector (see ``detection.py``). Without a detector no
+    detections are returned.
 
     Args:
-        frame_data: Base64 encoded JPEG image
+        frame: JPEG image
         sensitivity: Detection sensitivity threshold (0.0 - 1.0)
+        width, height: Size of the client's video, which boxes are scaled to
 
     Returns:
         List of detection dictionaries with box coordinates and labels
     """
-    # Placeholder - returns empty detections
-    # To implement real detection, uncomment and modify:
-    #
-    # import cv2
-    # import numpy as np
-    # import base64
-    #
-    # # Decode base64 image
-    # img_data = base64.b64decode(frame_data.split(',')[1])
-    # nparr = np.frombuffer(img_data, np.uint8)
-    # img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    #
-    # # Run detection model (e.g., YOLO, MediaPipe)
-    # results = model.detect(img)
-    #
-    # detections = []
-    # for r in results:
-    #     if r.confidence >= sensitivity:
-    #         detections.append({
-    #             "type": r.label,
-    #             "confidence": r.confidence,
-    #             "box": {
-    #                 "x": r.x,
-    #                 "y": r.y,
-    #                 "width": r.width,
-    #                 "height": r.height
-    #             }
-    #         })
-    # return detections
-
-    return []
+    if detection.batcher is None:
+        return []
+
+    detections = await detection.batcher.detect(frame, sensitivity)
+    for d in detections:
+        box = d["box"]
+        d["box"] = {
+            "x": box["x"] * width,
+            "y": box["y"] * height,
+            "width": box["width"] * width,
+            "height": box["height"] * height
+        }
+    return detections
@@ -0,0 +1,352 @@
+"""Prometheus-style metrics collectors and ``/metrics`` exposition.
+
+Collectors are cheap enough to leave on in production: each labelled child
+has its own small lock, so updates from different threads never contend on
+a shared one, and children are looked up with a single dict access.
+"""
+
+import abc
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self.value = value
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class _Metric(abc.ABC):
+    """Base for labelled metrics."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        if not self.labelnames:
+            self._default = self._child(())
+
+    @abc.abstractmethod
+    def _new_child(self):
+        """Create the child holding one label combination's value."""
+
+    def _child(self, key: tuple):
+        child = self._children.get(key)
+        if child is None:
+            # setdefault is atomic, so concurrent creators agree on one child
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def labels(self, *values) -> object:
+        """Get the child for a combination of label values."""
+        return self._child(tuple(str(v) for v in values))
+
+    def remove(self, *values):
+        """Drop the children whose leading label values are ``values``.
+
+        Used for labels naming short-lived things, like camera connections,
+        so their series do not accumulate for the life of the process.
+        """
+        prefix = tuple(str(v) for v in values)
+        for key in [k for k in list(self._children) if k[:len(prefix)] == prefix]:
+            self._children.pop(key, None)
+
+    @abc.abstractmethod
+    def collect(self) -> List[str]:
+        """Render the metric's exposition lines."""
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def collect(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the (unlabelled) value when metrics are scraped."""
+        self._function = function
+
+    def collect(self) -> List[str]:
+        if self._function is not None:
+            return self.header() + [f"{self.name} {_format_value(float(self._function()))}"]
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self) -> "_Timer":
+        """Time a block and observe its duration in seconds."""
+        return _Timer(self._default)
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(float(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: _HistogramChild):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return registry.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return registry.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# HTTP
+HTTP_REQUEST_DURATION = histogram(
+    "sentinel_http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"]
+)
+
+# Ingestion
+EVENTS_INGESTED = counter(
+    "sentinel_events_ingested_total", "Events stored by ingestion", ["device_id", "event_type"]
+)
+EVENT_BATCH_SIZE = histogram(
+    "sentinel_event_batch_size", "Events per ingestion batch",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+
+# Database
+DB_QUERIES = counter("sentinel_db_queries_total", "SQL statements executed", ["operation"])
+DB_QUERY_DURATION = histogram(
+    "sentinel_db_query_duration_seconds", "SQL statement execution time", ["operation"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+
+# Live stream
+WS_CONNECTIONS = gauge("sentinel_websocket_connections", "Open dashboard WebSocket connections")
+STREAM_SUBSCRIBERS = gauge("sentinel_stream_subscribers", "Open Server-Sent Events streams")
+STREAM_QUEUE_DEPTH = gauge("sentinel_stream_send_queue_depth", "Messages waiting in stream send queues")
+CAMERA_CONNECTIONS = gauge("sentinel_camera_connections", "Open camera WebSocket connections")
+
+# Push notifications
+PUSH_SENT = counter("sentinel_push_notifications_total", "Push notification deliveries", ["result"])
+PUSH_DURATION = histogram("sentinel_push_send_duration_seconds", "Time to deliver one push notification")
+
+# Camera processing
+CAMERA_FRAME_DURATION = histogram(
+    "sentinel_camera_frame_processing_seconds", "Time to process one camera frame"
+)
+
+
+def _operation(statement: str) -> str:
+    """Classify a SQL statement by its leading keyword."""
+    keyword = statement.lstrip()[:6].upper()
+    if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+        return keyword
+    return "OTHER"
+
+
+def instrument_engine(engine):
+    """Count and time every statement run through a SQLAlchemy engine."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        operation = _operation(statement)
+        DB_QUERIES.labels(operation).inc()
+        DB_QUERY_DURATION.labels(operation).observe(elapsed)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template, not raw path, to bound cardinality
+            route = scope.get("route")
+            if route is not None:
+                path = route.path
+            elif scope["path"].startswith("/static/"):
+                path = "/static"
+            else:
+                path = "unmatched"
+            HTTP_REQUEST_DURATION.labels(scope["method"], path, status[0]).observe(
+                time.perf_counter() - start
+            )
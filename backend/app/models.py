@@ -1,8 +1,10 @@
 """SQLAlchemy database models."""
 
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import Optional
+import json
 
 from .database import Base
 
@@ -42,9 +44,29 @@ class Employee(Base):
     attendance_records = relationship("Attendance", back_populates="employee")
 
 
+def parse_extra_data(extra_data: Optional[str]) -> dict:
+    """Decode an event's ``extra_data`` JSON, tolerating empty or invalid values."""
+    try:
+        data = json.loads(extra_data) if extra_data else {}
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def structured_attributes(extra_data: Optional[str]) -> dict:
+    """The ``bbox`` and ``attributes`` stored in ``extra_data``, where present."""
+    data = parse_extra_data(extra_data)
+    return {key: data[key] for key in ("bbox", "attributes") if isinstance(data.get(key), dict)}
+
+
 class Event(Base):
     """Security event record."""
     __tablename__ = "events"
+    __table_args__ = (
+        # Filtered /api/events queries, newest first
+        Index("ix_events_zone_timestamp", "zone", "timestamp"),
+        Index("ix_events_object_class_timestamp", "object_class", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     event_type = Column(String(50), nullable=False, index=True)
@@ -53,14 +75,27 @@ class Event(Base):
     device_id = Column(String(100), ForeignKey("devices.device_id"))
     employee_id = Column(String(50), ForeignKey("employees.employee_id"), nullable=True)
     license_plate = Column(String(20))
+    plate_key = Column(String(20), index=True)  # Confusable-folded plate, see plates.py
+    vehicle_status = Column(String(20), index=True)  # authorized/unauthorized/unknown
     duration = Column(Integer, default=0)  # Duration in milliseconds
-    confidence = Column(Float, default=0.0)
-    extra_data = Column(Text)  # JSON-encoded additional data
+    confidence = Column(Float, default=0.0, index=True)
+    zone = Column(String(50))  # Indexed with timestamp, see __table_args__
+    object_class = Column(String(50))
+    extra_data = Column(Text)  # JSON: bbox and attributes of ingested events, details of derived ones
+    snapshot_hash = Column(String(64))  # SHA-256 of the snapshot, see snapshots.py
     created_at = Column(Integer, default=lambda: int(datetime.now().timestamp()))
 
     device = relationship("Device", back_populates="events")
     employee = relationship("Employee", back_populates="events")
 
+    @property
+    def bbox(self) -> Optional[dict]:
+        return structured_attributes(self.extra_data).get("bbox")
+
+    @property
+    def attributes(self) -> Optional[dict]:
+        return structured_attributes(self.extra_data).get("attributes")
+
 
 class Attendance(Base):
     """Employee attendance record."""
@@ -89,3 +124,57 @@ class Vehicle(Base):
     is_authorized = Column(Boolean, default=False)
     notes = Column(Text)
     created_at = Column(Integer, default=lambda: int(datetime.now().timestamp()))
+
+
+class Clip(Base):
+    """Web camera footage recorded around an event."""
+    __tablename__ = "clips"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id"), index=True)
+    camera_id = Column(String(100), nullable=False)
+    path = Column(String(500), nullable=False)  # MJPEG file, see clips.py
+    start_time = Column(Float)  # Unix time of the first frame
+    end_time = Column(Float)  # Unix time of the last frame
+    frame_count = Column(Integer)
+    size_bytes = Column(Integer)
+    created_at = Column(Integer, default=lambda: int(datetime.now().timestamp()))
+
+
+class AlertRule(Base):
+    """Push alert condition matched against ingested events."""
+    __tablename__ = "alert_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(200), nullable=False)  # Notification title
+    message = Column(String(500))  # Body when the event has no plate or employee name
+    event_type = Column(String(50), nullable=False, index=True)
+    device_id = Column(String(100))  # Any device when null
+    start_time = Column(String(5))  # Local HH:MM, inclusive
+    end_time = Column(String(5))  # Local HH:MM, exclusive; wraps past midnight
+    license_plate = Column(String(20))  # Matched by confusable-folded key
+    employee_id = Column(String(50))
+    vehicle_status = Column(String(20))  # authorized/unauthorized/unknown
+    is_active = Column(Boolean, default=True)
+    created_at = Column(Integer, default=lambda: int(datetime.now().timestamp()))
+
+
+class Plate(Base):
+    """License plate seen in events, aggregated by confusable-folded key."""
+    __tablename__ = "plates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    plate_key = Column(String(20), unique=True, index=True, nullable=False)
+    plate = Column(String(20), nullable=False)  # Most recent plate as read by OCR
+    hit_count = Column(Integer, default=0)
+    first_seen = Column(Integer)  # Unix timestamp
+    last_seen = Column(Integer, index=True)  # Unix timestamp
+    last_device_id = Column(String(100))
+
+
+class PlateTrigram(Base):
+    """Trigram posting list for fuzzy plate search."""
+    __tablename__ = "plate_trigrams"
+
+    trigram = Column(String(3), primary_key=True)
+    plate_id = Column(Integer, ForeignKey("plates.id"), primary_key=True)
@@ -0,0 +1,151 @@
+"""Short-TTL render cache for dashboard pages."""
+
+import functools
+import hashlib
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional, Set
+
+from fastapi import Request, Response
+
+from .config import get_settings
+
+settings = get_settings()
+
+
+class CachedPage:
+    """A rendered page with its validators."""
+
+    __slots__ = ("body", "media_type", "etag", "last_modified", "expires", "tags")
+
+    def __init__(self, body: bytes, media_type: str, etag: str, last_modified: float,
+                 expires: float, tags: Set[str]):
+        self.body = body
+        self.media_type = media_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+        self.tags = tags
+
+    def headers(self) -> Dict[str, str]:
+        """Get the validator headers for this page."""
+        return {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": "no-cache"
+        }
+
+    def not_modified(self, request: Request) -> bool:
+        """Check whether the request's conditional headers match this page."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return self.etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(self.last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+
+        return False
+
+
+class PageCache:
+    """Caches rendered pages keyed on path and query string.
+
+    Pages expire after a short TTL so time-dependent content (today's
+    totals, online devices) stays current, and are dropped immediately when
+    data they depend on changes. Tags name those dependencies, e.g. a page
+    tagged ``events`` is dropped by ``invalidate("events")``.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._pages: "OrderedDict[str, CachedPage]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CachedPage]:
+        """Get a fresh cached page."""
+        page = self._pages.get(key)
+        if page is None or page.expires < time.monotonic():
+            return None
+        self._pages.move_to_end(key)
+        return page
+
+    def put(self, key: str, body: bytes, media_type: str, tags: Set[str]) -> CachedPage:
+        """Store a rendered page.
+
+        If the body is unchanged from the expired entry it replaces, the
+        original Last-Modified time is kept so clients still get 304s.
+        """
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        previous = self._pages.get(key)
+        if previous is not None and previous.etag == etag:
+            last_modified = previous.last_modified
+        else:
+            last_modified = time.time()
+
+        page = CachedPage(
+            body, media_type, etag, last_modified,
+            time.monotonic() + settings.page_cache_ttl_seconds, tags
+        )
+        self._pages[key] = page
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.max_entries:
+            self._pages.popitem(last=False)
+        return page
+
+    def invalidate(self, *tags: str):
+        """Drop all pages depending on any of the given tags."""
+        for key in [k for k, page in self._pages.items() if page.tags.intersection(tags)]:
+            del self._pages[key]
+
+    def clear(self):
+        """Drop all cached pages."""
+        self._pages.clear()
+
+
+# Global page cache instance
+page_cache = PageCache()
+
+
+def cache_key(request: Request) -> str:
+    """Build the cache key for a request from its path and sorted query."""
+    query = sorted(request.query_params.multi_items())
+    return request.url.path + "?" + "&".join(f"{k}={v}" for k, v in query)
+
+
+def cached_page(*tags: str):
+    """Cache a dashboard route's rendered HTML and answer conditional GETs.
+
+    The wrapped route must take ``request: Request``. Cache hits, including
+    304 responses, return before the route body runs, so no queries are
+    made.
+    """
+    tag_set = set(tags)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if settings.page_cache_ttl_seconds <= 0:
+                return await func(*args, **kwargs)
+
+            request: Request = kwargs["request"]
+            key = cache_key(request)
+
+            page = page_cache.get(key)
+            if page is None:
+                response = await func(*args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                page = page_cache.put(key, response.body, response.media_type, tag_set)
+
+            if page.not_modified(request):
+                return Response(status_code=304, headers=page.headers())
+
+            return Response(content=page.body, media_type=page.media_type, headers=page.headers())
+
+        return wrapper
+
+    return decorator
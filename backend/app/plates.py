@@ -0,0 +1,199 @@
+"""License plate normalization and fuzzy search.
+
+OCR on the devices regularly confuses look-alike characters (O/0, I/1, ...).
+Plates are therefore indexed by a *key* in which every confusable character
+is folded to one canonical form, so ``AB1O23`` and ``A81023`` share a key.
+Each distinct key is stored once in ``plates`` with hit counts, and its
+trigrams in ``plate_trigrams`` for approximate matching.
+"""
+
+import logging
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .models import Event, Plate, PlateTrigram
+
+logger = logging.getLogger(__name__)
+
+# Characters OCR commonly mistakes for each other, folded to one form
+CONFUSABLES = str.maketrans({
+    "O": "0", "Q": "0", "D": "0",
+    "I": "1", "L": "1",
+    "Z": "2",
+    "S": "5",
+    "G": "6",
+    "B": "8",
+})
+
+# Candidates fetched from the trigram index per requested result
+CANDIDATE_FACTOR = 5
+
+
+def normalize_plate(raw: Optional[str]) -> str:
+    """Uppercase a plate and strip everything but letters and digits."""
+    if not raw:
+        return ""
+    return "".join(ch for ch in raw.upper() if ch.isalnum())
+
+
+def plate_key(raw: Optional[str]) -> str:
+    """Get the confusable-folded search key for a plate."""
+    return normalize_plate(raw).translate(CONFUSABLES)
+
+
+def trigrams(key: str) -> Set[str]:
+    """Get the padded trigrams of a plate key."""
+    padded = f"^{key}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def record_plates(db: Session, events: List[Event]):
+    """Set ``plate_key`` on events and update the plate index for them.
+
+    Uses one lookup for all plates in the batch; new plates get their
+    trigrams inserted. Does not commit.
+    """
+    seen: Dict[str, List[Event]] = {}
+    for event in events:
+        key = plate_key(event.license_plate)
+        if not key:
+            continue
+        event.plate_key = key
+        seen.setdefault(key, []).append(event)
+
+    if not seen:
+        return
+
+    existing = {
+        p.plate_key: p
+        for p in db.query(Plate).filter(Plate.plate_key.in_(list(seen)))
+    }
+
+    # Insert unseen keys, skipping any a concurrent writer (such as the
+    # startup backfill) stored since the lookup, then load them like the rest
+    created = set()
+    missing = [key for key in seen if key not in existing]
+    if missing:
+        rows = []
+        for key in missing:
+            latest = max(seen[key], key=lambda e: e.timestamp)
+            rows.append({
+                "plate_key": key,
+                "plate": normalize_plate(latest.license_plate),
+                "hit_count": 0,
+                "first_seen": min(e.timestamp for e in seen[key]),
+                "last_seen": latest.timestamp,
+                "last_device_id": latest.device_id
+            })
+        created = set(db.execute(
+            sqlite_insert(Plate).values(rows)
+            .on_conflict_do_nothing(index_elements=["plate_key"])
+            .returning(Plate.plate_key)
+        ).scalars())
+        existing.update(
+            (p.plate_key, p) for p in db.query(Plate).filter(Plate.plate_key.in_(missing))
+        )
+
+    for key, key_events in seen.items():
+        latest = max(key_events, key=lambda e: e.timestamp)
+        first = min(e.timestamp for e in key_events)
+
+        plate = existing[key]
+        plate.first_seen = min(plate.first_seen or first, first)
+        if latest.timestamp >= (plate.last_seen or 0):
+            plate.last_seen = latest.timestamp
+            plate.plate = normalize_plate(latest.license_plate)
+            plate.last_device_id = latest.device_id
+        plate.hit_count += len(key_events)
+
+    if created:
+        db.add_all([
+            PlateTrigram(trigram=gram, plate_id=existing[key].id)
+            for key in created
+            for gram in trigrams(key)
+        ])
+
+
+def backfill_plate_index(db: Session, chunk_size: int = 1000) -> int:
+    """Index plates of events stored before the plate index existed."""
+    indexed = 0
+    while True:
+        events = db.query(Event).filter(
+            Event.plate_key.is_(None),
+            Event.license_plate.isnot(None),
+            Event.license_plate != ""
+        ).limit(chunk_size).all()
+
+        if not events:
+            break
+
+        record_plates(db, events)
+        # Plates that normalize to nothing still need a marker so they are
+        # not picked up again
+        for event in events:
+            if event.plate_key is None:
+                event.plate_key = ""
+        db.commit()
+        indexed += len(events)
+
+    if indexed:
+        logger.info(f"Indexed plates for {indexed} existing events")
+    return indexed
+
+
+def search_plates(db: Session, query: str, limit: int = 20, min_score: float = 0.3) -> List[dict]:
+    """Find plates matching ``query``, tolerant of OCR confusions.
+
+    Exact key matches rank first, then trigram similarity (Jaccard), then
+    hit count and recency. Queries shorter than three characters fall back
+    to an indexed prefix match on the key.
+    """
+    key = plate_key(query)
+    if not key:
+        return []
+
+    if len(key) < 3:
+        plates = db.query(Plate).filter(
+            Plate.plate_key >= key,
+            Plate.plate_key < key + "\uffff"
+        ).order_by(Plate.hit_count.desc()).limit(limit).all()
+        return [_result(p, key, 1.0 if p.plate_key == key else 0.0) for p in plates]
+
+    grams = trigrams(key)
+    shared = func.count(PlateTrigram.trigram)
+    candidates = db.query(PlateTrigram.plate_id, shared).filter(
+        PlateTrigram.trigram.in_(grams)
+    ).group_by(PlateTrigram.plate_id).order_by(shared.desc()).limit(limit * CANDIDATE_FACTOR).all()
+
+    if not candidates:
+        return []
+
+    shared_by_id = dict(candidates)
+    plates = db.query(Plate).filter(Plate.id.in_(list(shared_by_id))).all()
+
+    results = []
+    for plate in plates:
+        common = shared_by_id[plate.id]
+        score = common / (len(grams) + len(trigrams(plate.plate_key)) - common)
+        if plate.plate_key == key or score >= min_score:
+            results.append(_result(plate, key, score))
+
+    results.sort(key=lambda r: (r["exact"], r["score"], r["hit_count"], r["last_seen"] or 0), reverse=True)
+    return results[:limit]
+
+
+def _result(plate: Plate, key: str, score: float) -> dict:
+    """Build a search result for a plate."""
+    return {
+        "plate": plate.plate,
+        "plate_key": plate.plate_key,
+        "hit_count": plate.hit_count,
+        "first_seen": plate.first_seen,
+        "last_seen": plate.last_seen,
+        "last_device_id": plate.last_device_id,
+        "score": round(score, 3),
+        "exact": plate.plate_key == key
+    }
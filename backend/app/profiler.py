@@ -0,0 +1,227 @@
+"""Opt-in per-request SQL profiler with N+1 detection.
+
+When ``sql_profiling`` is enabled, every statement a request runs is
+recorded with its duration and parameter shape. Requests that repeat the
+same statement template many times are flagged as likely N+1 patterns, and
+slow SELECTs are kept with their parameters so their query plans can be
+shown. When disabled nothing is installed, so there is no overhead.
+"""
+
+import logging
+import re
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Paths never profiled (the debug endpoint itself and static files)
+EXCLUDED_PREFIXES = ("/api/debug/", "/static/")
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_template(statement: str) -> str:
+    """Normalize a statement so repeated queries compare equal.
+
+    Statements are already parameterized, so only whitespace and the
+    variable-length placeholder lists of IN clauses need folding.
+    """
+    return _IN_LIST.sub("(?, ...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """Describe bound parameters by type without recording their values."""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+class QueryRecord:
+    """One executed statement."""
+
+    __slots__ = ("statement", "duration", "shape", "parameters", "plan")
+
+    def __init__(self, statement: str, duration: float, shape: str, parameters: Any = None):
+        self.statement = statement
+        self.duration = duration
+        self.shape = shape
+        # Only kept for slow queries, to run EXPLAIN on demand
+        self.parameters = parameters
+        self.plan: Optional[List[str]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "statement": self.statement,
+            "duration_ms": round(self.duration * 1000, 3),
+            "parameters": self.shape
+        }
+
+
+class RequestProfile:
+    """Statements recorded for one request."""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.status = 0
+        self.queries: List[QueryRecord] = []
+
+    @property
+    def query_time(self) -> float:
+        return sum(q.duration for q in self.queries)
+
+    def repeated_templates(self) -> List[Dict[str, Any]]:
+        """Statement templates run at least ``sql_n_plus_one_threshold`` times."""
+        counts = Counter(statement_template(q.statement) for q in self.queries)
+        repeated = []
+        for template, count in counts.most_common():
+            if count < settings.sql_n_plus_one_threshold:
+                break
+            total = sum(q.duration for q in self.queries if statement_template(q.statement) == template)
+            repeated.append({
+                "template": template,
+                "count": count,
+                "total_ms": round(total * 1000, 3)
+            })
+        return repeated
+
+    def slow_queries(self) -> List[QueryRecord]:
+        threshold = settings.sql_slow_query_ms / 1000
+        return [q for q in self.queries if q.duration >= threshold]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "query_count": len(self.queries),
+            "query_time_ms": round(self.query_time * 1000, 3),
+            "n_plus_one": self.repeated_templates(),
+            "slow_queries": len(self.slow_queries())
+        }
+
+
+class SQLProfiler:
+    """Collects request profiles from SQLAlchemy cursor events."""
+
+    def __init__(self, history: int = 100):
+        self._current: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+        self.profiles: Deque[RequestProfile] = deque(maxlen=history)
+        self.engine = None
+
+    def install(self, engine):
+        """Attach cursor event hooks to an engine."""
+        self.engine = engine
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if self._current.get() is not None:
+            context._profile_start = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        profile = self._current.get()
+        start = getattr(context, "_profile_start", None)
+        if profile is None or start is None:
+            return
+        duration = time.perf_counter() - start
+        slow = duration * 1000 >= settings.sql_slow_query_ms and not executemany
+        profile.queries.append(QueryRecord(
+            statement, duration, parameter_shape(parameters, executemany),
+            parameters if slow else None
+        ))
+
+    def start(self, method: str, path: str):
+        """Begin profiling the current request."""
+        profile = RequestProfile(method, path)
+        return profile, self._current.set(profile)
+
+    def finish(self, profile: RequestProfile, token, status: int, duration: float):
+        """Stop profiling the current request and keep its profile."""
+        self._current.reset(token)
+        profile.status = status
+        profile.duration = duration
+        self.profiles.append(profile)
+
+        for repeated in profile.repeated_templates():
+            logger.warning(
+                f"Possible N+1 on {profile.method} {profile.path}: "
+                f"{repeated['count']} x {repeated['template'][:120]}"
+            )
+
+    def explain(self, query: QueryRecord) -> List[str]:
+        """Get the query plan of a slow SELECT, computed once on demand."""
+        if query.plan is not None:
+            return query.plan
+        if not query.statement.lstrip().upper().startswith("SELECT"):
+            query.plan = []
+            return query.plan
+
+        prefix = "EXPLAIN QUERY PLAN " if self.engine.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.exec_driver_sql(prefix + query.statement, query.parameters or ())
+                if self.engine.dialect.name == "sqlite":
+                    query.plan = [row[-1] for row in rows]
+                else:
+                    query.plan = [" ".join(str(v) for v in row) for row in rows]
+        except Exception as e:
+            query.plan = [f"EXPLAIN failed: {e}"]
+        return query.plan
+
+    def clear(self):
+        self.profiles.clear()
+
+
+# Global profiler instance
+profiler = SQLProfiler(settings.sql_profile_history)
+
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling each HTTP request's SQL.
+
+    Adds ``X-SQL-Queries`` and ``X-SQL-Time`` headers counting the
+    statements run before the response started.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXCLUDED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        profile, token = profiler.start(scope["method"], scope["path"])
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-sql-queries", str(len(profile.queries)).encode()))
+                headers.append((b"x-sql-time", f"{profile.query_time * 1000:.3f}ms".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.finish(profile, token, status[0], time.perf_counter() - start)
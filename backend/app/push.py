@@ -1,17 +1,18 @@
-"""Push notification service."""
+"""Push notification service.
+
+pywebpush and cryptography are imported on first use rather than at module
+import, since together they add noticeably to cold start time.
+"""
 
 import json
 import logging
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, Tuple
 from pathlib import Path
-
-from pywebpush import webpush, WebPushException
-from cryptography.hazmat.primitives.asymmetric import ec
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
 import base64
 
 from .config import get_settings
+from .metrics import PUSH_SENT, PUSH_DURATION
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -23,12 +24,19 @@ push_subscriptions: Dict[str, Dict[str, Any]] = {}
 VAPID_PRIVATE_KEY_PATH = Path("/tmp/vapid_private.pem")
 VAPID_PUBLIC_KEY_PATH = Path("/tmp/vapid_public.txt")
 
+# (private_key_pem, public_key_b64) once loaded from disk
+_vapid_keys: Optional[Tuple[str, str]] = None
+
 
 def generate_vapid_keys():
     """Generate VAPID key pair if not exists."""
     if VAPID_PRIVATE_KEY_PATH.exists() and VAPID_PUBLIC_KEY_PATH.exists():
         return
 
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.backends import default_backend
+
     # Generate EC key pair
     private_key = ec.generate_private_key(ec.SECP256R1(), default_backend())
 
@@ -55,16 +63,32 @@ def generate_vapid_keys():
     logger.info("Generated new VAPID keys")
 
 
+def load_vapid_keys() -> Tuple[str, str]:
+    """Get the VAPID key pair, generating it on first use."""
+    global _vapid_keys
+    if _vapid_keys is None:
+        generate_vapid_keys()
+        _vapid_keys = (
+            VAPID_PRIVATE_KEY_PATH.read_text().strip(),
+            VAPID_PUBLIC_KEY_PATH.read_text().strip()
+        )
+    return _vapid_keys
+
+
 def get_vapid_public_key() -> str:
     """Get the VAPID public key."""
-    generate_vapid_keys()
-    return VAPID_PUBLIC_KEY_PATH.read_text().strip()
+    return load_vapid_keys()[1]
 
 
 def get_vapid_private_key() -> str:
     """Get the VAPID private key."""
-    generate_vapid_keys()
-    return VAPID_PRIVATE_KEY_PATH.read_text().strip()
+    return load_vapid_keys()[0]
+
+
+def warm_up():
+    """Load VAPID keys and the push libraries ahead of the first push."""
+    load_vapid_keys()
+    import pywebpush  # noqa: F401
 
 
 def subscribe(subscription_info: Dict[str, Any], user_id: str = "anonymous") -> bool:
@@ -96,18 +120,22 @@ async def send_push_notification(
     body: str,
     url: str = "/",
     tag: str = "sentinel-alert",
-    event_id: Optional[int] = None
+    event_id: Optional[int] = None,
+    image: Optional[str] = None
 ):
     """Send push notification to all subscribers."""
     if not push_subscriptions:
         return
 
+    from pywebpush import webpush, WebPushException
+
     data = json.dumps({
         "title": title,
         "body": body,
         "url": url,
         "tag": tag,
-        "eventId": event_id
+        "eventId": event_id,
+        "image": image
     })
 
     vapid_claims = {
@@ -117,6 +145,7 @@ async def send_push_notification(
     failed_endpoints = []
 
     for endpoint, sub_data in push_subscriptions.items():
+        start = time.perf_counter()
         try:
             webpush(
                 subscription_info=sub_data["subscription"],
@@ -124,35 +153,43 @@ async def send_push_notification(
                 vapid_private_key=get_vapid_private_key(),
                 vapid_claims=vapid_claims
             )
+            PUSH_SENT.labels("success").inc()
             logger.debug(f"Push sent to {endpoint[:50]}...")
         except WebPushException as e:
             logger.error(f"Push failed: {e}")
             if e.response and e.response.status_code in (404, 410):
                 # Subscription expired or invalid
                 failed_endpoints.append(endpoint)
+                PUSH_SENT.labels("expired").inc()
+            else:
+                PUSH_SENT.labels("failure").inc()
         except Exception as e:
+            PUSH_SENT.labels("failure").inc()
             logger.error(f"Push error: {e}")
+        finally:
+            PUSH_DURATION.observe(time.perf_counter() - start)
 
     # Clean up invalid subscriptions
     for endpoint in failed_endpoints:
         unsubscribe(endpoint)
 
 
-async def send_alert_notification(event_type: str, details: str = "", event_id: int = None):
-    """Send alert notification for security events."""
-    alert_types = {
-        "UNKNOWN_FACE_DETECTED": ("Unknown Person Detected", "An unrecognized face was detected"),
-        "LOITERING_DETECTED": ("Loitering Alert", "Unusual activity detected"),
-        "VEHICLE_ENTERED": ("Vehicle Entered", "A vehicle has entered the premises"),
-    }
-
-    if event_type in alert_types:
-        title, default_body = alert_types[event_type]
-        body = details or default_body
-        await send_push_notification(
-            title=title,
-            body=body,
-            url=f"/events?highlight={event_id}" if event_id else "/events",
-            tag=f"alert-{event_type.lower()}",
-            event_id=event_id
-        )
+async def send_alert_notification(
+    title: str,
+    body: str,
+    event_id: Optional[int] = None,
+    tag: str = "sentinel-alert",
+    image: Optional[str] = None
+):
+    """Send alert notification for an event that triggered an alert rule.
+
+    ``image`` is a thumbnail URL; full snapshots are never pushed.
+    """
+    await send_push_notification(
+        title=title,
+        body=body,
+        url=f"/events?highlight={event_id}" if event_id else "/events",
+        tag=tag,
+        event_id=event_id,
+        image=image
+    )
@@ -0,0 +1,119 @@
+"""Per-device token-bucket rate limiting for event ingestion."""
+
+import logging
+import math
+import time
+from typing import Dict, Optional
+
+from .config import get_settings
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+INGEST_THROTTLED = counter(
+    "sentinel_ingest_throttled_total", "Event batches rejected by rate limiting", ["device_id"]
+)
+INGEST_DROPPED = counter(
+    "sentinel_ingest_dropped_events_total", "Events rejected before ingestion", ["device_id", "reason"]
+)
+
+
+class TokenBucket:
+    """Refills at ``rate`` tokens per second up to ``capacity``."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, amount: float) -> float:
+        """Take tokens if available.
+
+        Returns 0 on success, otherwise the seconds until enough tokens will
+        have accumulated (nothing is taken in that case).
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+
+class DeviceLimit:
+    """Rate limit state and rejection counts for one device."""
+
+    __slots__ = ("bucket", "throttled", "dropped")
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.throttled = 0  # Batches rejected with 429
+        self.dropped = 0  # Events in rejected batches
+
+
+class RateLimiter:
+    """Token buckets keyed by device, charged one token per event.
+
+    Buckets hold at least one maximum-size batch, so a device within its
+    sustained rate can always upload a full batch. State is per process.
+    """
+
+    def __init__(self):
+        self._devices: Dict[str, DeviceLimit] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ingest_rate_limit > 0
+
+    def _limit(self, device_id: str) -> DeviceLimit:
+        limit = self._devices.get(device_id)
+        if limit is None:
+            capacity = max(settings.ingest_burst, settings.ingest_max_batch_size)
+            limit = DeviceLimit(TokenBucket(settings.ingest_rate_limit, capacity))
+            self._devices[device_id] = limit
+        return limit
+
+    def check(self, device_id: str, events: int) -> Optional[int]:
+        """Charge a device for a batch.
+
+        Returns None if the batch is allowed, otherwise the Retry-After
+        delay in whole seconds.
+        """
+        if not self.enabled or events == 0:
+            return None
+
+        limit = self._limit(device_id)
+        wait = limit.bucket.take(events)
+        if wait == 0:
+            return None
+
+        limit.throttled += 1
+        limit.dropped += events
+        INGEST_THROTTLED.labels(device_id).inc()
+        INGEST_DROPPED.labels(device_id, "rate_limited").inc(events)
+        if limit.throttled == 1 or limit.throttled % 100 == 0:
+            logger.warning(f"Device {device_id} rate limited ({limit.throttled} batches so far)")
+        return max(1, math.ceil(wait))
+
+    def record_oversized(self, device_id: str, events: int):
+        """Count a batch rejected for exceeding the maximum batch size."""
+        limit = self._limit(device_id)
+        limit.dropped += events
+        INGEST_DROPPED.labels(device_id, "batch_too_large").inc(events)
+
+    def stats(self, device_id: str) -> Dict[str, int]:
+        """Get rejection counts for a device."""
+        limit = self._devices.get(device_id)
+        if limit is None:
+            return {"throttled": 0, "dropped": 0}
+        return {"throttled": limit.throttled, "dropped": limit.dropped}
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter()
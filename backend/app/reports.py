@@ -0,0 +1,271 @@
+"""Attendance reporting over date ranges."""
+
+import calendar
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .models import Attendance, Employee
+
+settings = get_settings()
+
+# Per-employee sums kept for each month, in this order
+STATS = ("days_present", "workdays_present", "seconds", "late_arrivals")
+
+UNASSIGNED_DEPARTMENT = "Unassigned"
+
+# (first_day, last_day, is_whole_month)
+Segment = Tuple[date, date, bool]
+
+
+def month_segments(start: date, end: date) -> List[Segment]:
+    """Split an inclusive date range at month boundaries."""
+    segments = []
+    current = start
+    while current <= end:
+        last_day = date(current.year, current.month, calendar.monthrange(current.year, current.month)[1])
+        segment_end = min(last_day, end)
+        segments.append((current, segment_end, current.day == 1 and segment_end == last_day))
+        current = segment_end + timedelta(days=1)
+    return segments
+
+
+def late_threshold() -> int:
+    """Seconds after local midnight past which a check-in is late."""
+    hours, minutes = (int(part) for part in settings.attendance_workday_start.split(":"))
+    return hours * 3600 + (minutes + settings.attendance_late_grace_minutes) * 60
+
+
+def local_midnight(day: str) -> int:
+    """Unix time of local midnight on a YYYY-MM-DD date."""
+    return int(datetime.strptime(day, "%Y-%m-%d").timestamp())
+
+
+class MonthlySummaryCache:
+    """Per-employee attendance sums of closed months.
+
+    A month is closed once it has ended, after which its attendance is
+    not expected to change, so its sums are computed once and reused by
+    every report overlapping it. Closed months are cached for the life of
+    the process; nothing in the server edits past attendance, so after
+    correcting it directly in the database, restart to see it in reports.
+    """
+
+    def __init__(self, max_months: int = 120):
+        self.max_months = max_months
+        self._months: "OrderedDict[tuple, Dict[str, np.ndarray]]" = OrderedDict()
+
+    @staticmethod
+    def _key(month: date) -> tuple:
+        # Late arrivals depend on settings, so they are part of the key
+        return (month.strftime("%Y-%m"), late_threshold(), settings.attendance_workdays)
+
+    def get(self, month: date) -> Optional[Dict[str, np.ndarray]]:
+        key = self._key(month)
+        sums = self._months.get(key)
+        if sums is not None:
+            self._months.move_to_end(key)
+        return sums
+
+    def put(self, month: date, sums: Dict[str, np.ndarray]):
+        key = self._key(month)
+        self._months[key] = sums
+        self._months.move_to_end(key)
+        while len(self._months) > self.max_months:
+            self._months.popitem(last=False)
+
+    def clear(self):
+        self._months.clear()
+
+
+# Global monthly summary cache instance
+monthly_cache = MonthlySummaryCache()
+
+
+def query_daily(db: Session, ranges: List[Tuple[date, date]]) -> List[tuple]:
+    """Get (employee_id, date, first_check_in, seconds) per employee and day.
+
+    One GROUP BY query over all requested date ranges. Time worked falls
+    back to check-out minus check-in where ``total_duration`` is unset.
+    """
+    if not ranges:
+        return []
+
+    seconds = case(
+        (Attendance.total_duration > 0, Attendance.total_duration),
+        (Attendance.check_out_time.isnot(None), Attendance.check_out_time - Attendance.check_in_time),
+        else_=0
+    )
+    return db.query(
+        Attendance.employee_id,
+        Attendance.date,
+        func.min(Attendance.check_in_time),
+        func.sum(seconds)
+    ).filter(
+        Attendance.check_in_time.isnot(None),
+        or_(*[Attendance.date.between(lo.isoformat(), hi.isoformat()) for lo, hi in ranges])
+    ).group_by(Attendance.employee_id, Attendance.date).all()
+
+
+def summarize_segments(rows: List[tuple], segments: List[Segment]) -> List[Dict[str, np.ndarray]]:
+    """Sum daily rows per segment and employee in one vectorized pass."""
+    if not rows:
+        return [{} for _ in segments]
+
+    employee_ids, employee_index = np.unique(np.array([r[0] for r in rows]), return_inverse=True)
+    days = np.array([r[1] for r in rows])
+    check_in = np.array([r[2] for r in rows], dtype=np.int64)
+    seconds = np.array([r[3] or 0 for r in rows], dtype=np.float64)
+
+    unique_days, day_index = np.unique(days, return_inverse=True)
+    midnight = np.array([local_midnight(d) for d in unique_days], dtype=np.int64)
+    late = (check_in - midnight[day_index]) > late_threshold()
+
+    dates = unique_days.astype("datetime64[D]")[day_index]
+    workday = np.is_busday(dates, weekmask=settings.attendance_workdays)
+
+    segment_starts = np.array([s[0].isoformat() for s in segments], dtype="datetime64[D]")
+    segment_index = np.searchsorted(segment_starts, dates, side="right") - 1
+
+    n_segments, n_employees = len(segments), len(employee_ids)
+    bins = segment_index * n_employees + employee_index
+    sums = np.stack([
+        np.bincount(bins, weights=weights, minlength=n_segments * n_employees)
+        for weights in (np.ones(len(rows)), workday, seconds, late)
+    ]).reshape(len(STATS), n_segments, n_employees)
+
+    results = []
+    for s in range(n_segments):
+        present = np.nonzero(sums[0, s])[0]
+        results.append({employee_ids[e]: sums[:, s, e] for e in present})
+    return results
+
+
+def attendance_sums(db: Session, start: date, end: date) -> Dict[str, np.ndarray]:
+    """Get per-employee sums over a range, reusing cached closed months."""
+    current_month = date.today().replace(day=1)
+    segments = month_segments(start, end)
+
+    cached: List[Optional[Dict[str, np.ndarray]]] = [
+        monthly_cache.get(s[0]) if s[2] and s[1] < current_month else None
+        for s in segments
+    ]
+    missing = [s for s, sums in zip(segments, cached) if sums is None]
+
+    computed = iter(summarize_segments(query_daily(db, [(s[0], s[1]) for s in missing]), missing))
+    totals: Dict[str, np.ndarray] = {}
+    for segment, sums in zip(segments, cached):
+        if sums is None:
+            sums = next(computed)
+            if segment[2] and segment[1] < current_month:
+                monthly_cache.put(segment[0], sums)
+        for employee_id, values in sums.items():
+            if employee_id in totals:
+                totals[employee_id] = totals[employee_id] + values
+            else:
+                totals[employee_id] = values
+    return totals
+
+
+def _hours(seconds: float) -> float:
+    return round(float(seconds) / 3600, 2)
+
+
+def build_report(db: Session, start: date, end: date, department: Optional[str] = None) -> Dict[str, Any]:
+    """Build per-employee and per-department attendance totals.
+
+    Absence days count workdays from the later of ``start`` and the
+    employee's creation date up to ``end`` (or today), minus workdays with
+    a check-in. Inactive employees are listed only if they attended.
+    """
+    totals = attendance_sums(db, start, end)
+
+    query = db.query(
+        Employee.employee_id, Employee.name, Employee.department,
+        Employee.is_active, Employee.created_at
+    )
+    if department:
+        query = query.filter(Employee.department == department)
+    employees = [e for e in query.order_by(Employee.name) if e.is_active or e.employee_id in totals]
+
+    absence_end = min(end, date.today()) + timedelta(days=1)
+    workdays = int(np.busday_count(
+        np.datetime64(start.isoformat()), np.datetime64((end + timedelta(days=1)).isoformat()),
+        weekmask=settings.attendance_workdays
+    ))
+
+    if not employees:
+        return {
+            "start_date": start.isoformat(), "end_date": end.isoformat(), "workdays": workdays,
+            "employees": [], "departments": []
+        }
+
+    zero = np.zeros(len(STATS))
+    sums = np.array([totals.get(e.employee_id, zero) for e in employees])
+    active = np.array([bool(e.is_active) for e in employees])
+
+    created = np.array([
+        date.fromtimestamp(e.created_at) if e.created_at else start for e in employees
+    ], dtype="datetime64[D]")
+    begin = np.maximum(created, np.datetime64(start.isoformat()))
+    expected = np.busday_count(np.minimum(begin, np.datetime64(absence_end.isoformat())),
+                               np.datetime64(absence_end.isoformat()),
+                               weekmask=settings.attendance_workdays)
+    absences = np.where(active, np.maximum(expected - sums[:, 1], 0), 0)
+
+    days_present, seconds, late = sums[:, 0], sums[:, 2], sums[:, 3]
+    average = np.divide(seconds, days_present, out=np.zeros(len(employees)), where=days_present > 0)
+
+    employee_rows = [
+        {
+            "employee_id": e.employee_id,
+            "name": e.name,
+            "department": e.department,
+            "days_present": int(days_present[i]),
+            "absence_days": int(absences[i]),
+            "late_arrivals": int(late[i]),
+            "total_hours": _hours(seconds[i]),
+            "average_hours": _hours(average[i])
+        }
+        for i, e in enumerate(employees)
+    ]
+
+    departments, department_index = np.unique(
+        np.array([e.department or UNASSIGNED_DEPARTMENT for e in employees]), return_inverse=True
+    )
+
+    def per_department(values: np.ndarray) -> np.ndarray:
+        return np.bincount(department_index, weights=values, minlength=len(departments))
+
+    dept_employees = per_department(np.ones(len(employees)))
+    dept_days = per_department(days_present)
+    dept_seconds = per_department(seconds)
+    dept_absences = per_department(absences)
+    dept_late = per_department(late)
+    dept_average = np.divide(dept_seconds, dept_days, out=np.zeros(len(departments)), where=dept_days > 0)
+
+    department_rows = [
+        {
+            "department": str(name),
+            "employees": int(dept_employees[i]),
+            "days_present": int(dept_days[i]),
+            "absence_days": int(dept_absences[i]),
+            "late_arrivals": int(dept_late[i]),
+            "total_hours": _hours(dept_seconds[i]),
+            "average_hours": _hours(dept_average[i])
+        }
+        for i, name in enumerate(departments)
+    ]
+
+    return {
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "workdays": workdays,
+        "employees": employee_rows,
+        "departments": department_rows
+    }
@@ -0,0 +1,218 @@
+"""Event retention, archival and compaction.
+
+Events older than ``retention_days`` are moved out of the hot ``events``
+table into gzip-compressed NDJSON files partitioned by UTC day::
+
+    <archive_dir>/YYYY/MM/events-YYYY-MM-DD.ndjson.gz
+
+Each archival chunk is appended as a new gzip member, so partitions can be
+extended without rewriting them. Archived events stay readable through
+``iter_archived_events``, which backs the cold path of ``/api/events``.
+
+The same pass deletes web camera clips older than ``clip_retention_days``.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import delete, select
+
+from .clips import purge_clips
+from .config import get_settings
+from .database import SessionLocal, engine
+from .models import Event
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SECONDS_PER_DAY = 86400
+
+
+def archive_root() -> Path:
+    """Get the root directory for archive partitions."""
+    return Path(settings.archive_dir)
+
+
+def partition_path(day: int) -> Path:
+    """Get the archive file for a UTC day number (timestamp // 86400)."""
+    date = datetime.fromtimestamp(day * SECONDS_PER_DAY, tz=timezone.utc)
+    return archive_root() / date.strftime("%Y") / date.strftime("%m") / f"events-{date:%Y-%m-%d}.ndjson.gz"
+
+
+def partition_day(path: Path) -> int:
+    """Get the UTC day number for an archive file name."""
+    date = datetime.strptime(path.name[len("events-"):-len(".ndjson.gz")], "%Y-%m-%d")
+    return int(date.replace(tzinfo=timezone.utc).timestamp()) // SECONDS_PER_DAY
+
+
+def write_partitions(rows: List[Dict]) -> None:
+    """Append archived rows to their day partitions."""
+    by_day: Dict[int, List[str]] = {}
+    for row in rows:
+        by_day.setdefault(row["timestamp"] // SECONDS_PER_DAY, []).append(json.dumps(row))
+
+    for day, lines in by_day.items():
+        path = partition_path(day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def archive_old_events(cutoff: int, chunk_size: int) -> int:
+    """Move events older than ``cutoff`` to the archive in bounded chunks.
+
+    Each chunk is written to disk before it is deleted and committed on its
+    own, so the SQLite write lock is only held briefly and a crash can at
+    worst leave a chunk duplicated in the archive, never lost.
+    """
+    table = Event.__table__
+    archived = 0
+
+    while True:
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(table)
+                .where(table.c.timestamp < cutoff)
+                .order_by(table.c.id)
+                .limit(chunk_size)
+            ).mappings().all()
+
+            if not rows:
+                break
+
+            rows = [dict(row) for row in rows]
+            write_partitions(rows)
+
+            max_id = rows[-1]["id"]
+            db.execute(
+                delete(table).where(table.c.timestamp < cutoff, table.c.id <= max_id)
+            )
+            db.commit()
+            archived += len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if len(rows) < chunk_size:
+            break
+
+    return archived
+
+
+def compact_database() -> None:
+    """Return free pages to the filesystem with an incremental vacuum.
+
+    Databases created before incremental auto-vacuum was enabled need one
+    full VACUUM to switch modes; after that only freed pages are touched.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        mode = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+        if mode != 2:
+            logger.info("Switching database to incremental auto-vacuum (one-time VACUUM)")
+            conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.exec_driver_sql("VACUUM")
+        else:
+            conn.exec_driver_sql("PRAGMA incremental_vacuum")
+
+
+def run_retention(now: Optional[int] = None) -> int:
+    """Apply the retention policy once and return the number of archived events."""
+    now = now or int(datetime.now().timestamp())
+
+    if settings.clip_retention_days > 0:
+        purged = purge_clips(now - settings.clip_retention_days * SECONDS_PER_DAY, settings.retention_chunk_size)
+        if purged:
+            logger.info(f"Deleted {purged} clips older than {settings.clip_retention_days} days")
+
+    if settings.retention_days <= 0:
+        return 0
+
+    cutoff = now - settings.retention_days * SECONDS_PER_DAY
+
+    archived = archive_old_events(cutoff, settings.retention_chunk_size)
+    if archived:
+        logger.info(f"Archived {archived} events older than {cutoff}")
+        compact_database()
+
+    return archived
+
+
+async def retention_loop():
+    """Run the retention policy periodically in a worker thread."""
+    while True:
+        try:
+            await asyncio.to_thread(run_retention)
+        except Exception as e:
+            logger.error(f"Retention run failed: {e}")
+        await asyncio.sleep(settings.retention_interval_seconds)
+
+
+def iter_archived_events(
+    event_type: Optional[str] = None,
+    device_id: Optional[str] = None,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+    min_confidence: Optional[float] = None,
+    zone: Optional[str] = None,
+    object_class: Optional[str] = None
+) -> Iterator[Dict]:
+    """Yield archived events newest first, applying the same filters as the hot path.
+
+    Only partitions overlapping the requested range are opened, and only one
+    day is held in memory at a time.
+    """
+    root = archive_root()
+    if not root.exists():
+        return
+
+    first_day = start_time // SECONDS_PER_DAY if start_time else None
+    last_day = end_time // SECONDS_PER_DAY if end_time else None
+
+    partitions = []
+    for path in root.glob("*/*/events-*.ndjson.gz"):
+        day = partition_day(path)
+        if first_day is not None and day < first_day:
+            continue
+        if last_day is not None and day > last_day:
+            continue
+        partitions.append((day, path))
+
+    for _, path in sorted(partitions, reverse=True):
+        events = []
+        seen_ids = set()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                event = json.loads(line)
+                if event["id"] in seen_ids:
+                    continue
+                if event_type and event["event_type"] != event_type:
+                    continue
+                if device_id and event["device_id"] != device_id:
+                    continue
+                if start_time and event["timestamp"] < start_time:
+                    continue
+                if end_time and event["timestamp"] > end_time:
+                    continue
+                # Events archived before these columns existed lack them
+                if min_confidence is not None and (event.get("confidence") or 0.0) < min_confidence:
+                    continue
+                if zone and event.get("zone") != zone:
+                    continue
+                if object_class and event.get("object_class") != object_class:
+                    continue
+                seen_ids.add(event["id"])
+                events.append(event)
+
+        events.sort(key=lambda e: (e["timestamp"], e["id"]), reverse=True)
+        yield from events
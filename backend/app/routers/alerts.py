@@ -0,0 +1,105 @@
+"""Alert rules API router."""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+
+from ..alerts import alert_rules
+from ..database import get_db
+from ..models import AlertRule
+from ..plates import normalize_plate
+from ..schemas import AlertRuleCreate, AlertRuleUpdate, AlertRuleInfo
+
+router = APIRouter()
+
+# Fields a rule cannot be saved without
+REQUIRED_FIELDS = ("name", "event_type")
+
+
+def get_rule(db: Session, rule_id: int) -> AlertRule:
+    rule = db.query(AlertRule).filter(AlertRule.id == rule_id).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Alert rule not found")
+    return rule
+
+
+@router.get("/alerts/rules", response_model=List[AlertRuleInfo])
+async def get_alert_rules(
+    db: Session = Depends(get_db)
+):
+    """Get all alert rules."""
+    return db.query(AlertRule).order_by(AlertRule.event_type, AlertRule.id).all()
+
+
+@router.post("/alerts/rules", response_model=AlertRuleInfo)
+async def create_alert_rule(
+    rule: AlertRuleCreate,
+    db: Session = Depends(get_db)
+):
+    """Create an alert rule.
+
+    A rule matches events of its ``event_type``; every other predicate left
+    unset matches anything. ``start_time``/``end_time`` restrict it to a
+    local time-of-day window, which may wrap past midnight.
+    """
+    values = rule.model_dump()
+    if values["license_plate"]:
+        values["license_plate"] = normalize_plate(values["license_plate"])
+
+    db_rule = AlertRule(**values)
+    db.add(db_rule)
+    db.commit()
+    db.refresh(db_rule)
+    alert_rules.invalidate()
+
+    return db_rule
+
+
+@router.get("/alerts/rules/{rule_id}", response_model=AlertRuleInfo)
+async def get_alert_rule(
+    rule_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get a single alert rule."""
+    return get_rule(db, rule_id)
+
+
+@router.put("/alerts/rules/{rule_id}", response_model=AlertRuleInfo)
+async def update_alert_rule(
+    rule_id: int,
+    update: AlertRuleUpdate,
+    db: Session = Depends(get_db)
+):
+    """Update an alert rule. Predicates explicitly set to null are cleared."""
+    rule = get_rule(db, rule_id)
+
+    values = update.model_dump(exclude_unset=True)
+    for field in REQUIRED_FIELDS:
+        if field in values and values[field] is None:
+            raise HTTPException(status_code=400, detail=f"{field} cannot be null")
+    if values.get("license_plate"):
+        values["license_plate"] = normalize_plate(values["license_plate"])
+
+    for field, value in values.items():
+        setattr(rule, field, value)
+
+    db.commit()
+    db.refresh(rule)
+    alert_rules.invalidate()
+
+    return rule
+
+
+@router.delete("/alerts/rules/{rule_id}")
+async def delete_alert_rule(
+    rule_id: int,
+    db: Session = Depends(get_db)
+):
+    """Delete an alert rule."""
+    rule = get_rule(db, rule_id)
+
+    db.delete(rule)
+    db.commit()
+    alert_rules.invalidate()
+
+    return {"success": True, "message": "Alert rule deleted"}
@@ -0,0 +1,60 @@
+"""Analytics API router."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+
+from ..database import get_db
+from ..analytics import BUCKET_SECONDS, timeseries_cache
+from ..schemas import TimeseriesPoint, TimeseriesResponse
+
+router = APIRouter()
+
+# Upper bound on buckets per request to keep responses bounded
+MAX_BUCKETS = 10000
+
+
+@router.get("/analytics/timeseries", response_model=TimeseriesResponse)
+async def get_timeseries(
+    bucket: str = Query("hour", pattern="^(minute|hour|day)$"),
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+    event_type: Optional[str] = None,
+    device_id: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get event counts per time bucket, event type and device.
+
+    Buckets are aligned to multiples of the bucket size in Unix time (UTC).
+    Defaults to the last 24 buckets.
+    """
+    size = BUCKET_SECONDS[bucket]
+    now = int(datetime.now().timestamp())
+
+    if end_time is None:
+        end_time = now
+    if start_time is None:
+        start_time = end_time - 23 * size
+
+    if start_time > end_time:
+        raise HTTPException(status_code=400, detail="start_time must not be after end_time")
+    if (end_time - start_time) // size >= MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Range exceeds {MAX_BUCKETS} buckets")
+
+    points = timeseries_cache.get_points(
+        db, size, start_time, end_time, now,
+        event_type=event_type,
+        device_id=device_id
+    )
+
+    return TimeseriesResponse(
+        bucket=bucket,
+        bucket_seconds=size,
+        start_time=start_time // size * size,
+        end_time=end_time // size * size + size,
+        points=[
+            TimeseriesPoint(bucket_start=b, event_type=t, device_id=d, count=c)
+            for b, t, d, c in points
+        ]
+    )
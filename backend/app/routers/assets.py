@@ -0,0 +1,33 @@
+"""Static assets router."""
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from ..assets import asset_store, IMMUTABLE
+
+router = APIRouter()
+
+
+@router.api_route("/static/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_static_asset(path: str, request: Request):
+    """Serve a static file, precompressed when the client accepts it.
+
+    Fingerprinted URLs are cached forever; plain URLs are revalidated.
+    """
+    asset, fingerprinted = asset_store.lookup(path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    headers = {
+        "ETag": asset.etag,
+        "Cache-Control": IMMUTABLE if fingerprinted else "no-cache"
+    }
+    if asset.encoded:
+        headers["Vary"] = "Accept-Encoding"
+
+    if request.headers.get("if-none-match") == asset.etag:
+        return Response(status_code=304, headers=headers)
+
+    body, encoding = asset.body(request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=asset.media_type, headers=headers)
@@ -0,0 +1,19 @@
+"""Web cameras API router."""
+
+from fastapi import APIRouter
+
+from .. import detection
+from ..motion import motion_gates
+from ..scheduler import detection_scheduler
+
+router = APIRouter()
+
+
+@router.get("/cameras/stats")
+async def get_camera_stats():
+    """Get per-camera detection throughput, queue waits, drops and motion skipping."""
+    stats = detection_scheduler.stats()
+    detection_cpu = detection.batcher.cpu_per_frame if detection.batcher is not None else 0.0
+    stats["detection_cpu_ms_per_frame"] = round(detection_cpu * 1000, 3)
+    stats["motion"] = motion_gates.stats(detection_cpu)
+    return stats
@@ -0,0 +1,40 @@
+"""Event clips API router."""
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from pathlib import Path
+from typing import List
+
+from ..database import get_db
+from ..models import Clip
+from ..schemas import ClipInfo
+
+router = APIRouter()
+
+
+@router.get("/events/{event_id}/clips", response_model=List[ClipInfo])
+async def get_event_clips(
+    event_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get clips recorded around an event."""
+    return db.query(Clip).filter(Clip.event_id == event_id).order_by(Clip.start_time).all()
+
+
+@router.get("/clips/{clip_id}")
+async def get_clip(
+    clip_id: int,
+    db: Session = Depends(get_db)
+):
+    """Download a clip as MJPEG (concatenated JPEG frames)."""
+    clip = db.query(Clip).filter(Clip.id == clip_id).first()
+
+    if not clip or not Path(clip.path).exists():
+        raise HTTPException(status_code=404, detail="Clip not found")
+
+    return FileResponse(
+        clip.path,
+        media_type="video/x-motion-jpeg",
+        filename=Path(clip.path).name
+    )
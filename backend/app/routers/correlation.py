@@ -0,0 +1,84 @@
+"""Correlation API router."""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+
+from ..database import get_db
+from ..correlation import CorrelationEngine, DERIVED_EVENT_TYPES, correlator
+from ..debounce import event_seconds
+from ..config import get_settings
+from ..models import Event
+
+router = APIRouter()
+settings = get_settings()
+
+# Derived events returned by a replay; totals are always complete
+MAX_REPLAY_RESULTS = 1000
+
+
+@router.get("/correlation/stats")
+async def get_correlation_stats():
+    """Get window sizes of the live correlation engine."""
+    return {"enabled": settings.correlation_enabled, **correlator.stats()}
+
+
+@router.get("/correlation/replay")
+def replay_correlation(
+    start_time: int,
+    end_time: Optional[int] = None,
+    transit_window: float = Query(None, gt=0),
+    tailgate_window: float = Query(None, gt=0),
+    overstay_seconds: float = Query(None, gt=0),
+    limit: int = Query(100, ge=0, le=MAX_REPLAY_RESULTS),
+    db: Session = Depends(get_db)
+):
+    """Run a fresh correlation engine over stored events, for tuning.
+
+    Window parameters default to the live settings. Nothing is stored;
+    the derived events are returned with per-type totals. The scan runs
+    in the threadpool, so long ranges do not block the event loop.
+    """
+    if end_time is None:
+        end_time = int(datetime.now().timestamp())
+
+    engine = CorrelationEngine(
+        transit_window or settings.correlation_transit_window_seconds,
+        tailgate_window or settings.correlation_tailgate_window_seconds,
+        overstay_seconds or settings.correlation_overstay_seconds,
+        settings.correlation_max_keys
+    )
+
+    query = select(Event).where(
+        Event.timestamp >= start_time,
+        Event.timestamp <= end_time,
+        Event.event_type.notin_(DERIVED_EVENT_TYPES)
+    ).order_by(Event.timestamp, Event.id).execution_options(yield_per=1000)
+
+    totals = {event_type: 0 for event_type in sorted(DERIVED_EVENT_TYPES)}
+    results = []
+    processed = 0
+
+    def collect(derived):
+        for item in derived:
+            totals[item.event_type] += 1
+            if len(results) < limit:
+                results.append(item.to_dict())
+
+    for event in db.execute(query).scalars():
+        processed += 1
+        collect(engine.process(event))
+    collect(engine.advance(event_seconds(end_time)))
+
+    return {
+        "events_processed": processed,
+        "parameters": {
+            "transit_window": engine.transit_window,
+            "tailgate_window": engine.tailgate_window,
+            "overstay_seconds": engine.overstay_seconds
+        },
+        "totals": totals,
+        "derived": results
+    }
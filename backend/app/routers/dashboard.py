@@ -6,13 +6,19 @@ from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from ..database import get_db
 from ..models import Event, Employee, Device, Attendance
+from ..liveness import liveness
+from ..page_cache import cached_page
+from ..ratelimit import rate_limiter
+from ..snapshots import thumbnail_url
+from ..assets import static_url
 
 router = APIRouter()
 templates = Jinja2Templates(directory=str(Path(__file__).parent.parent / "templates"))
+templates.env.globals["static_url"] = static_url
 
 
 def format_timestamp(timestamp: int) -> str:
@@ -46,6 +52,7 @@ def format_duration(ms: int) -> str:
 
 
 @router.get("/", response_class=HTMLResponse)
+@cached_page("events", "devices", "employees", "attendance")
 async def dashboard(
     request: Request,
     db: Session = Depends(get_db)
@@ -67,12 +74,11 @@ async def dashboard(
         Event.event_type == "VEHICLE_ENTERED"
     ).count()
 
-    # Active devices (seen in last hour)
-    hour_ago = int((datetime.now() - timedelta(hours=1)).timestamp())
-    active_devices = db.query(Device).filter(
-        Device.is_active == True,
-        Device.last_seen >= hour_ago
-    ).count()
+    # Active devices (currently online)
+    active_devices = sum(
+        1 for (device_id,) in db.query(Device.device_id).filter(Device.is_active == True)
+        if liveness.is_online(device_id)
+    )
 
     # Employees present today
     today_str = datetime.now().strftime("%Y-%m-%d")
@@ -104,7 +110,8 @@ async def dashboard(
             "formatted_time": format_timestamp(event.timestamp),
             "employee_name": employee_name,
             "license_plate": event.license_plate,
-            "duration": format_duration(event.duration) if event.duration else None
+            "duration": format_duration(event.duration) if event.duration else None,
+            "thumbnail_url": thumbnail_url(event.snapshot_hash) if event.snapshot_hash else None
         })
 
     return templates.TemplateResponse("dashboard.html", {
@@ -122,6 +129,7 @@ async def dashboard(
 
 
 @router.get("/attendance", response_class=HTMLResponse)
+@cached_page("employees", "attendance")
 async def attendance_page(
     request: Request,
     date: str = Query(None),
@@ -131,17 +139,15 @@ async def attendance_page(
     if not date:
         date = datetime.now().strftime("%Y-%m-%d")
 
-    # Get all attendance records for the date
-    records = db.query(Attendance).filter(
+    # Get all attendance records for the date with their employees
+    records = db.query(Attendance, Employee).outerjoin(
+        Employee, Employee.employee_id == Attendance.employee_id
+    ).filter(
         Attendance.date == date
     ).all()
 
     attendance_list = []
-    for record in records:
-        emp = db.query(Employee).filter(
-            Employee.employee_id == record.employee_id
-        ).first()
-
+    for record, emp in records:
         attendance_list.append({
             "employee_id": record.employee_id,
             "employee_name": emp.name if emp else "Unknown",
@@ -151,11 +157,13 @@ async def attendance_page(
             "duration": format_duration(record.total_duration * 1000) if record.total_duration else "In progress"
         })
 
-    # Get employees who haven't checked in
-    checked_in_ids = [r.employee_id for r in records]
-    absent = db.query(Employee).filter(
+    # Get employees who haven't checked in (anti-join rather than NOT IN)
+    absent = db.query(Employee).outerjoin(
+        Attendance,
+        (Attendance.employee_id == Employee.employee_id) & (Attendance.date == date)
+    ).filter(
         Employee.is_active == True,
-        ~Employee.employee_id.in_(checked_in_ids) if checked_in_ids else True
+        Attendance.id.is_(None)
     ).all()
 
     return templates.TemplateResponse("attendance.html", {
@@ -168,6 +176,7 @@ async def attendance_page(
 
 
 @router.get("/events", response_class=HTMLResponse)
+@cached_page("events", "employees")
 async def events_page(
     request: Request,
     event_type: str = Query(None),
@@ -204,7 +213,8 @@ async def events_page(
             "employee_name": employee_name,
             "license_plate": event.license_plate,
             "duration": format_duration(event.duration) if event.duration else None,
-            "device_id": event.device_id
+            "device_id": event.device_id,
+            "thumbnail_url": thumbnail_url(event.snapshot_hash) if event.snapshot_hash else None
         })
 
     # Get event types for filter
@@ -228,6 +238,7 @@ async def camera_page(request: Request):
 
 
 @router.get("/devices", response_class=HTMLResponse)
+@cached_page("devices")
 async def devices_page(
     request: Request,
     db: Session = Depends(get_db)
@@ -235,11 +246,10 @@ async def devices_page(
     """Devices management page."""
     devices = db.query(Device).order_by(Device.created_at.desc()).all()
 
-    hour_ago = int((datetime.now() - timedelta(hours=1)).timestamp())
-
     devices_list = []
     for device in devices:
-        is_online = device.last_seen and device.last_seen >= hour_ago
+        is_online = device.is_active and liveness.is_online(device.device_id)
+        last_seen = liveness.last_seen(device.device_id, device.last_seen)
 
         devices_list.append({
             "device_id": device.device_id,
@@ -248,8 +258,9 @@ async def devices_page(
             "os_version": device.os_version,
             "is_active": device.is_active,
             "is_online": is_online,
-            "last_seen": format_timestamp(device.last_seen) if device.last_seen else "Never",
-            "last_seen_date": format_date(device.last_seen) if device.last_seen else None
+            "last_seen": format_timestamp(last_seen) if last_seen else "Never",
+            "last_seen_date": format_date(last_seen) if last_seen else None,
+            **rate_limiter.stats(device.device_id)
         })
 
     return templates.TemplateResponse("devices.html", {
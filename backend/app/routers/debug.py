@@ -0,0 +1,48 @@
+"""Debug API router, only mounted when SQL profiling is enabled."""
+
+from fastapi import APIRouter, Query
+from typing import Optional
+
+from ..profiler import profiler
+
+router = APIRouter()
+
+
+@router.get("/debug/sql")
+async def get_sql_profiles(
+    limit: int = Query(20, ge=1, le=1000),
+    path: Optional[str] = None,
+    n_plus_one: bool = False,
+    statements: bool = False
+):
+    """Get SQL profiles of recent requests, newest first.
+
+    Set ``n_plus_one`` to only list requests with repeated statement
+    templates, and ``statements`` to include every statement run.
+    """
+    results = []
+    for profile in reversed(list(profiler.profiles)):
+        if path is not None and profile.path != path:
+            continue
+        summary = profile.summary()
+        if n_plus_one and not summary["n_plus_one"]:
+            continue
+
+        summary["slow_queries"] = [
+            {**query.to_dict(), "plan": profiler.explain(query)}
+            for query in profile.slow_queries()
+        ]
+        if statements:
+            summary["statements"] = [query.to_dict() for query in profile.queries]
+        results.append(summary)
+        if len(results) >= limit:
+            break
+
+    return {"profiles": results, "total": len(results)}
+
+
+@router.delete("/debug/sql")
+async def clear_sql_profiles():
+    """Discard recorded SQL profiles."""
+    profiler.clear()
+    return {"message": "SQL profiles cleared"}
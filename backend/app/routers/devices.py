@@ -8,6 +8,10 @@ from datetime import datetime
 
 from ..database import get_db
 from ..models import Device
+from ..liveness import liveness
+from ..page_cache import page_cache
+from ..tracking import WEB_CAMERA_PREFIX
+from .events import verify_api_key
 from ..schemas import (
     DeviceRegistration,
     DeviceRegistrationResponse,
@@ -17,6 +21,18 @@ from ..schemas import (
 router = APIRouter()
 
 
+def device_info(device: Device) -> DeviceInfo:
+    """Build device info with live status from the liveness tracker."""
+    return DeviceInfo(
+        device_id=device.device_id,
+        device_name=device.device_name,
+        model=device.model,
+        is_active=device.is_active,
+        is_online=liveness.is_online(device.device_id),
+        last_seen=liveness.last_seen(device.device_id, device.last_seen)
+    )
+
+
 def generate_api_key() -> str:
     """Generate a secure API key."""
     return secrets.token_urlsafe(32)
@@ -28,6 +44,9 @@ async def register_device(
     db: Session = Depends(get_db)
 ):
     """Register a new device or update existing."""
+    if registration.device_id.startswith(WEB_CAMERA_PREFIX):
+        raise HTTPException(status_code=400, detail=f"Device ids starting with {WEB_CAMERA_PREFIX!r} are reserved")
+
     existing = db.query(Device).filter(
         Device.device_id == registration.device_id
     ).first()
@@ -41,6 +60,8 @@ async def register_device(
         existing.last_seen = int(datetime.now().timestamp())
 
         db.commit()
+        liveness.beat(existing.device_id)
+        page_cache.invalidate("devices")
 
         return DeviceRegistrationResponse(
             success=True,
@@ -62,6 +83,8 @@ async def register_device(
 
     db.add(device)
     db.commit()
+    liveness.beat(device.device_id)
+    page_cache.invalidate("devices")
 
     return DeviceRegistrationResponse(
         success=True,
@@ -77,16 +100,13 @@ async def get_devices(
     """Get all registered devices."""
     devices = db.query(Device).order_by(Device.created_at.desc()).all()
 
-    return [
-        DeviceInfo(
-            device_id=d.device_id,
-            device_name=d.device_name,
-            model=d.model,
-            is_active=d.is_active,
-            last_seen=d.last_seen
-        )
-        for d in devices
-    ]
+    return [device_info(d) for d in devices]
+
+
+@router.post("/devices/heartbeat")
+async def heartbeat(device: Device = Depends(verify_api_key)):
+    """Lightweight heartbeat keeping a device marked online."""
+    return {"success": True, "device_id": device.device_id}
 
 
 @router.get("/devices/{device_id}", response_model=DeviceInfo)
@@ -102,13 +122,7 @@ async def get_device(
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
 
-    return DeviceInfo(
-        device_id=device.device_id,
-        device_name=device.device_name,
-        model=device.model,
-        is_active=device.is_active,
-        last_seen=device.last_seen
-    )
+    return device_info(device)
 
 
 @router.put("/devices/{device_id}/deactivate")
@@ -126,6 +140,8 @@ async def deactivate_device(
 
     device.is_active = False
     db.commit()
+    liveness.forget(device_id)
+    page_cache.invalidate("devices")
 
     return {"success": True, "message": "Device deactivated"}
 
@@ -145,5 +161,6 @@ async def activate_device(
 
     device.is_active = True
     db.commit()
+    page_cache.invalidate("devices")
 
     return {"success": True, "message": "Device activated"}
@@ -8,6 +8,7 @@ from datetime import datetime
 
 from ..database import get_db
 from ..models import Employee, Attendance
+from ..page_cache import page_cache
 from ..schemas import (
     EmployeeCreate,
     EmployeeUpdate,
@@ -74,6 +75,7 @@ async def create_employee(
 
     db.add(db_employee)
     db.commit()
+    page_cache.invalidate("employees")
     db.refresh(db_employee)
 
     return db_employee
@@ -121,6 +123,7 @@ async def update_employee(
     employee.updated_at = int(datetime.now().timestamp())
 
     db.commit()
+    page_cache.invalidate("employees")
     db.refresh(employee)
 
     return employee
@@ -142,6 +145,7 @@ async def delete_employee(
     employee.is_active = False
     employee.updated_at = int(datetime.now().timestamp())
     db.commit()
+    page_cache.invalidate("employees")
 
     return {"success": True, "message": "Employee deactivated"}
 
@@ -1,21 +1,43 @@
 """Events API router."""
 
 from fastapi import APIRouter, Depends, HTTPException, Header, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Iterator
 from datetime import datetime, timedelta
-
-from ..database import get_db
-from ..models import Event, Device, Employee
+import csv
+import heapq
+import io
+import json
+import logging
+import zlib
+from itertools import islice
+
+from ..config import get_settings
+from ..database import get_db, SessionLocal
+from ..models import Event, Device, structured_attributes
 from ..schemas import (
     BatchEventRequest,
     BatchEventResponse,
     EventResponse
 )
-from ..websocket import manager
-from .. import push
+from ..ingest import ingest_events
+from ..liveness import liveness
+from ..ratelimit import rate_limiter
+from .. import retention
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
+settings = get_settings()
+
+# Columns written by the export endpoint, in output order
+EXPORT_FIELDS = [
+    "id", "event_type", "timestamp", "track_id", "device_id",
+    "employee_id", "license_plate", "duration", "confidence", "zone", "object_class"
+]
+
+# Rows fetched per round-trip by the export cursor
+EXPORT_CHUNK_SIZE = 1000
 
 
 def verify_api_key(
@@ -31,9 +53,8 @@ def verify_api_key(
     if not device:
         raise HTTPException(status_code=401, detail="Invalid or inactive API key")
 
-    # Update last seen
-    device.last_seen = int(datetime.now().timestamp())
-    db.commit()
+    # Counts as a heartbeat; last_seen is persisted in batches
+    liveness.beat(device.device_id)
 
     return device
 
@@ -45,67 +66,31 @@ async def create_events(
     db: Session = Depends(get_db),
     device: Device = Depends(verify_api_key)
 ):
-    """Receive batch of events from device."""
-    try:
-        events_created = 0
-        created_events = []
-
-        for event_data in request.events:
-            event = Event(
-                event_type=event_data.type,
-                timestamp=event_data.timestamp,
-                track_id=event_data.track_id,
-                device_id=device.device_id,
-                employee_id=event_data.employee_id,
-                license_plate=event_data.license_plate,
-                duration=event_data.duration
-            )
-            db.add(event)
-            db.flush()  # Get the event ID
-            created_events.append(event)
-            events_created += 1
-
-        db.commit()
-
-        # Broadcast events via WebSocket and send push notifications
-        for event in created_events:
-            # Get employee name if available
-            employee_name = None
-            if event.employee_id:
-                emp = db.query(Employee).filter(Employee.employee_id == event.employee_id).first()
-                if emp:
-                    employee_name = emp.name
-
-            event_dict = {
-                "id": event.id,
-                "event_type": event.event_type,
-                "timestamp": event.timestamp,
-                "employee_name": employee_name,
-                "license_plate": event.license_plate,
-                "duration": event.duration
-            }
-
-            # Broadcast to WebSocket clients
-            background_tasks.add_task(manager.broadcast_event, event_dict)
-
-            # Send push notification for important events
-            alert_types = ["UNKNOWN_FACE_DETECTED", "LOITERING_DETECTED"]
-            if event.event_type in alert_types:
-                details = employee_name or event.license_plate or ""
-                background_tasks.add_task(
-                    push.send_alert_notification,
-                    event.event_type,
-                    details,
-                    event.id
-                )
-
-        return BatchEventResponse(
-            success=True,
-            processed=events_created,
-            message=f"Successfully processed {events_created} events"
+    """Receive batch of events from device.
+
+    Batches over ``ingest_max_batch_size`` are rejected with 413, and devices
+    exceeding their rate limit get 429 with a Retry-After header. Storage
+    and notifications are shared with camera tracking (see ``ingest.py``).
+    """
+    batch_size = len(request.events)
+    if batch_size > settings.ingest_max_batch_size:
+        rate_limiter.record_oversized(device.device_id, batch_size)
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {batch_size} events exceeds the limit of {settings.ingest_max_batch_size}"
         )
+
+    retry_after = rate_limiter.check(device.device_id, batch_size)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    try:
+        return ingest_events(db, device.device_id, request.events, background_tasks)
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -114,25 +99,62 @@ async def get_events(
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
     event_type: Optional[str] = None,
+    device_id: Optional[str] = None,
     start_time: Optional[int] = None,
     end_time: Optional[int] = None,
+    min_confidence: Optional[float] = Query(None, ge=0, le=1),
+    zone: Optional[str] = None,
+    object_class: Optional[str] = None,
+    include_archive: bool = Query(False),
     db: Session = Depends(get_db)
 ):
-    """Get events with optional filtering."""
+    """Get events with optional filtering.
+
+    ``zone``, ``object_class`` and ``min_confidence`` are served from
+    indexed columns. With ``include_archive`` set, events moved out by the
+    retention policy are merged in from the archive (slower cold path).
+    """
     query = db.query(Event)
 
     if event_type:
         query = query.filter(Event.event_type == event_type)
 
+    if device_id:
+        query = query.filter(Event.device_id == device_id)
+
     if start_time:
         query = query.filter(Event.timestamp >= start_time)
 
     if end_time:
         query = query.filter(Event.timestamp <= end_time)
 
-    events = query.order_by(Event.timestamp.desc()).offset(offset).limit(limit).all()
+    if min_confidence is not None:
+        query = query.filter(Event.confidence >= min_confidence)
 
-    return events
+    if zone:
+        query = query.filter(Event.zone == zone)
+
+    if object_class:
+        query = query.filter(Event.object_class == object_class)
+
+    query = query.order_by(Event.timestamp.desc(), Event.id.desc())
+
+    if not include_archive:
+        return query.offset(offset).limit(limit).all()
+
+    # Both sources are sorted newest first, so the first offset + limit rows
+    # of each are enough to produce the requested page of the merged stream
+    window = offset + limit
+    hot = [EventResponse.model_validate(e) for e in query.limit(window).all()]
+    cold = (
+        EventResponse(**e, **structured_attributes(e.get("extra_data")))
+        for e in retention.iter_archived_events(
+            event_type, device_id, start_time, end_time, min_confidence, zone, object_class
+        )
+    )
+    merged = heapq.merge(hot, islice(cold, window), key=lambda e: (e.timestamp, e.id), reverse=True)
+
+    return list(islice(merged, offset, window))
 
 
 @router.get("/events/today", response_model=List[EventResponse])
@@ -175,3 +197,110 @@ async def get_event_stats(
         "people_events": people_events,
         "vehicle_events": vehicle_events
     }
+
+
+def iter_export_rows(
+    event_type: Optional[str],
+    device_id: Optional[str],
+    start_time: Optional[int],
+    end_time: Optional[int]
+) -> Iterator[list]:
+    """Yield export rows in timestamp order using a server-side cursor.
+
+    Uses its own session so the cursor stays open for the lifetime of the
+    streaming response, independently of the request-scoped session.
+    """
+    db = SessionLocal()
+    try:
+        columns = [getattr(Event, field) for field in EXPORT_FIELDS]
+        query = db.query(*columns)
+
+        if event_type:
+            query = query.filter(Event.event_type == event_type)
+        if device_id:
+            query = query.filter(Event.device_id == device_id)
+        if start_time:
+            query = query.filter(Event.timestamp >= start_time)
+        if end_time:
+            query = query.filter(Event.timestamp <= end_time)
+
+        query = query.order_by(Event.timestamp, Event.id).yield_per(EXPORT_CHUNK_SIZE)
+        for row in query:
+            yield list(row)
+    finally:
+        db.close()
+
+
+def iter_ndjson(rows: Iterator[list]) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON, one chunk per cursor batch."""
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps(dict(zip(EXPORT_FIELDS, row))))
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield ("\n".join(buffer) + "\n").encode("utf-8")
+            buffer = []
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode("utf-8")
+
+
+def iter_csv(rows: Iterator[list]) -> Iterator[bytes]:
+    """Encode rows as CSV with a header line, one chunk per cursor batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    yield buffer.getvalue().encode("utf-8")
+
+
+def iter_gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Gzip-compress a byte stream on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@router.get("/events/export")
+async def export_events(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    event_type: Optional[str] = None,
+    device_id: Optional[str] = None,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+    gzip: bool = Query(False)
+):
+    """Stream events over an arbitrary time range as NDJSON or CSV.
+
+    Rows are read with a server-side cursor and encoded chunk by chunk, so
+    memory use stays constant regardless of the size of the range.
+    """
+    rows = iter_export_rows(event_type, device_id, start_time, end_time)
+
+    if format == "csv":
+        body = iter_csv(rows)
+        media_type = "text/csv"
+    else:
+        body = iter_ndjson(rows)
+        media_type = "application/x-ndjson"
+
+    filename = f"events-{start_time or 0}-{end_time or int(datetime.now().timestamp())}.{format}"
+    if gzip:
+        body = iter_gzip(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
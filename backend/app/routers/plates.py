@@ -0,0 +1,21 @@
+"""License plates API router."""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from ..database import get_db
+from ..plates import search_plates
+from ..schemas import PlateSearchResult
+
+router = APIRouter()
+
+
+@router.get("/plates/search", response_model=List[PlateSearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=20),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Search plates seen in events, tolerant of OCR character confusions."""
+    return search_plates(db, q, limit)
@@ -0,0 +1,35 @@
+"""Reports API router."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date
+
+from ..database import get_db
+from ..reports import build_report
+from ..schemas import AttendanceReport
+
+router = APIRouter()
+
+# Longest range accepted by a single report
+MAX_REPORT_DAYS = 366
+
+
+@router.get("/attendance/report", response_model=AttendanceReport)
+async def get_attendance_report(
+    start_date: date = Query(..., description="First day (YYYY-MM-DD)"),
+    end_date: date = Query(..., description="Last day, inclusive (YYYY-MM-DD)"),
+    department: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get attendance totals per employee and department for a date range.
+
+    Includes days present, absence days, late arrivals and total and
+    average hours worked. Months that have ended are cached.
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    if (end_date - start_date).days + 1 > MAX_REPORT_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range exceeds {MAX_REPORT_DAYS} days")
+
+    return build_report(db, start_date, end_date, department)
@@ -0,0 +1,160 @@
+"""Event snapshots API router."""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, BackgroundTasks
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from pathlib import Path
+from typing import List
+import asyncio
+import logging
+
+from ..alerts import alert_rules, CompiledRule
+from ..config import get_settings
+from ..database import get_db
+from ..models import Event, Device, Employee
+from ..page_cache import page_cache
+from ..schemas import SnapshotResponse
+from ..snapshots import (
+    snapshot_store, is_digest, is_jpeg, parse_range, snapshot_url, thumbnail_url, InvalidSnapshot
+)
+from ..websocket import manager
+from .events import verify_api_key
+from .. import push
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+settings = get_settings()
+
+# Stored files never change, so clients and proxies may cache them forever
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+async def publish_snapshot(event_id: int, digest: str, rules: List[CompiledRule], details: str):
+    """Announce a snapshot's thumbnail to the dashboard and alert subscribers."""
+    try:
+        await snapshot_store.ensure_thumbnail(digest)
+    except Exception as e:
+        logger.error(f"Thumbnail generation failed for event {event_id}: {e}")
+        return
+
+    await manager.broadcast({
+        "type": "event_snapshot",
+        "event_id": event_id,
+        "thumbnail_url": thumbnail_url(digest)
+    })
+
+    # Same tag as the alert sent at ingestion, so it is replaced in place
+    for rule in rules:
+        await push.send_alert_notification(
+            rule.title, details or rule.message, event_id, rule.tag, image=thumbnail_url(digest)
+        )
+
+
+@router.post("/events/{event_id}/snapshot", response_model=SnapshotResponse)
+async def upload_snapshot(
+    event_id: int,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    device: Device = Depends(verify_api_key)
+):
+    """Attach a JPEG snapshot to one of the device's events.
+
+    The thumbnail is generated before the snapshot is attached, which
+    also rejects JPEGs that cannot be decoded. Alerts the event triggered
+    are then re-sent with the thumbnail in the background.
+    """
+    event = db.query(Event).filter(
+        Event.id == event_id,
+        Event.device_id == device.device_id
+    ).first()
+
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    data = await file.read(settings.snapshot_max_bytes + 1)
+    if len(data) > settings.snapshot_max_bytes:
+        raise HTTPException(status_code=413, detail=f"Snapshot exceeds {settings.snapshot_max_bytes} bytes")
+    if not is_jpeg(data):
+        raise HTTPException(status_code=415, detail="Snapshot must be a JPEG image")
+
+    digest = await asyncio.to_thread(snapshot_store.put, data)
+    try:
+        await snapshot_store.ensure_thumbnail(digest)
+    except InvalidSnapshot:
+        if not db.query(Event.id).filter(Event.snapshot_hash == digest).first():
+            await asyncio.to_thread(snapshot_store.remove, digest)
+        raise HTTPException(status_code=415, detail="Snapshot is not a valid JPEG image")
+
+    event.snapshot_hash = digest
+    db.commit()
+    page_cache.invalidate("events")
+
+    alert_rules.ensure_fresh(db)
+    rules = alert_rules.match(event)
+    details = event.license_plate or ""
+    if event.employee_id:
+        employee = db.query(Employee).filter(Employee.employee_id == event.employee_id).first()
+        if employee:
+            details = employee.name
+    background_tasks.add_task(publish_snapshot, event.id, digest, rules, details)
+
+    return SnapshotResponse(
+        success=True,
+        snapshot_hash=digest,
+        snapshot_url=snapshot_url(digest),
+        thumbnail_url=thumbnail_url(digest)
+    )
+
+
+def file_response(path: Path, digest: str, request: Request) -> Response:
+    """Serve an immutable JPEG with ETag and single byte-range support."""
+    etag = f'"{digest}"'
+    headers = {"Cache-Control": IMMUTABLE, "ETag": etag, "Accept-Ranges": "bytes"}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    size = path.stat().st_size
+    range_header = request.headers.get("range")
+    byte_range = None
+    if range_header:
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    with open(path, "rb") as f:
+        if byte_range is None:
+            return Response(f.read(), media_type="image/jpeg", headers=headers)
+        start, end = byte_range
+        f.seek(start)
+        return Response(
+            f.read(end - start + 1),
+            status_code=206,
+            media_type="image/jpeg",
+            headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"}
+        )
+
+
+@router.get("/snapshots/{digest}")
+def get_snapshot(digest: str, request: Request):
+    """Get an original snapshot by content hash."""
+    path = snapshot_store.path(digest) if is_digest(digest) else None
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return file_response(path, digest, request)
+
+
+@router.get("/snapshots/{digest}/thumbnail")
+async def get_thumbnail(digest: str, request: Request):
+    """Get a snapshot thumbnail, generating it first if needed."""
+    if not is_digest(digest):
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    try:
+        path = await snapshot_store.ensure_thumbnail(digest)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    except InvalidSnapshot:
+        raise HTTPException(status_code=415, detail="Snapshot is not a valid JPEG image")
+    return file_response(path, digest, request)
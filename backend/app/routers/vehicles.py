@@ -0,0 +1,107 @@
+"""Vehicles API router."""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+
+from ..database import get_db
+from ..models import Vehicle
+from ..plates import normalize_plate
+from ..vehicles import vehicle_index
+from ..schemas import VehicleCreate, VehicleUpdate, VehicleInfo
+
+router = APIRouter()
+
+
+@router.get("/vehicles", response_model=List[VehicleInfo])
+async def get_vehicles(
+    db: Session = Depends(get_db)
+):
+    """Get all known vehicles."""
+    return db.query(Vehicle).order_by(Vehicle.license_plate).all()
+
+
+@router.post("/vehicles", response_model=VehicleInfo)
+async def create_vehicle(
+    vehicle: VehicleCreate,
+    db: Session = Depends(get_db)
+):
+    """Register a known vehicle."""
+    plate = normalize_plate(vehicle.license_plate)
+    if not plate:
+        raise HTTPException(status_code=400, detail="Invalid license plate")
+
+    existing = db.query(Vehicle).filter(
+        Vehicle.license_plate == plate
+    ).first()
+
+    if existing:
+        raise HTTPException(status_code=400, detail="Vehicle already exists")
+
+    db_vehicle = Vehicle(
+        license_plate=plate,
+        vehicle_type=vehicle.vehicle_type,
+        owner_id=vehicle.owner_id,
+        owner_name=vehicle.owner_name,
+        is_authorized=vehicle.is_authorized,
+        notes=vehicle.notes
+    )
+
+    db.add(db_vehicle)
+    db.commit()
+    db.refresh(db_vehicle)
+    vehicle_index.invalidate()
+
+    return db_vehicle
+
+
+@router.put("/vehicles/{license_plate}", response_model=VehicleInfo)
+async def update_vehicle(
+    license_plate: str,
+    update: VehicleUpdate,
+    db: Session = Depends(get_db)
+):
+    """Update vehicle details and authorization."""
+    vehicle = db.query(Vehicle).filter(
+        Vehicle.license_plate == normalize_plate(license_plate)
+    ).first()
+
+    if not vehicle:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+
+    if update.vehicle_type is not None:
+        vehicle.vehicle_type = update.vehicle_type
+    if update.owner_id is not None:
+        vehicle.owner_id = update.owner_id
+    if update.owner_name is not None:
+        vehicle.owner_name = update.owner_name
+    if update.is_authorized is not None:
+        vehicle.is_authorized = update.is_authorized
+    if update.notes is not None:
+        vehicle.notes = update.notes
+
+    db.commit()
+    db.refresh(vehicle)
+    vehicle_index.invalidate()
+
+    return vehicle
+
+
+@router.delete("/vehicles/{license_plate}")
+async def delete_vehicle(
+    license_plate: str,
+    db: Session = Depends(get_db)
+):
+    """Remove a known vehicle."""
+    vehicle = db.query(Vehicle).filter(
+        Vehicle.license_plate == normalize_plate(license_plate)
+    ).first()
+
+    if not vehicle:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+
+    db.delete(vehicle)
+    db.commit()
+    vehicle_index.invalidate()
+
+    return {"success": True, "message": "Vehicle deleted"}
@@ -0,0 +1,245 @@
+"""Fair scheduling of camera frames onto a fixed pool of detection workers."""
+
+import asyncio
+import heapq
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from .config import get_settings
+from .metrics import counter, gauge, histogram, CAMERA_FRAME_DURATION
+from .ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DETECTION_FRAMES = counter(
+    "sentinel_detection_frames_total", "Camera frames by scheduling outcome", ["camera_id", "result"]
+)
+DETECTION_QUEUE_WAIT = histogram(
+    "sentinel_detection_queue_wait_seconds", "Time frames wait for a detection worker", ["camera_id"]
+)
+DETECTION_FPS = gauge(
+    "sentinel_detection_fps", "Frames per second processed per camera", ["camera_id"]
+)
+
+# Smoothing of the per-camera rate and wait estimates and the service time
+EWMA_ALPHA = 0.2
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """Parse ``camera_id:weight`` pairs, e.g. ``"lobby:2,yard:0.5"``."""
+    weights = {}
+    for pair in value.split(","):
+        camera_id, _, weight = pair.strip().partition(":")
+        if camera_id and weight:
+            weights[camera_id] = float(weight)
+    return weights
+
+
+class Job:
+    """One frame waiting for detection."""
+
+    __slots__ = ("camera", "args", "enqueued", "future")
+
+    def __init__(self, camera: "CameraQueue", args: tuple):
+        self.camera = camera
+        self.args = args
+        self.enqueued = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def drop(self, result: str):
+        self.camera.dropped += 1
+        if not self.future.done():
+            self.future.set_result(None)
+        DETECTION_FRAMES.labels(self.camera.camera_id, result).inc()
+
+
+class CameraQueue:
+    """Scheduling state and statistics of one camera."""
+
+    def __init__(self, camera_id: str, weight: float, max_fps: float):
+        self.camera_id = camera_id
+        self.weight = weight
+        self.quota = TokenBucket(max_fps, max(1.0, max_fps)) if max_fps > 0 else None
+        self.pending: Deque[Job] = deque()
+        self.start = 0.0  # Virtual start tag of the frame at the head of the queue
+        self.finish = 0.0  # Virtual finish tag of that frame
+        self.scheduled = False  # Whether the camera is in the scheduler heap
+        self.processed = 0
+        self.dropped = 0
+        self.fps = 0.0
+        self.wait = 0.0  # Smoothed queue wait, seconds
+        self._last_done: Optional[float] = None
+
+    def completed(self, now: float, wait: float, record: bool = True):
+        self.processed += 1
+        self.wait += EWMA_ALPHA * (wait - self.wait)
+        if self._last_done is not None and now > self._last_done:
+            self.fps += EWMA_ALPHA * (1.0 / (now - self._last_done) - self.fps)
+        self._last_done = now
+        if record:
+            DETECTION_FPS.labels(self.camera_id).set(round(self.fps, 2))
+
+
+class DetectionScheduler:
+    """Start-time fair queuing of frames across cameras.
+
+    The frame at the head of each camera's queue is tagged with a virtual
+    finish time ``start + 1 / weight``, where ``start`` is the later of the
+    scheduler's virtual time and the camera's previous finish tag. A fixed
+    pool of workers always serves the camera with the smallest tag, so each
+    camera gets detection capacity in proportion to its weight however fast
+    it sends frames. Only served frames advance a camera's tags; dropped
+    frames cost nothing.
+
+    Frames beyond a camera's fps quota are dropped on arrival. A camera's
+    queue holds at most ``detection_queue_size`` frames, and the oldest is
+    dropped when a new one arrives. A frame is also dropped when a worker
+    reaches it if it would exceed ``detection_deadline_ms`` by the time it
+    is processed, estimated from the smoothed service time.
+    """
+
+    def __init__(self):
+        self._cameras: Dict[str, CameraQueue] = {}
+        self._heap: List[Tuple[float, int, CameraQueue]] = []
+        self._seq = 0
+        self._virtual_time = 0.0
+        self._service_time = 0.0
+        self._work: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self._handler: Optional[Handler] = None
+
+    def start(self, handler: Handler):
+        """Start the worker pool, running ``handler(*args)`` for each frame."""
+        self._handler = handler
+        self._work = asyncio.Event()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(settings.detection_workers)]
+        logger.info(f"Detection scheduler started with {settings.detection_workers} workers")
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def register(self, camera_id: str) -> CameraQueue:
+        camera = self._cameras.get(camera_id)
+        if camera is None:
+            weight = parse_weights(settings.detection_camera_weights).get(camera_id, 1.0)
+            camera = CameraQueue(camera_id, weight, settings.detection_max_fps)
+            self._cameras[camera_id] = camera
+        return camera
+
+    def unregister(self, camera_id: str):
+        """Forget a disconnected camera, dropping its queued frames and metric series."""
+        camera = self._cameras.pop(camera_id, None)
+        if camera is None:
+            return
+        while camera.pending:
+            camera.pending.popleft().drop("disconnected")
+        for metric in (DETECTION_FRAMES, DETECTION_QUEUE_WAIT, DETECTION_FPS):
+            metric.remove(camera_id)
+
+    def submit(self, camera_id: str, *args) -> asyncio.Future:
+        """Queue a frame; the future resolves to the detections, or None if dropped."""
+        camera = self.register(camera_id)
+        job = Job(camera, args)
+
+        if camera.quota is not None and camera.quota.take(1) > 0:
+            job.drop("over_quota")
+            return job.future
+
+        camera.pending.append(job)
+        while len(camera.pending) > settings.detection_queue_size:
+            camera.pending.popleft().drop("overflow")
+
+        if not camera.scheduled:
+            self._schedule(camera, max(self._virtual_time, camera.finish))
+        self._work.set()
+        return job.future
+
+    def _schedule(self, camera: CameraQueue, start: float):
+        camera.start = start
+        camera.finish = start + 1.0 / camera.weight
+        camera.scheduled = True
+        self._seq += 1
+        heapq.heappush(self._heap, (camera.finish, self._seq, camera))
+
+    def _stale(self, job: Job, now: float) -> bool:
+        return now - job.enqueued + self._service_time > settings.detection_deadline_ms / 1000
+
+    async def _next(self) -> Job:
+        """Take the head frame of the camera with the smallest finish tag."""
+        while True:
+            while self._heap:
+                _, _, camera = heapq.heappop(self._heap)
+                camera.scheduled = False
+                if self._cameras.get(camera.camera_id) is not camera:
+                    continue  # Unregistered while queued
+
+                now = time.monotonic()
+                while camera.pending and self._stale(camera.pending[0], now):
+                    camera.pending.popleft().drop("stale")
+                if not camera.pending:
+                    camera.finish = camera.start  # Nothing served, nothing charged
+                    continue
+
+                job = camera.pending.popleft()
+                self._virtual_time = max(self._virtual_time, camera.start)
+                if camera.pending:
+                    self._schedule(camera, camera.finish)
+                return job
+            self._work.clear()
+            await self._work.wait()
+
+    async def _worker(self):
+        while True:
+            job = await self._next()
+            camera = job.camera
+            now = time.monotonic()
+            wait = now - job.enqueued
+            DETECTION_QUEUE_WAIT.labels(camera.camera_id).observe(wait)
+
+            result = []
+            try:
+                result = await self._handler(*job.args)
+            except Exception as e:
+                logger.error(f"Detection failed for camera {camera.camera_id}: {e}")
+
+            done = time.monotonic()
+            CAMERA_FRAME_DURATION.observe(done - now)
+            self._service_time += EWMA_ALPHA * ((done - now) - self._service_time)
+            # A camera that disconnected meanwhile must not recreate its series
+            registered = self._cameras.get(camera.camera_id) is camera
+            camera.completed(done, wait, registered)
+            if registered:
+                DETECTION_FRAMES.labels(camera.camera_id, "processed").inc()
+            if not job.future.done():
+                job.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "queued": sum(len(c.pending) for c in self._cameras.values()),
+            "service_time_ms": round(self._service_time * 1000, 2),
+            "cameras": [
+                {
+                    "camera_id": c.camera_id,
+                    "weight": c.weight,
+                    "queued": len(c.pending),
+                    "fps": round(c.fps, 2),
+                    "queue_wait_ms": round(c.wait * 1000, 2),
+                    "processed": c.processed,
+                    "dropped": c.dropped
+                }
+                for c in self._cameras.values()
+            ]
+        }
+
+
+# Global detection scheduler instance
+detection_scheduler = DetectionScheduler()
@@ -1,7 +1,7 @@
 """Pydantic schemas for request/response validation."""
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
 
@@ -24,6 +24,7 @@ class DeviceInfo(BaseModel):
     device_name: str
     model: str
     is_active: bool
+    is_online: bool = False
     last_seen: Optional[int] = None
 
     class Config:
@@ -31,6 +32,13 @@ class DeviceInfo(BaseModel):
 
 
 # Event schemas
+class BoundingBox(BaseModel):
+    x: float
+    y: float
+    width: float = Field(ge=0)
+    height: float = Field(ge=0)
+
+
 class EventCreate(BaseModel):
     type: str
     timestamp: int
@@ -39,6 +47,11 @@ class EventCreate(BaseModel):
     license_plate: Optional[str] = None
     duration: int = 0
     device_id: str
+    confidence: Optional[float] = Field(None, ge=0, le=1)
+    zone: Optional[str] = Field(None, max_length=50)
+    object_class: Optional[str] = Field(None, max_length=50)
+    bbox: Optional[BoundingBox] = None
+    attributes: Optional[Dict[str, Any]] = None  # Stored as JSON, not filterable
 
 
 class BatchEventRequest(BaseModel):
@@ -50,6 +63,7 @@ class BatchEventResponse(BaseModel):
     success: bool
     processed: int
     message: Optional[str] = None
+    event_ids: List[int] = []  # Stored (or merged into) event per request event, for snapshot uploads
 
 
 class EventResponse(BaseModel):
@@ -60,12 +74,144 @@ class EventResponse(BaseModel):
     device_id: Optional[str] = None
     employee_id: Optional[str] = None
     license_plate: Optional[str] = None
+    vehicle_status: Optional[str] = None
     duration: int = 0
+    snapshot_hash: Optional[str] = None
+    confidence: Optional[float] = None
+    zone: Optional[str] = None
+    object_class: Optional[str] = None
+    bbox: Optional[BoundingBox] = None
+    attributes: Optional[Dict[str, Any]] = None
 
     class Config:
         from_attributes = True
 
 
+class ClipInfo(BaseModel):
+    id: int
+    event_id: Optional[int] = None
+    camera_id: str
+    start_time: float
+    end_time: float
+    frame_count: int
+    size_bytes: int
+
+    class Config:
+        from_attributes = True
+
+
+class SnapshotResponse(BaseModel):
+    success: bool
+    snapshot_hash: str
+    snapshot_url: str
+    thumbnail_url: str
+
+
+# Vehicle schemas
+class VehicleCreate(BaseModel):
+    license_plate: str
+    vehicle_type: Optional[str] = None
+    owner_id: Optional[str] = None
+    owner_name: Optional[str] = None
+    is_authorized: bool = False
+    notes: Optional[str] = None
+
+
+class VehicleUpdate(BaseModel):
+    vehicle_type: Optional[str] = None
+    owner_id: Optional[str] = None
+    owner_name: Optional[str] = None
+    is_authorized: Optional[bool] = None
+    notes: Optional[str] = None
+
+
+class VehicleInfo(BaseModel):
+    license_plate: str
+    vehicle_type: Optional[str] = None
+    owner_id: Optional[str] = None
+    owner_name: Optional[str] = None
+    is_authorized: bool
+    notes: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+# Alert rule schemas
+TIME_OF_DAY = r"^([01][0-9]|2[0-3]):[0-5][0-9]$"
+
+
+class AlertRuleCreate(BaseModel):
+    name: str
+    message: Optional[str] = None
+    event_type: str
+    device_id: Optional[str] = None
+    start_time: Optional[str] = Field(None, pattern=TIME_OF_DAY)
+    end_time: Optional[str] = Field(None, pattern=TIME_OF_DAY)
+    license_plate: Optional[str] = None
+    employee_id: Optional[str] = None
+    vehicle_status: Optional[str] = Field(None, pattern="^(authorized|unauthorized|unknown)$")
+    is_active: bool = True
+
+
+class AlertRuleUpdate(BaseModel):
+    name: Optional[str] = None
+    message: Optional[str] = None
+    event_type: Optional[str] = None
+    device_id: Optional[str] = None
+    start_time: Optional[str] = Field(None, pattern=TIME_OF_DAY)
+    end_time: Optional[str] = Field(None, pattern=TIME_OF_DAY)
+    license_plate: Optional[str] = None
+    employee_id: Optional[str] = None
+    vehicle_status: Optional[str] = Field(None, pattern="^(authorized|unauthorized|unknown)$")
+    is_active: Optional[bool] = None
+
+
+class AlertRuleInfo(BaseModel):
+    id: int
+    name: str
+    message: Optional[str] = None
+    event_type: str
+    device_id: Optional[str] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    license_plate: Optional[str] = None
+    employee_id: Optional[str] = None
+    vehicle_status: Optional[str] = None
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
+
+# Analytics schemas
+class TimeseriesPoint(BaseModel):
+    bucket_start: int
+    event_type: str
+    device_id: Optional[str] = None
+    count: int
+
+
+class TimeseriesResponse(BaseModel):
+    bucket: str
+    bucket_seconds: int
+    start_time: int
+    end_time: int
+    points: List[TimeseriesPoint]
+
+
+# Plate schemas
+class PlateSearchResult(BaseModel):
+    plate: str
+    plate_key: str
+    hit_count: int
+    first_seen: Optional[int] = None
+    last_seen: Optional[int] = None
+    last_device_id: Optional[str] = None
+    score: float
+    exact: bool
+
+
 # Employee schemas
 class EmployeeCreate(BaseModel):
     employee_id: str
@@ -120,6 +266,35 @@ class AttendanceRecord(BaseModel):
         from_attributes = True
 
 
+class EmployeeAttendanceSummary(BaseModel):
+    employee_id: str
+    name: str
+    department: Optional[str] = None
+    days_present: int
+    absence_days: int
+    late_arrivals: int
+    total_hours: float
+    average_hours: float
+
+
+class DepartmentAttendanceSummary(BaseModel):
+    department: str
+    employees: int
+    days_present: int
+    absence_days: int
+    late_arrivals: int
+    total_hours: float
+    average_hours: float
+
+
+class AttendanceReport(BaseModel):
+    start_date: str
+    end_date: str
+    workdays: int
+    employees: List[EmployeeAttendanceSummary]
+    departments: List[DepartmentAttendanceSummary]
+
+
 # Dashboard schemas
 class DashboardStats(BaseModel):
     total_events_today: int
@@ -0,0 +1,173 @@
+"""Content-addressed storage of event snapshots and their thumbnails.
+
+Snapshots are stored by the SHA-256 of their bytes in hash-sharded
+directories, so identical uploads are stored once::
+
+    <snapshot_dir>/ab/cd/abcd...ef.jpg        original
+    <snapshot_dir>/ab/cd/abcd...ef.thumb.jpg  thumbnail
+
+A stored file never changes, which lets it be served with immutable cache
+headers. Thumbnails are generated in a process pool, keeping image decoding
+off the event loop and out of the GIL; Pillow is only imported there.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+JPEG_MAGIC = b"\xff\xd8\xff"
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class InvalidSnapshot(ValueError):
+    """A stored snapshot that cannot be decoded."""
+
+
+def is_jpeg(data: bytes) -> bool:
+    return data.startswith(JPEG_MAGIC)
+
+
+def is_digest(value: str) -> bool:
+    return bool(DIGEST_PATTERN.match(value))
+
+
+def snapshot_url(digest: str) -> str:
+    return f"/api/snapshots/{digest}"
+
+
+def thumbnail_url(digest: str) -> str:
+    return f"/api/snapshots/{digest}/thumbnail"
+
+
+def make_thumbnail(source: str, destination: str, size: int):
+    """Write a JPEG thumbnail fitting in ``size`` x ``size``. Runs in a worker process."""
+    from PIL import Image
+
+    with Image.open(source) as image:
+        # Let the JPEG decoder scale down while decoding
+        image.draft("RGB", (size, size))
+        image = image.convert("RGB")
+        image.thumbnail((size, size))
+        tmp = f"{destination}.{os.getpid()}.tmp"
+        image.save(tmp, "JPEG", quality=75, optimize=True)
+    os.replace(tmp, destination)
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive (start, end) offsets.
+
+    Returns None for headers that should be ignored (serve the whole
+    file), and raises ValueError for an unsatisfiable range.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise ValueError(f"Range not satisfiable: {header}")
+    return start, end
+
+
+class SnapshotStore:
+    """Content-addressed snapshot files with thumbnails made on demand."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._invalid: Set[str] = set()  # Digests whose thumbnail failed to decode
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / f"{digest}.jpg"
+
+    def thumbnail_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / f"{digest}.thumb.jpg"
+
+    def put(self, data: bytes) -> str:
+        """Store snapshot bytes and return their digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            return digest
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(data)
+        # Atomic, so readers never see a partial file and concurrent
+        # uploads of the same bytes are harmless
+        os.replace(tmp, path)
+        return digest
+
+    def remove(self, digest: str):
+        """Delete a snapshot and its thumbnail."""
+        for path in (self.path(digest), self.thumbnail_path(digest)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=settings.thumbnail_workers)
+        return self._pool
+
+    async def ensure_thumbnail(self, digest: str) -> Path:
+        """Get the thumbnail path, generating it in the process pool if missing.
+
+        Concurrent requests for the same snapshot share one job. Raises
+        InvalidSnapshot if the image cannot be decoded; that is remembered,
+        so a corrupt snapshot is not decoded again on every request.
+        """
+        thumbnail = self.thumbnail_path(digest)
+        if thumbnail.exists():
+            return thumbnail
+
+        source = self.path(digest)
+        if not source.exists():
+            raise FileNotFoundError(f"Snapshot {digest} not found")
+        if digest in self._invalid:
+            raise InvalidSnapshot(f"Snapshot {digest} is not a valid image")
+
+        future = self._pending.get(digest)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor(), make_thumbnail, str(source), str(thumbnail), settings.thumbnail_size
+            )
+            self._pending[digest] = future
+            future.add_done_callback(lambda _: self._pending.pop(digest, None))
+        try:
+            await future
+        except (OSError, ValueError, SyntaxError) as e:
+            # Decoding errors from Pillow; a broken pool raises RuntimeError instead
+            self._invalid.add(digest)
+            raise InvalidSnapshot(f"Snapshot {digest} is not a valid image: {e}") from e
+        return thumbnail
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Global snapshot store instance
+snapshot_store = SnapshotStore(settings.snapshot_dir)
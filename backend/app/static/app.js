@@ -3,6 +3,8 @@
 class SentinelApp {
   constructor() {
     this.ws = null;
+    this.eventSource = null;
+    this.lastSeq = null;
     this.reconnectAttempts = 0;
     this.maxReconnectAttempts = 5;
     this.pushSubscription = null;
@@ -37,7 +39,9 @@ class SentinelApp {
   // WebSocket for real-time updates
   setupWebSocket() {
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const wsUrl = `${protocol}//${window.location.host}/ws`;
+    // Resume from the last message seen so broadcasts during the gap are replayed
+    const resume = this.lastSeq !== null ? `?last_seq=${this.lastSeq}` : '';
+    const wsUrl = `${protocol}//${window.location.host}/ws${resume}`;
 
     try {
       this.ws = new WebSocket(wsUrl);
@@ -77,6 +81,19 @@ class SentinelApp {
   }
 
   setupPolling() {
+    // Prefer Server-Sent Events, which resume via Last-Event-ID on reconnect
+    if ('EventSource' in window) {
+      const resume = this.lastSeq !== null ? `?last_seq=${this.lastSeq}` : '';
+      this.eventSource = new EventSource(`/api/stream${resume}`);
+      this.eventSource.onmessage = (event) => {
+        this.handleRealtimeEvent(JSON.parse(event.data));
+      };
+      this.eventSource.addEventListener('resync', (event) => {
+        this.handleRealtimeEvent({ type: 'resync', ...JSON.parse(event.data) });
+      });
+      return;
+    }
+
     // Fallback polling every 10 seconds
     setInterval(() => this.fetchLatestEvents(), 10000);
   }
@@ -92,6 +109,12 @@ class SentinelApp {
   }
 
   handleRealtimeEvent(data) {
+    if (data.seq !== undefined) {
+      // Skip messages already handled before a reconnect
+      if (this.lastSeq !== null && data.seq <= this.lastSeq && data.type !== 'hello' && data.type !== 'resync') return;
+      this.lastSeq = data.seq;
+    }
+
     switch (data.type) {
       case 'new_event':
         this.addEventToList(data.event);
@@ -104,6 +127,13 @@ class SentinelApp {
       case 'device_status':
         this.updateDeviceStatus(data.device);
         break;
+      case 'event_snapshot':
+        this.showEventThumbnail(data.event_id, data.thumbnail_url);
+        break;
+      case 'resync':
+        // Gap too old to replay from the server buffer; reload list pages
+        if (document.querySelector('.events-table')) this.refresh();
+        break;
     }
   }
 
@@ -113,14 +143,16 @@ class SentinelApp {
 
     const row = document.createElement('tr');
     row.className = 'new-event-row';
+    row.dataset.eventId = event.id;
     row.innerHTML = `
       <td>${this.formatTime(event.timestamp)}</td>
       <td><span class="event-badge event-${event.event_type.toLowerCase().replace(/_/g, '-')}">${event.event_type.replace(/_/g, ' ')}</span></td>
-      <td>${event.employee_name || event.license_plate || '-'}</td>
+      <td class="event-details">${event.employee_name || event.license_plate || '-'}</td>
       <td>${event.duration || '-'}</td>
     `;
 
     tbody.insertBefore(row, tbody.firstChild);
+    if (event.thumbnail_url) this.showEventThumbnail(event.id, event.thumbnail_url);
 
     // Remove old rows if too many
     while (tbody.children.length > 20) {
@@ -131,6 +163,18 @@ class SentinelApp {
     requestAnimationFrame(() => row.classList.add('visible'));
   }
 
+  showEventThumbnail(eventId, url) {
+    const cell = document.querySelector(`tr[data-event-id="${eventId}"] .event-details`);
+    if (!cell || cell.querySelector('.event-thumbnail')) return;
+
+    const img = document.createElement('img');
+    img.className = 'event-thumbnail';
+    img.src = url;
+    img.alt = '';
+    img.loading = 'lazy';
+    cell.prepend(img);
+  }
+
   updateStats(stats) {
     if (!stats) return;
 
@@ -159,10 +203,15 @@ class SentinelApp {
   updateDeviceStatus(device) {
     const deviceCard = document.querySelector(`[data-device-id="${device.device_id}"]`);
     if (deviceCard) {
+      deviceCard.classList.toggle('online', device.is_online);
       const indicator = deviceCard.querySelector('.status-indicator');
       if (indicator) {
         indicator.className = `status-indicator ${device.is_online ? 'online' : 'offline'}`;
       }
+      const label = deviceCard.querySelector('.status-label');
+      if (label) {
+        label.textContent = device.is_online ? 'Online' : 'Offline';
+      }
     }
   }
 
@@ -232,11 +281,10 @@ class SentinelApp {
   showEventNotification(event) {
     if (Notification.permission !== 'granted') return;
 
-    // Don't show for routine events
-    const alertTypes = ['UNKNOWN_FACE_DETECTED', 'LOITERING_DETECTED'];
-    if (!alertTypes.includes(event.event_type)) return;
+    // Only events that triggered an alert rule
+    if (!event.alert) return;
 
-    const title = event.event_type.replace(/_/g, ' ');
+    const title = event.alert;
     const body = event.employee_name || event.license_plate || 'Security event detected';
 
     new Notification(title, {
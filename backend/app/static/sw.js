@@ -1,3 +1,5 @@
+// The server rewrites the cache name and the /static/ URLs below to the
+// fingerprinted ones of the deployed assets
 const CACHE_NAME = 'sentinel-v1';
 const STATIC_ASSETS = [
   '/',
@@ -43,6 +45,20 @@ self.addEventListener('fetch', (event) => {
     return;
   }
 
+  // Fingerprinted assets never change - cache first
+  if (/\/static\/.+\.[0-9a-f]{12}\.[^./]+$/.test(new URL(event.request.url).pathname)) {
+    event.respondWith(
+      caches.match(event.request).then((cached) => cached || fetch(event.request).then((response) => {
+        if (response.status === 200) {
+          const responseClone = response.clone();
+          caches.open(CACHE_NAME).then((cache) => cache.put(event.request, responseClone));
+        }
+        return response;
+      }))
+    );
+    return;
+  }
+
   event.respondWith(
     fetch(event.request)
       .then((response) => {
@@ -71,6 +87,7 @@ self.addEventListener('push', (event) => {
     body: data.body || 'New security event detected',
     icon: '/static/icons/icon-192.png',
     badge: '/static/icons/icon-72.png',
+    image: data.image || undefined,
     vibrate: [100, 50, 100],
     data: {
       url: data.url || '/',
@@ -0,0 +1,263 @@
+"""Server-side tracking of web camera detections.
+
+Browser cameras streaming over ``/ws/camera`` only send frames, so their
+detections are tracked here, mirroring the Android app's tracker and
+EventEngine. Each frame's detections are associated with the camera's
+tracks by IoU, computed for all track/detection pairs at once with numpy
+and matched greedily, best overlap first. A track is confirmed (and
+PERSON_ENTERED / VEHICLE_ENTERED emitted) once it has been matched in
+``tracking_min_hits`` frames, and exits (PERSON_EXITED / VEHICLE_EXITED,
+with its duration) after going unmatched for ``tracking_exit_seconds``.
+
+Events go through the same ingestion as ``POST /api/events``. As the
+camera WebSocket is unauthenticated, a connection is only tracked when it
+presents a registered device's API key, and its events are stored under
+that device. With ``tracking_auto_register``, cameras with ids in the
+reserved ``web-`` namespace (as ``/camera`` generates) are tracked without
+a key and registered as devices on their first frame.
+"""
+
+import itertools
+import logging
+from typing import Iterator, List, Optional, Set
+
+import numpy as np
+from fastapi import BackgroundTasks
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .database import SessionLocal
+from .ingest import ingest_events
+from .liveness import liveness
+from .models import Device
+from .page_cache import page_cache
+from .schemas import BoundingBox, EventCreate
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Detector labels tracked, by kind
+TRACKED_LABELS = {
+    "person": "PERSON",
+    "vehicle": "VEHICLE",
+    "car": "VEHICLE",
+    "truck": "VEHICLE",
+    "bus": "VEHICLE",
+    "motorcycle": "VEHICLE"
+}
+KINDS = ["PERSON", "VEHICLE"]
+
+# Device ids reserved for automatically registered web cameras
+WEB_CAMERA_PREFIX = "web-"
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU of every box in ``a`` (n, 4) with every box in ``b`` (m, 4), as x1, y1, x2, y2."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+class Track:
+    """One tracked object."""
+
+    __slots__ = ("track_id", "kind", "label", "confidence", "first_seen", "last_seen", "hits", "confirmed")
+
+    def __init__(self, track_id: int, kind: int, label: str, confidence: float, timestamp: float):
+        self.track_id = track_id
+        self.kind = kind
+        self.label = label  # Detector label, e.g. "car"
+        self.confidence = confidence  # Highest detection confidence so far
+        self.first_seen = timestamp  # Seconds
+        self.last_seen = timestamp  # Seconds
+        self.hits = 1
+        self.confirmed = False
+
+
+class CameraTracker:
+    """Tracks of one camera, whose events are stored under ``device_id``.
+
+    Frame times are Unix seconds; events get whole seconds, like every
+    server-side consumer of ``Event.timestamp`` expects, and durations in
+    milliseconds.
+    """
+
+    def __init__(self, device_id: str, track_ids: Iterator[int]):
+        self.device_id = device_id
+        self.tracks: List[Track] = []
+        self._boxes = np.empty((0, 4), dtype=np.float32)
+        self._track_ids = track_ids
+
+    def _event(self, event_type: str, track: Track, box: np.ndarray, timestamp: float,
+               duration: int = 0) -> EventCreate:
+        x1, y1, x2, y2 = (float(v) for v in box)
+        return EventCreate(
+            type=f"{KINDS[track.kind]}_{event_type}",
+            timestamp=int(timestamp),
+            track_id=track.track_id,
+            duration=duration,
+            device_id=self.device_id,
+            confidence=round(min(1.0, max(0.0, track.confidence)), 3),
+            object_class=track.label[:50],
+            bbox=BoundingBox(x=x1, y=y1, width=x2 - x1, height=y2 - y1)
+        )
+
+    def _exit(self, index: int) -> EventCreate:
+        track = self.tracks[index]
+        duration = int((track.last_seen - track.first_seen) * 1000)
+        return self._event("EXITED", track, self._boxes[index], track.last_seen, duration)
+
+    def update(self, detections: List[dict], timestamp: float) -> List[EventCreate]:
+        """Associate a frame's detections with the tracks; returns events to store."""
+        kinds, labels, confidences, boxes = [], [], [], []
+        for d in detections:
+            label = str(d.get("type", "")).lower()
+            kind = TRACKED_LABELS.get(label)
+            if kind is None:
+                continue
+            box = d["box"]
+            kinds.append(KINDS.index(kind))
+            labels.append(label)
+            confidences.append(float(d.get("confidence", 0.0)))
+            boxes.append((box["x"], box["y"], box["x"] + box["width"], box["y"] + box["height"]))
+        detected = np.array(boxes, dtype=np.float32).reshape(-1, 4)
+        detected_kinds = np.array(kinds, dtype=np.int8)
+
+        events = []
+        matched = np.zeros(len(self.tracks), dtype=bool)
+        assigned = np.zeros(len(detected), dtype=bool)
+
+        if self.tracks and len(detected):
+            track_kinds = np.fromiter((t.kind for t in self.tracks), dtype=np.int8, count=len(self.tracks))
+            iou = iou_matrix(self._boxes, detected)
+            iou[track_kinds[:, None] != detected_kinds[None, :]] = 0
+            rows, cols = np.nonzero(iou >= settings.tracking_iou_threshold)
+            for i in np.argsort(-iou[rows, cols], kind="stable"):
+                t, d = rows[i], cols[i]
+                if matched[t] or assigned[d]:
+                    continue
+                matched[t] = assigned[d] = True
+                track = self.tracks[t]
+                track.last_seen = timestamp
+                track.hits += 1
+                track.confidence = max(track.confidence, confidences[d])
+                self._boxes[t] = detected[d]
+                if not track.confirmed and track.hits >= settings.tracking_min_hits:
+                    track.confirmed = True
+                    events.append(self._event("ENTERED", track, detected[d], track.first_seen))
+
+        # Retire tracks unseen for too long
+        exit_seconds = settings.tracking_exit_seconds
+        keep = matched | np.fromiter(
+            (timestamp - t.last_seen <= exit_seconds for t in self.tracks), dtype=bool, count=len(self.tracks)
+        )
+        if not keep.all():
+            for i, (track, kept) in enumerate(zip(self.tracks, keep)):
+                if not kept and track.confirmed:
+                    events.append(self._exit(i))
+            self.tracks = [t for t, kept in zip(self.tracks, keep) if kept]
+            self._boxes = self._boxes[keep]
+
+        # Start tentative tracks for new objects
+        new = np.flatnonzero(~assigned)[:max(0, settings.tracking_max_tracks - len(self.tracks))]
+        if len(new):
+            for d in new:
+                track = Track(next(self._track_ids), int(detected_kinds[d]), labels[d], confidences[d], timestamp)
+                self.tracks.append(track)
+                if settings.tracking_min_hits <= 1:
+                    track.confirmed = True
+                    events.append(self._event("ENTERED", track, detected[d], timestamp))
+            self._boxes = np.concatenate([self._boxes, detected[new]])
+
+        return events
+
+    def close(self) -> List[EventCreate]:
+        """End all tracks, e.g. when the camera disconnects."""
+        events = [self._exit(i) for i, t in enumerate(self.tracks) if t.confirmed]
+        self.tracks = []
+        self._boxes = self._boxes[:0]
+        return events
+
+
+class CameraTracking:
+    """Trackers of connected web cameras and storage of their events."""
+
+    def __init__(self):
+        # Track ids are unique across connections, so reconnects are not debounced together
+        self._track_ids = itertools.count(1)
+        self._devices: Set[str] = set()  # Device ids known to be registered
+
+    def authenticate(self, api_key: str) -> Optional[str]:
+        """Get the device id of an active device's API key, or None."""
+        db = SessionLocal()
+        try:
+            device = db.query(Device.device_id).filter(
+                Device.api_key == api_key,
+                Device.is_active == True
+            ).first()
+        finally:
+            db.close()
+        if device is None:
+            return None
+        self._devices.add(device.device_id)
+        return device.device_id
+
+    def device_for(self, camera_id: Optional[str], authenticated: Optional[str]) -> Optional[str]:
+        """Device a camera connection's events and clips belong to, or None.
+
+        That is the ``authenticated`` device id of a connection with an API
+        key. Otherwise, if auto-registration is enabled, it is a camera id
+        in the web camera namespace.
+        """
+        if authenticated is not None:
+            return authenticated
+        if settings.tracking_auto_register and camera_id and camera_id.startswith(WEB_CAMERA_PREFIX):
+            return camera_id
+        return None
+
+    def open(self, device_id: Optional[str]) -> Optional[CameraTracker]:
+        """Create a tracker for a connection's device, or None if it is not tracked."""
+        if not settings.tracking_enabled or device_id is None:
+            return None
+        return CameraTracker(device_id, self._track_ids)
+
+    def _register(self, db: Session, device_id: str):
+        if not db.query(Device.id).filter(Device.device_id == device_id).first():
+            db.add(Device(device_id=device_id, device_name=f"Web camera {device_id}", model="Web camera"))
+            db.commit()
+            page_cache.invalidate("devices")
+            logger.info(f"Registered web camera {device_id} as a device")
+        self._devices.add(device_id)
+
+    async def store(self, device_id: str, events: List[EventCreate]):
+        """Ingest tracking events as the camera's device, then notify about them."""
+        if device_id not in self._devices:
+            db = SessionLocal()
+            try:
+                self._register(db, device_id)
+            finally:
+                db.close()
+        liveness.beat(device_id)
+        if not events:
+            return
+
+        background_tasks = BackgroundTasks()
+        db = SessionLocal()
+        try:
+            ingest_events(db, device_id, events, background_tasks)
+        except Exception as e:
+            logger.error(f"Storing tracking events for device {device_id} failed: {e}")
+            return
+        finally:
+            db.close()
+        await background_tasks()
+
+
+# Global camera tracking instance
+camera_tracking = CameraTracking()
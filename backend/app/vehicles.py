@@ -0,0 +1,149 @@
+"""In-memory index of known vehicles for ingestion-time plate checks."""
+
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .models import Vehicle
+from .plates import plate_key
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Vehicle authorization statuses stored on events
+VEHICLE_AUTHORIZED = "authorized"
+VEHICLE_UNAUTHORIZED = "unauthorized"
+VEHICLE_UNKNOWN = "unknown"
+
+# Event types checked against known vehicles
+VEHICLE_EVENT_TYPES = {"VEHICLE_ENTERED", "VEHICLE_EXITED"}
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Compute the edit distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree for edit-distance nearest neighbour queries."""
+
+    def __init__(self):
+        # Nodes are (key, {distance: child_node})
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+
+    def add(self, key: str):
+        """Insert a key into the tree."""
+        if self._root is None:
+            self._root = (key, {})
+            return
+
+        node = self._root
+        while True:
+            distance = levenshtein(key, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (key, {})
+                return
+            node = child
+
+    def search(self, key: str, max_distance: int) -> List[Tuple[int, str]]:
+        """Find keys within ``max_distance`` edits, closest first."""
+        if self._root is None:
+            return []
+
+        results = []
+        stack = [self._root]
+        while stack:
+            node_key, children = stack.pop()
+            distance = levenshtein(key, node_key)
+            if distance <= max_distance:
+                results.append((distance, node_key))
+            # Triangle inequality: only subtrees in this band can match
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+
+        results.sort()
+        return results
+
+
+class VehicleIndex:
+    """Known vehicles keyed by confusable-folded plate.
+
+    Exact keys are resolved with a dict lookup; near misses from OCR
+    (dropped or extra characters) fall back to a BK-tree search. The index
+    is rebuilt lazily after ``invalidate`` and at least every
+    ``vehicle_index_ttl_seconds`` so changes made by other workers are
+    picked up.
+    """
+
+    def __init__(self):
+        self._by_key: Dict[str, bool] = {}
+        self._tree = BKTree()
+        self._loaded_at = 0.0
+        self._stale = True
+
+    def invalidate(self):
+        """Mark the index for rebuild before its next use."""
+        self._stale = True
+
+    def refresh(self, db: Session):
+        """Rebuild the index from the vehicles table."""
+        by_key: Dict[str, bool] = {}
+        tree = BKTree()
+        for plate, is_authorized in db.query(Vehicle.license_plate, Vehicle.is_authorized):
+            key = plate_key(plate)
+            if not key:
+                continue
+            # A plate listed as both authorized and not is treated as not
+            by_key[key] = by_key.get(key, True) and bool(is_authorized)
+            tree.add(key)
+
+        self._by_key = by_key
+        self._tree = tree
+        self._loaded_at = time.monotonic()
+        self._stale = False
+        logger.debug(f"Vehicle index loaded with {len(by_key)} plates")
+
+    def ensure_fresh(self, db: Session):
+        """Rebuild the index if it was invalidated or has expired."""
+        if self._stale or time.monotonic() - self._loaded_at > settings.vehicle_index_ttl_seconds:
+            self.refresh(db)
+
+    def classify(self, plate: Optional[str]) -> str:
+        """Get the authorization status for a plate read by OCR."""
+        key = plate_key(plate)
+        if not key:
+            return VEHICLE_UNKNOWN
+
+        authorized = self._by_key.get(key)
+        if authorized is None:
+            matches = self._tree.search(key, settings.vehicle_match_distance)
+            if not matches:
+                return VEHICLE_UNKNOWN
+            best = matches[0][0]
+            # Ambiguous near matches resolve to the most restrictive status
+            authorized = all(self._by_key[k] for d, k in matches if d == best)
+
+        return VEHICLE_AUTHORIZED if authorized else VEHICLE_UNAUTHORIZED
+
+
+# Global vehicle index instance
+vehicle_index = VehicleIndex()
@@ -1,25 +1,59 @@
 """WebSocket manager for real-time updates."""
 
 from fastapi import WebSocket
-from typing import Set, Dict, Any
+from collections import deque
+from itertools import islice
+from typing import Set, Dict, Any, Deque, List, Optional, Tuple
 import json
 import asyncio
 import logging
 
+from .config import get_settings
+
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class StreamSubscriber:
+    """A Server-Sent Events client fed from the broadcast stream."""
+
+    def __init__(self, maxsize: int):
+        # Items are (seq, message_json); None tells the stream to close
+        self.queue: "asyncio.Queue[Optional[Tuple[int, str]]]" = asyncio.Queue(maxsize)
 
 
 class ConnectionManager:
-    """Manages WebSocket connections for real-time updates."""
+    """Manages WebSocket connections for real-time updates.
+
+    Every broadcast gets a monotonically increasing sequence number and is
+    kept in a bounded ring buffer, so clients that reconnect can resume from
+    the last sequence number they saw instead of losing the gap.
+    """
 
-    def __init__(self):
+    def __init__(self, buffer_size: int = 1000):
         self.active_connections: Set[WebSocket] = set()
+        self.subscribers: Set[StreamSubscriber] = set()
         self._lock = asyncio.Lock()
+        self._seq = 0
+        self._buffer: Deque[Tuple[int, str]] = deque(maxlen=buffer_size)
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest broadcast."""
+        return self._seq
 
-    async def connect(self, websocket: WebSocket):
-        """Accept and store a new WebSocket connection."""
+    async def connect(self, websocket: WebSocket, last_seq: Optional[int] = None):
+        """Accept and store a new WebSocket connection.
+
+        If ``last_seq`` is given, missed messages are replayed before the
+        connection joins the live stream, so nothing arrives out of order.
+        """
         await websocket.accept()
         async with self._lock:
+            if last_seq is not None:
+                await self._replay(websocket, last_seq)
+            else:
+                await websocket.send_text(json.dumps({"type": "hello", "seq": self._seq}))
             self.active_connections.add(websocket)
         logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
 
@@ -29,12 +63,65 @@ class ConnectionManager:
             self.active_connections.discard(websocket)
         logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
 
+    async def resume(self, websocket: WebSocket, last_seq: int):
+        """Replay messages missed since ``last_seq`` to a connected client."""
+        async with self._lock:
+            await self._replay(websocket, last_seq)
+
+    async def _replay(self, websocket: WebSocket, last_seq: int):
+        """Send buffered messages after ``last_seq``, or a resync notice."""
+        missed = self.messages_since(last_seq)
+        if missed is None:
+            await websocket.send_text(json.dumps({"type": "resync", "seq": self._seq}))
+            return
+        for _, message_json in missed:
+            await websocket.send_text(message_json)
+
+    def messages_since(self, last_seq: int) -> Optional[List[Tuple[int, str]]]:
+        """Get buffered messages after ``last_seq``.
+
+        Returns None if the gap can no longer be filled from memory, either
+        because it fell out of the buffer or because the server restarted.
+        """
+        if last_seq == self._seq:
+            return []
+        if last_seq > self._seq or not self._buffer or self._buffer[0][0] > last_seq + 1:
+            return None
+        start = last_seq + 1 - self._buffer[0][0]
+        return list(islice(self._buffer, start, None))
+
+    def subscribe(self) -> StreamSubscriber:
+        """Register a Server-Sent Events subscriber."""
+        subscriber = StreamSubscriber(settings.stream_queue_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: StreamSubscriber):
+        """Remove a Server-Sent Events subscriber."""
+        self.subscribers.discard(subscriber)
+
     async def broadcast(self, message: Dict[str, Any]):
         """Broadcast a message to all connected clients."""
+        self._seq += 1
+        seq = self._seq
+        message_json = json.dumps({**message, "seq": seq})
+        self._buffer.append((seq, message_json))
+
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait((seq, message_json))
+            except asyncio.QueueFull:
+                # Too slow to keep up: close its stream, the client will
+                # reconnect with Last-Event-ID and resume from the buffer
+                logger.warning("Stream subscriber fell behind, closing")
+                self.subscribers.discard(subscriber)
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(None)
+
         if not self.active_connections:
             return
 
-        message_json = json.dumps(message)
         disconnected = set()
 
         async with self._lock:
@@ -79,4 +166,4 @@ class ConnectionManager:
 
 
 # Global connection manager instance
-manager = ConnectionManager()
+manager = ConnectionManager(settings.stream_buffer_size)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Micro-batched versus per-frame detection throughput.
+
+Simulates N cameras, each submitting a JPEG frame as soon as its previous
+one has been answered. The run is repeated with the ``MicroBatcher`` limited
+to one frame per call (per-frame inference) and with batching enabled, and
+total frames/sec is reported for both:
+
+    python benchmarks/detection.py -o detection.json
+    python benchmarks/detection.py --cameras 1,4,16,32 --compare detection.json
+
+The default detector is a stand-in for a small CPU model: a strided
+downsample followed by a dense layer, whose weights are re-read from memory
+on every call. Pass ``--detector module:Class`` to benchmark a real one.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from load_test import BACKEND_DIR, git_revision, _fmt  # noqa: E402
+
+sys.path.insert(0, str(BACKEND_DIR))
+from app.detection import MicroBatcher, load_detector  # noqa: E402
+
+LABELS = ["person", "vehicle", "face"]
+
+
+class DenseDetector:
+    """Reference detector with a fixed dense layer over a downsampled frame."""
+
+    input_size: Tuple[int, int] = (320, 240)
+
+    def __init__(self, outputs: int = 1024, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        features = (self.input_size[1] // 4) * (self.input_size[0] // 4) * 3
+        self.weights = rng.standard_normal((features, outputs), dtype=np.float32) / np.sqrt(features)
+        self.heads = rng.standard_normal((outputs, len(LABELS) + 5), dtype=np.float32)
+
+    def detect(self, batch: np.ndarray) -> List[List[dict]]:
+        x = batch[:, ::4, ::4].reshape(len(batch), -1).astype(np.float32) / 255
+        hidden = np.maximum(x @ self.weights, 0)
+        out = 1 / (1 + np.exp(-(hidden @ self.heads)))
+        labels = out[:, :len(LABELS)].argmax(axis=1)
+        return [
+            [{
+                "type": LABELS[labels[i]],
+                "confidence": float(out[i, labels[i]]),
+                "box": {"x": float(row[0]) * 0.5, "y": float(row[1]) * 0.5,
+                        "width": float(row[2]) * 0.5, "height": float(row[3]) * 0.5}
+            }]
+            for i, row in enumerate(out[:, len(LABELS):])
+        ]
+
+
+def make_frames(count: int, width: int, height: int, seed: int) -> List[bytes]:
+    """JPEG frames with some texture, like a client's half-resolution capture."""
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    base = np.linspace(0, 255, width * height * 3).reshape(height, width, 3)
+    frames = []
+    for _ in range(count):
+        pixels = np.clip(base + rng.normal(0, 25, base.shape), 0, 255).astype(np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, "JPEG", quality=70)
+        frames.append(buffer.getvalue())
+    return frames
+
+
+async def drive(batcher: MicroBatcher, cameras: int, duration: float, frames: List[bytes]) -> Tuple[int, float]:
+    """Run closed-loop cameras for ``duration`` seconds; return (frames, seconds)."""
+    deadline = time.perf_counter() + duration
+    counts = [0] * cameras
+
+    async def camera(index: int):
+        i = index
+        while time.perf_counter() < deadline:
+            await batcher.detect(frames[i % len(frames)], 0.0)
+            counts[index] += 1
+            i += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(camera(i) for i in range(cameras)))
+    return sum(counts), time.perf_counter() - start
+
+
+def run(args: argparse.Namespace) -> dict:
+    detector = load_detector(args.detector) if args.detector else DenseDetector()
+    frames = make_frames(8, args.frame_width, args.frame_height, args.seed)
+
+    # Warm up the decoder and BLAS
+    asyncio.run(drive(MicroBatcher(detector, args.batch_size, args.wait_ms / 1000), 4, 0.5, frames))
+
+    results = []
+    for cameras in args.cameras:
+        row = {"cameras": cameras}
+        for mode, batch_size in (("per_frame", 1), ("batched", args.batch_size)):
+            batcher = MicroBatcher(detector, batch_size, args.wait_ms / 1000)
+            count, elapsed = asyncio.run(drive(batcher, cameras, args.duration, frames))
+            row[f"{mode}_fps"] = round(count / elapsed, 1)
+        row["speedup"] = round(row["batched_fps"] / row["per_frame_fps"], 2)
+        results.append(row)
+        print(f"{cameras:>3} cameras: {row['per_frame_fps']:>8} fps per frame, "
+              f"{row['batched_fps']:>8} fps batched ({row['speedup']}x)", file=sys.stderr)
+
+    return {
+        "revision": git_revision(),
+        "config": {
+            "detector": args.detector or "DenseDetector",
+            "batch_size": args.batch_size,
+            "wait_ms": args.wait_ms,
+            "frame_size": [args.frame_width, args.frame_height],
+            "duration": args.duration
+        },
+        "results": results
+    }
+
+
+def compare(baseline: dict, current: dict) -> str:
+    before = {r["cameras"]: r for r in baseline["results"]}
+    lines = [f"{'cameras':>8} {'mode':>10} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for row in current["results"]:
+        old = before.get(row["cameras"])
+        for mode in ("per_frame", "batched"):
+            value = row[f"{mode}_fps"]
+            reference = old[f"{mode}_fps"] if old else None
+            change = f"{(value / reference - 1) * 100:+.1f}%" if reference else "-"
+            lines.append(f"{row['cameras']:>8} {mode:>10} {_fmt(reference):>10} {_fmt(value):>10} {change:>8}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cameras", type=lambda s: [int(n) for n in s.split(",")], default=[1, 4, 16, 32],
+                        help="Comma-separated camera counts")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per measurement")
+    parser.add_argument("--batch-size", type=int, default=32, help="Max frames per batched call")
+    parser.add_argument("--wait-ms", type=float, default=5.0, help="Max wait for a batch to fill")
+    parser.add_argument("--frame-width", type=int, default=640)
+    parser.add_argument("--frame-height", type=int, default=360)
+    parser.add_argument("--detector", help="module:Class of the detector to benchmark")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+
+    if args.compare:
+        print()
+        print(compare(json.loads(Path(args.compare).read_text()), report))
+
+
+if __name__ == "__main__":
+    main()
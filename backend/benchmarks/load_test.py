@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""Fleet load test for event ingestion and live dashboards.
+
+Registers N simulated devices, uploads event batches to ``/api/events`` at
+a configurable rate, and holds M ``/ws`` dashboard clients open to measure
+how long broadcasts take to arrive. Without ``--url`` a local uvicorn
+instance is started against a throwaway SQLite database, so no external
+services are needed.
+
+Reports are written as JSON and can be compared across commits:
+
+    python benchmarks/load_test.py --devices 20 --ws-clients 10 -o before.json
+    python benchmarks/load_test.py --devices 20 --ws-clients 10 -o after.json --compare before.json
+
+Requires ``httpx`` in addition to the backend requirements.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import httpx
+except ImportError:
+    sys.exit("The load test requires httpx: pip install httpx")
+
+import websockets
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Relative frequency of generated event types
+EVENT_MIX = [
+    ("PERSON_ENTERED", 30),
+    ("PERSON_EXITED", 30),
+    ("VEHICLE_ENTERED", 15),
+    ("VEHICLE_EXITED", 15),
+    ("LOITERING_DETECTED", 5),
+    ("UNKNOWN_FACE_DETECTED", 5),
+]
+
+PLATE_CHARS = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """Latency summary in milliseconds."""
+    return {
+        "count": len(values),
+        "p50_ms": _ms(percentile(values, 50)),
+        "p95_ms": _ms(percentile(values, 95)),
+        "p99_ms": _ms(percentile(values, 99)),
+        "max_ms": _ms(max(values) if values else None),
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def git_revision() -> Dict[str, Optional[str]]:
+    """Commit the backend is running from, for comparing reports."""
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+        dirty = bool(subprocess.check_output(
+            ["git", "status", "--porcelain", "--", "."], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalServer:
+    """A uvicorn instance on a throwaway database."""
+
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._tmp = tempfile.TemporaryDirectory(prefix="sentinel-load-")
+        self._process: Optional[subprocess.Popen] = None
+
+    async def __aenter__(self) -> "LocalServer":
+        env = dict(os.environ)
+        env["DATABASE_URL"] = f"sqlite:///{self._tmp.name}/load.db"
+        env["ARCHIVE_DIR"] = f"{self._tmp.name}/archive"
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app",
+             "--host", "127.0.0.1", "--port", str(self.port),
+             "--workers", str(self.workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env
+        )
+
+        async with httpx.AsyncClient() as client:
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                try:
+                    if (await client.get(f"{self.url}/api/health")).status_code == 200:
+                        return self
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+
+        await self.__aexit__()
+        raise RuntimeError("Local server did not become healthy within 30s")
+
+    async def __aexit__(self, *exc):
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._tmp.cleanup()
+
+
+class LoadTest:
+    """Drives devices and dashboard clients and collects measurements."""
+
+    def __init__(self, url: str, args: argparse.Namespace):
+        self.url = url.rstrip("/")
+        self.args = args
+        self.run_id = f"{int(time.time())}-{random.randrange(1 << 16):04x}"
+        self.rng = random.Random(args.seed)
+
+        # (device_id, track_id) -> perf_counter() when its batch was sent
+        self.sent_at: Dict[Tuple[str, int], float] = {}
+
+        self.ingest_latencies: List[float] = []
+        self.broadcast_lags: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.events_sent = 0
+        self.events_accepted = 0
+        self.batches_sent = 0
+        self.ws_messages = 0
+        self.ws_connected = 0
+
+    def _error(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def _event_type(self) -> str:
+        types, weights = zip(*EVENT_MIX)
+        return self.rng.choices(types, weights)[0]
+
+    def _plate(self) -> str:
+        return "".join(self.rng.choice(PLATE_CHARS) for _ in range(self.rng.randint(6, 9)))
+
+    async def register_devices(self, client: httpx.AsyncClient) -> List[Tuple[str, str]]:
+        """Register simulated devices and return (device_id, api_key) pairs."""
+        devices = []
+        for i in range(self.args.devices):
+            device_id = f"load-{self.run_id}-{i:04d}"
+            response = await client.post(f"{self.url}/api/devices/register", json={
+                "device_id": device_id,
+                "device_name": f"Load Test {i}",
+                "model": "simulated",
+                "os_version": "load-test"
+            })
+            response.raise_for_status()
+            devices.append((device_id, response.json()["api_key"]))
+        return devices
+
+    async def run_device(self, client: httpx.AsyncClient, device_id: str, api_key: str, stop_at: float):
+        """Upload batches for one device at the configured rate."""
+        interval = self.args.batch_size / self.args.rate
+        track_id = 0
+        # Spread devices out so they don't all fire on the same tick
+        next_send = time.perf_counter() + self.rng.random() * interval
+
+        while True:
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if time.perf_counter() >= stop_at:
+                return
+            next_send += interval
+
+            now = int(time.time())
+            events = []
+            keys = []
+            for _ in range(self.args.batch_size):
+                track_id += 1
+                event_type = self._event_type()
+                events.append({
+                    "type": event_type,
+                    "timestamp": now,
+                    "track_id": track_id,
+                    "license_plate": self._plate() if event_type.startswith("VEHICLE") else None,
+                    "duration": self.rng.randint(0, 60000) if event_type.endswith("EXITED") else 0,
+                    "device_id": device_id
+                })
+                keys.append((device_id, track_id))
+
+            started = time.perf_counter()
+            for key in keys:
+                self.sent_at[key] = started
+
+            try:
+                response = await client.post(
+                    f"{self.url}/api/events",
+                    json={"events": events, "device_id": device_id},
+                    headers={"X-API-Key": api_key}
+                )
+                self.ingest_latencies.append(time.perf_counter() - started)
+                if response.status_code == 200:
+                    self.events_accepted += len(events)
+                else:
+                    self._error(f"http_{response.status_code}")
+            except httpx.HTTPError as e:
+                self._error(type(e).__name__)
+
+            self.batches_sent += 1
+            self.events_sent += len(events)
+
+    async def run_dashboard(self, stop_at: float):
+        """Hold one /ws client open and measure broadcast lag."""
+        ws_url = self.url.replace("http", "ws", 1) + "/ws"
+        try:
+            async with websockets.connect(ws_url, max_size=None) as ws:
+                self.ws_connected += 1
+                while True:
+                    remaining = stop_at - time.perf_counter()
+                    if remaining <= 0:
+                        return
+                    try:
+                        raw = await asyncio.wait_for(ws.recv(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        return
+                    received = time.perf_counter()
+                    self.ws_messages += 1
+
+                    message = json.loads(raw)
+                    if message.get("type") != "new_event":
+                        continue
+                    event = message.get("event") or {}
+                    sent = self.sent_at.get((event.get("device_id"), event.get("track_id")))
+                    if sent is not None:
+                        self.broadcast_lags.append(received - sent)
+        except (OSError, websockets.WebSocketException) as e:
+            self._error(f"ws_{type(e).__name__}")
+
+    async def run(self) -> dict:
+        limits = httpx.Limits(max_connections=max(10, self.args.devices))
+        async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+            devices = await self.register_devices(client)
+
+            # Dashboards connect first and stay open until after the last
+            # upload, plus a grace period for in-flight broadcasts
+            ingest_stop = time.perf_counter() + self.args.duration
+            ws_stop = ingest_stop + self.args.drain
+            dashboards = [asyncio.create_task(self.run_dashboard(ws_stop)) for _ in range(self.args.ws_clients)]
+            await asyncio.sleep(0.5)
+
+            started = time.perf_counter()
+            await asyncio.gather(*[
+                self.run_device(client, device_id, api_key, ingest_stop)
+                for device_id, api_key in devices
+            ])
+            elapsed = time.perf_counter() - started
+            await asyncio.gather(*dashboards)
+
+        expected_deliveries = self.events_accepted * self.ws_connected
+        return {
+            "meta": {
+                "run_id": self.run_id,
+                "started_at": int(time.time()),
+                "git": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "target": self.url,
+                "params": {
+                    "devices": self.args.devices,
+                    "rate_per_device": self.args.rate,
+                    "batch_size": self.args.batch_size,
+                    "duration_s": self.args.duration,
+                    "ws_clients": self.args.ws_clients,
+                    "workers": self.args.workers,
+                    "seed": self.args.seed,
+                },
+            },
+            "ingest": {
+                "batches": self.batches_sent,
+                "events_sent": self.events_sent,
+                "events_accepted": self.events_accepted,
+                "events_per_sec": round(self.events_accepted / elapsed, 1) if elapsed else None,
+                "latency": summarize(self.ingest_latencies),
+            },
+            "broadcast": {
+                "clients_connected": self.ws_connected,
+                "messages_received": self.ws_messages,
+                "deliveries_expected": expected_deliveries,
+                "deliveries_measured": len(self.broadcast_lags),
+                "delivery_ratio": round(len(self.broadcast_lags) / expected_deliveries, 4) if expected_deliveries else None,
+                "lag": summarize(self.broadcast_lags),
+            },
+            "errors": self.errors,
+        }
+
+
+# Metrics shown by --compare, as (section path, label, higher_is_better)
+COMPARED_METRICS = [
+    (("ingest", "events_per_sec"), "ingest events/s", True),
+    (("ingest", "latency", "p50_ms"), "ingest p50 ms", False),
+    (("ingest", "latency", "p95_ms"), "ingest p95 ms", False),
+    (("ingest", "latency", "p99_ms"), "ingest p99 ms", False),
+    (("broadcast", "lag", "p50_ms"), "broadcast lag p50 ms", False),
+    (("broadcast", "lag", "p95_ms"), "broadcast lag p95 ms", False),
+    (("broadcast", "lag", "p99_ms"), "broadcast lag p99 ms", False),
+    (("broadcast", "delivery_ratio"), "delivery ratio", True),
+]
+
+
+def _lookup(report: dict, path: Tuple[str, ...]):
+    value = report
+    for key in path:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def compare(baseline: dict, current: dict) -> str:
+    """Render a side-by-side comparison of two reports."""
+    lines = [
+        f"baseline: {(baseline['meta']['git'].get('commit') or '?')[:10]}  "
+        f"current: {(current['meta']['git'].get('commit') or '?')[:10]}",
+        f"{'metric':<24}{'baseline':>12}{'current':>12}{'change':>10}",
+    ]
+    if baseline["meta"]["params"] != current["meta"]["params"]:
+        lines.insert(1, "warning: reports were produced with different parameters")
+
+    for path, label, higher_is_better in COMPARED_METRICS:
+        old, new = _lookup(baseline, path), _lookup(current, path)
+        change = ""
+        if isinstance(old, (int, float)) and isinstance(new, (int, float)) and old:
+            delta = (new - old) / old * 100
+            better = delta > 0 if higher_is_better else delta < 0
+            change = f"{delta:+.1f}%{' ' if better or abs(delta) < 1 else '!'}"
+        lines.append(f"{label:<24}{_fmt(old):>12}{_fmt(new):>12}{change:>10}")
+
+    errors = sum(current["errors"].values())
+    lines.append(f"{'errors':<24}{sum(baseline['errors'].values()):>12}{errors:>12}")
+    return "\n".join(lines)
+
+
+def _fmt(value) -> str:
+    return "-" if value is None else f"{value:g}"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="Target backend; omit to start a local uvicorn instance")
+    parser.add_argument("--devices", type=int, default=10, help="Simulated devices")
+    parser.add_argument("--rate", type=float, default=5.0, help="Events per second per device")
+    parser.add_argument("--batch-size", type=int, default=10, help="Events per upload")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of ingestion")
+    parser.add_argument("--ws-clients", type=int, default=5, help="Dashboard WebSocket clients")
+    parser.add_argument("--drain", type=float, default=3.0, help="Seconds to wait for broadcasts after the last upload")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local instance")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for generated events")
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+
+    if args.url:
+        report = await LoadTest(args.url, args).run()
+    else:
+        async with LocalServer(args.workers) as server:
+            report = await LoadTest(server.url, args).run()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+
+    if args.compare:
+        print()
+        print(compare(json.loads(Path(args.compare).read_text()), report))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Cold start benchmark for the backend.
+
+Measures, over several fresh processes:
+
+- import time of ``app.main``
+- time from spawning uvicorn to the first successful ``/api/health``
+- time until ``/api/ready`` reports warm-up finished
+- latency of the first dashboard page and push key request
+
+Each run can use a fresh database (first boot, schema is created) or reuse
+one database across runs (warm boot, schema is already current):
+
+    python benchmarks/startup.py --runs 5 -o startup.json
+    python benchmarks/startup.py --runs 5 --reuse-db --compare startup.json
+
+Requires ``httpx`` in addition to the backend requirements.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import httpx
+except ImportError:
+    sys.exit("The startup benchmark requires httpx: pip install httpx")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from load_test import BACKEND_DIR, free_port, git_revision, _fmt  # noqa: E402
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def measure_import(env: Dict[str, str]) -> float:
+    """Seconds to import the application in a fresh interpreter."""
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, env=env,
+        text=True, stderr=subprocess.DEVNULL
+    )
+    return float(output.strip().splitlines()[-1])
+
+
+def wait_for(client: httpx.Client, url: str, start: float, timeout: float = 30) -> float:
+    """Poll until ``url`` answers 200, returning seconds since ``start``."""
+    deadline = start + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if client.get(url).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        time.sleep(0.005)
+    raise RuntimeError(f"{url} did not answer within {timeout}s")
+
+
+def timed_get(client: httpx.Client, url: str) -> float:
+    start = time.perf_counter()
+    client.get(url).raise_for_status()
+    return time.perf_counter() - start
+
+
+def measure_boot(env: Dict[str, str]) -> Dict[str, float]:
+    """Start uvicorn once and time it until it serves warm requests."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        with httpx.Client(timeout=10) as client:
+            first_response = wait_for(client, f"{url}/api/health", start)
+            ready = wait_for(client, f"{url}/api/ready", start)
+            return {
+                "first_response_s": first_response,
+                "ready_s": ready,
+                "first_dashboard_s": timed_get(client, f"{url}/"),
+                "first_vapid_key_s": timed_get(client, f"{url}/api/push/vapid-public-key"),
+            }
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """Median and spread in milliseconds."""
+    if not values:
+        return {"median_ms": None, "min_ms": None, "max_ms": None}
+    return {
+        "median_ms": round(statistics.median(values) * 1000, 2),
+        "min_ms": round(min(values) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2),
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    samples: Dict[str, List[float]] = {
+        "import": [], "first_response_s": [], "ready_s": [],
+        "first_dashboard_s": [], "first_vapid_key_s": []
+    }
+
+    with tempfile.TemporaryDirectory(prefix="sentinel-startup-") as tmp:
+        env = dict(os.environ)
+        env["ARCHIVE_DIR"] = f"{tmp}/archive"
+
+        for i in range(args.runs):
+            db_name = "startup.db" if args.reuse_db else f"startup-{i}.db"
+            env["DATABASE_URL"] = f"sqlite:///{tmp}/{db_name}"
+            if args.reuse_db and i == 0:
+                # Create the schema once so measured runs are warm boots
+                measure_boot(env)
+
+            samples["import"].append(measure_import(env))
+            for key, value in measure_boot(env).items():
+                samples[key].append(value)
+
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "git": git_revision(),
+            "python": sys.version.split()[0],
+            "params": {"runs": args.runs, "reuse_db": args.reuse_db},
+        },
+        "import": summarize(samples["import"]),
+        "first_response": summarize(samples["first_response_s"]),
+        "ready": summarize(samples["ready_s"]),
+        "first_dashboard": summarize(samples["first_dashboard_s"]),
+        "first_vapid_key": summarize(samples["first_vapid_key_s"]),
+    }
+
+
+COMPARED_METRICS = ["import", "first_response", "ready", "first_dashboard", "first_vapid_key"]
+
+
+def compare(baseline: dict, current: dict) -> str:
+    """Render median timings of two reports side by side."""
+    lines = [
+        f"baseline: {(baseline['meta']['git'].get('commit') or '?')[:10]}  "
+        f"current: {(current['meta']['git'].get('commit') or '?')[:10]}",
+        f"{'median ms':<24}{'baseline':>12}{'current':>12}{'change':>10}",
+    ]
+    if baseline["meta"]["params"] != current["meta"]["params"]:
+        lines.insert(1, "warning: reports were produced with different parameters")
+
+    for name in COMPARED_METRICS:
+        old = baseline.get(name, {}).get("median_ms")
+        new = current.get(name, {}).get("median_ms")
+        change = f"{(new - old) / old * 100:+.1f}%" if old and new is not None else ""
+        lines.append(f"{name:<24}{_fmt(old):>12}{_fmt(new):>12}{change:>10}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes to measure")
+    parser.add_argument("--reuse-db", action="store_true", help="Boot against an existing database")
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+
+    if args.compare:
+        print()
+        print(compare(json.loads(Path(args.compare).read_text()), report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Replay benchmark for the server-side web camera tracker.
+
+Replays a recorded detection sequence (JSON lines of ``{"timestamp": seconds,
+"detections": [...]}``, the per-frame results sent back on ``/ws/camera``)
+through ``CameraTracker`` as fast as possible. It reports frames/sec,
+per-frame latency and the number of cameras one core can track at 15 fps:
+
+    python benchmarks/tracking.py --generate 600 --record scene.jsonl
+    python benchmarks/tracking.py scene.jsonl -o tracking.json
+    python benchmarks/tracking.py scene.jsonl --compare tracking.json
+
+``--generate`` synthesizes a scene of people and vehicles crossing the
+frame, with box jitter, missed detections and false positives. Its
+ground truth is reported next to the ENTERED events the tracker emitted.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from load_test import BACKEND_DIR, git_revision, summarize, _fmt  # noqa: E402
+
+sys.path.insert(0, str(BACKEND_DIR))
+from app.tracking import CameraTracker  # noqa: E402
+
+FRAME_WIDTH = 1280
+FRAME_HEIGHT = 720
+
+
+def generate(seconds: float, fps: float, arrivals: float, seed: int) -> Tuple[List[dict], Counter]:
+    """Synthesize frames of objects crossing the scene; returns (frames, objects by kind)."""
+    rng = random.Random(seed)
+    objects = []  # [kind, x, y, width, height, dx, dy]
+    truth = Counter()
+    frames = []
+    start = time.time()
+
+    for i in range(int(seconds * fps)):
+        if rng.random() < arrivals / fps:
+            kind = "person" if rng.random() < 0.7 else "car"
+            width, height = (80, 200) if kind == "person" else (260, 150)
+            speed = rng.uniform(40, 120) if kind == "person" else rng.uniform(150, 400)
+            left = rng.random() < 0.5
+            x = -width / 2 if left else FRAME_WIDTH - width / 2
+            objects.append([kind, x, rng.uniform(200, 500), width, height, speed if left else -speed, rng.uniform(-10, 10)])
+            truth[kind] += 1
+
+        detections = []
+        for obj in objects:
+            kind, x, y, width, height, dx, dy = obj
+            obj[1] += dx / fps
+            obj[2] += dy / fps
+            if rng.random() < 0.1:
+                continue  # Missed detection
+            # Box jitter of a few percent of the object's size
+            jx, jy = width * 0.05, height * 0.05
+            detections.append({
+                "type": kind,
+                "confidence": round(rng.uniform(0.5, 0.99), 2),
+                "box": {
+                    "x": x + rng.uniform(-jx, jx), "y": y + rng.uniform(-jy, jy),
+                    "width": width + rng.uniform(-jx, jx), "height": height + rng.uniform(-jy, jy)
+                }
+            })
+        if rng.random() < 0.05:
+            detections.append({
+                "type": "person",
+                "confidence": 0.5,
+                "box": {"x": rng.uniform(0, FRAME_WIDTH), "y": rng.uniform(0, FRAME_HEIGHT), "width": 60, "height": 150}
+            })
+        objects = [o for o in objects if -o[3] <= o[1] <= FRAME_WIDTH]
+        frames.append({"timestamp": round(start + i / fps, 3), "detections": detections})
+
+    return frames, truth
+
+
+def replay(frames: List[dict], repeat: int) -> Tuple[List[float], Counter]:
+    """Run the frames through fresh trackers; returns per-frame seconds and events of the last pass."""
+    durations = []
+    events = Counter()
+    for _ in range(repeat):
+        tracker = CameraTracker("benchmark", iter(range(1, 10 ** 9)))
+        events = Counter()
+        for frame in frames:
+            started = time.perf_counter()
+            emitted = tracker.update(frame["detections"], frame["timestamp"])
+            durations.append(time.perf_counter() - started)
+            events.update(e.type for e in emitted)
+        events.update(e.type for e in tracker.close())
+    return durations, events
+
+
+def run(args: argparse.Namespace) -> dict:
+    truth = None
+    if args.generate:
+        frames, truth = generate(args.generate, args.fps, args.arrivals, args.seed)
+        if args.record:
+            with open(args.record, "w") as f:
+                for frame in frames:
+                    f.write(json.dumps(frame) + "\n")
+    elif args.input:
+        with open(args.input) as f:
+            frames = [json.loads(line) for line in f if line.strip()]
+    else:
+        sys.exit("Give a recorded sequence or --generate SECONDS")
+
+    durations, events = replay(frames, args.repeat)
+    total = sum(durations)
+    fps = len(durations) / total if total else None
+    report = {
+        "revision": git_revision(),
+        "config": {
+            "input": args.input,
+            "generate": args.generate,
+            "frames": len(frames),
+            "detections": sum(len(f["detections"]) for f in frames),
+            "repeat": args.repeat
+        },
+        "frames_per_sec": round(fps, 1) if fps else None,
+        "cameras_at_15fps": int(fps // 15) if fps else None,
+        "frame_latency": summarize(durations),
+        "events": dict(sorted(events.items()))
+    }
+    if truth is not None:
+        report["ground_truth"] = {"PERSON": truth["person"], "VEHICLE": truth["car"]}
+    return report
+
+
+def compare(baseline: dict, current: dict) -> str:
+    rows = [
+        ("frames_per_sec", baseline.get("frames_per_sec"), current.get("frames_per_sec")),
+        ("cameras_at_15fps", baseline.get("cameras_at_15fps"), current.get("cameras_at_15fps")),
+    ]
+    for key in ("p50_ms", "p99_ms", "max_ms"):
+        rows.append((f"frame {key}", baseline["frame_latency"][key], current["frame_latency"][key]))
+    lines = [f"{'metric':<24}{'baseline':>12}{'current':>12}"]
+    lines += [f"{name:<24}{_fmt(old):>12}{_fmt(new):>12}" for name, old, new in rows]
+    return "\n".join(lines)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", nargs="?", help="Recorded detection sequence (JSON lines)")
+    parser.add_argument("--generate", type=float, metavar="SECONDS", help="Synthesize a sequence this long")
+    parser.add_argument("--fps", type=float, default=15.0, help="Frame rate of generated sequences")
+    parser.add_argument("--arrivals", type=float, default=0.5, help="Objects entering per second when generating")
+    parser.add_argument("--record", help="Save the generated sequence to this file")
+    parser.add_argument("--repeat", type=int, default=5, help="Replays of the sequence")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+
+    if args.compare:
+        print()
+        print(compare(json.loads(Path(args.compare).read_text()), report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Import the app package from the backend directory wherever pytest runs from
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
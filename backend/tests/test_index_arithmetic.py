@@ -0,0 +1,198 @@
+"""Index and tag arithmetic of the camera pipeline and snapshot serving."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.clips import ClipBuffer
+from app.config import get_settings
+from app.scheduler import DetectionScheduler
+from app.snapshots import parse_range
+from app.tracking import CameraTracker
+
+settings = get_settings()
+
+
+# Byte ranges
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=900-", (900, 999)),
+    ("bytes=10-5000", (10, 999)),  # End clamped to the file
+    ("bytes=-100", (900, 999)),  # Suffix range
+    ("bytes=-5000", (0, 999)),  # Suffix longer than the file
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["items=0-99", "bytes=0-1,5-6", "bytes=a-b"])
+def test_parse_range_ignored(header):
+    assert parse_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=50-10"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1000)
+
+
+# Clip buffers
+
+def frame(i: int, size: int = 40) -> bytes:
+    return bytes([i]) * size
+
+
+def make_buffer(tmp_path, segment_bytes=100, segments=3, max_frames=100) -> ClipBuffer:
+    return ClipBuffer("test", tmp_path, segment_bytes, segments, max_frames)
+
+
+def test_clip_buffer_recycles_oldest_segment(tmp_path):
+    buffer = make_buffer(tmp_path)
+    try:
+        # Two frames fit per segment; ten frames wrap the three segments,
+        # and each recycled segment drops the two frames it held
+        for i in range(10):
+            assert buffer.append(frame(i), float(i))
+        assert buffer.frame_count == 6
+
+        data, count, first, last = buffer.extract(0, 100)
+        assert count == 6
+        assert (first, last) == (4.0, 9.0)
+        assert bytes(data) == b"".join(frame(i) for i in range(4, 10))
+    finally:
+        buffer.close()
+
+
+def test_clip_buffer_full_index_drops_oldest_frame(tmp_path):
+    buffer = make_buffer(tmp_path, segment_bytes=1000, max_frames=4)
+    try:
+        for i in range(6):
+            buffer.append(frame(i, 10), float(i))
+        assert buffer.frame_count == 4
+        data, count, first, last = buffer.extract(0, 100)
+        assert (count, first, last) == (4, 2.0, 5.0)
+        assert bytes(data) == b"".join(frame(i, 10) for i in range(2, 6))
+    finally:
+        buffer.close()
+
+
+def test_clip_buffer_extract_range(tmp_path):
+    buffer = make_buffer(tmp_path)
+    try:
+        assert buffer.extract(0, 100) is None
+        assert not buffer.append(frame(0, 101), 0.0)  # Larger than a segment
+        for i in range(4):
+            buffer.append(frame(i), float(i))
+        assert buffer.extract(10, 20) is None
+        data, count, first, last = buffer.extract(1, 2)
+        assert (count, first, last) == (2, 1.0, 2.0)
+        assert bytes(data) == frame(1) + frame(2)
+    finally:
+        buffer.close()
+
+
+# Detection scheduling
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(settings, "detection_max_fps", 0.0)
+    monkeypatch.setattr(settings, "detection_queue_size", 8)
+    monkeypatch.setattr(settings, "detection_deadline_ms", 500)
+    monkeypatch.setattr(settings, "detection_camera_weights", "a:2")
+    scheduler = DetectionScheduler()
+    return scheduler
+
+
+async def serve(scheduler: DetectionScheduler, count: int) -> list:
+    return [(await scheduler._next()).camera.camera_id for _ in range(count)]
+
+
+def test_scheduler_serves_in_proportion_to_weight(scheduler):
+    async def run():
+        scheduler._work = asyncio.Event()
+        for _ in range(4):
+            scheduler.submit("a", b"")
+        for _ in range(2):
+            scheduler.submit("b", b"")
+        return await serve(scheduler, 6)
+
+    assert asyncio.run(run()) == ["a", "b", "a", "a", "b", "a"]
+
+
+def test_scheduler_does_not_charge_stale_drops(scheduler):
+    async def run():
+        scheduler._work = asyncio.Event()
+        stale = scheduler.submit("b", b"")
+        scheduler._cameras["b"].pending[0].enqueued = time.monotonic() - 10
+        scheduler.submit("c", b"")  # Same weight, tagged after b
+
+        assert await serve(scheduler, 1) == ["c"]
+        assert stale.done() and stale.result() is None
+
+        b = scheduler._cameras["b"]
+        assert b.dropped == 1
+        assert b.finish == b.start  # Nothing served, nothing charged
+
+        # A new frame starts at the virtual time, not after the dropped one
+        scheduler.submit("b", b"")
+        assert b.start == scheduler._virtual_time
+
+    asyncio.run(run())
+
+
+def test_scheduler_overflow_drops_oldest(scheduler, monkeypatch):
+    monkeypatch.setattr(settings, "detection_queue_size", 2)
+
+    async def run():
+        scheduler._work = asyncio.Event()
+        futures = [scheduler.submit("a", i) for i in range(3)]
+        assert futures[0].result() is None
+        assert [job.args for job in scheduler._cameras["a"].pending] == [(1,), (2,)]
+
+    asyncio.run(run())
+
+
+# Tracking
+
+def detection(x: float, label: str = "person") -> dict:
+    return {"type": label, "confidence": 0.9, "box": {"x": x, "y": 100, "width": 80, "height": 200}}
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    monkeypatch.setattr(settings, "tracking_min_hits", 3)
+    monkeypatch.setattr(settings, "tracking_iou_threshold", 0.3)
+    monkeypatch.setattr(settings, "tracking_exit_seconds", 1.0)
+    return CameraTracker("camera", iter(range(1, 1000)))
+
+
+def test_tracker_enters_after_min_hits_and_exits_after_timeout(tracker):
+    assert tracker.update([detection(100)], 1000.0) == []
+    assert tracker.update([detection(105)], 1000.1) == []
+    entered = tracker.update([detection(110)], 1000.2)
+    assert [e.type for e in entered] == ["PERSON_ENTERED"]
+    assert entered[0].timestamp == 1000  # Whole seconds, from when first seen
+
+    assert tracker.update([], 1001.0) == []  # Within the exit timeout
+    exited = tracker.update([], 1001.3)
+    assert [e.type for e in exited] == ["PERSON_EXITED"]
+    assert exited[0].track_id == entered[0].track_id
+    assert exited[0].duration == 200  # Milliseconds between first and last match
+    assert tracker.tracks == []
+
+
+def test_tracker_matches_only_same_kind(tracker):
+    tracker.update([detection(100)], 1000.0)
+    tracker.update([detection(100, "car")], 1000.1)
+    assert sorted(t.kind for t in tracker.tracks) == [0, 1]
+    assert all(t.hits == 1 for t in tracker.tracks)
+
+
+def test_tracker_close_exits_confirmed_tracks_only(tracker):
+    for i in range(3):
+        tracker.update([detection(100)], 1000.0 + i * 0.1)
+    tracker.update([detection(100), detection(600)], 1000.3)
+    assert [e.type for e in tracker.close()] == ["PERSON_EXITED"]
+    assert tracker.tracks == [] and len(tracker._boxes) == 0